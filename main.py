@@ -1,90 +1,97 @@
 import sys
 import os
-from PyQt6.QtCore import QUrl, QTimer
-from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QHBoxLayout, QMessageBox
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineScript
+import time
+
+# Captured before the Qt imports so startup timings include them
+LAUNCH_TIME = time.perf_counter()
+LAUNCH_CPU = time.process_time()
+
+from PyQt6.QtCore import Qt, QUrl, QTimer
+from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QHBoxLayout, QMessageBox, QCheckBox
+from PyQt6.QtWebEngineCore import QWebEngineSettings
 from PyQt6.QtGui import QIcon, QImage, QPixmap
-import urllib.request
 
 from src.settings_dialog import SettingsDialog
+from src.clear_cache_dialog import ClearCacheDialog
 from src.plugin_manager import PluginManager
+from src.page_scripts import default_page_scripts
+from src.preconnect import PreconnectPredictor
+from src.page_bridge import BridgeManager
+from src.async_runtime import install_event_loop, run_event_loop
+from src.tab_manager import TabManager
+from src.memory_monitor import MemoryMonitor
+from src.power_saver import PowerSaver
+from src.storage_gc import StorageGC
+from src.offline_bundles import BundleManager
 from src.browser_settings import BrowserSettings
+from src.profile_manager import ProfileManager
 from src.api_manager import ApiManager
+from src.startup import StartupNavigator, StartupTimeline, HOME_URL
+from src.session_snapshot import SessionSnapshot, SnapshotOverlay
+from src.session_manager import SessionStore, SessionManager
+from src.asset_loader import AssetLoader, DEFAULT_ICON, LOGO_NAME, LOGO_URLS
+from src.startup_profiler import StartupProfiler
+from src.library_store import register_library_scheme
+from src.offline_bundles import register_bundle_scheme
+from src.performance_profiles import apply_chromium_flags
 
-def download_websim_logo():
-    """Download the websim.ai logo if it doesn't exist"""
-    logo_path = os.path.join("assets", "websim_logo.png")
-    
-    # If logo already exists, return it
-    if os.path.exists(logo_path):
-        return logo_path
-        
-    try:
-        # Create assets directory if it doesn't exist
-        os.makedirs("assets", exist_ok=True)
-        
-        # Try multiple potential logo URLs
-        logo_urls = [
-            "https://websim.ai/favicon.ico",
-            "https://websim.ai/favicon.png",
-            "https://websim.ai/logo.png"
-        ]
-        
-        for url in logo_urls:
-            try:
-                urllib.request.urlretrieve(url, logo_path)
-                if os.path.exists(logo_path) and os.path.getsize(logo_path) > 0:
-                    return logo_path
-            except:
-                continue
-                
-        # If no logo could be downloaded, use a default icon
-        return None
-    except Exception as e:
-        print(f"Could not set up logo: {str(e)}")
-        return None
+STARTUP_TIMELINE = StartupTimeline(LAUNCH_TIME, LAUNCH_CPU)
+STARTUP_TIMELINE.mark("imports")
+# Opt-in via --profile-startup[=trace.json] or WEBSIM_STARTUP_PROFILE
+STARTUP_PROFILER = StartupProfiler.from_args()
 
 class WebSimBrowser(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.timeline = STARTUP_TIMELINE
         self.setWindowTitle("WebSim.ai Browser")
         self.setGeometry(100, 100, 1200, 800)
+        self.timeline.mark("window")
 
-        # Show initial alert
-        QMessageBox.information(self, "Welcome", 
-            "Welcome to WebSim Browser!\n\n"
-            "This application is still in development.\n"
-            "Some features may not work as expected.")
-
-        # Set application icon
-        logo_path = download_websim_logo()
-        if logo_path is not None and os.path.exists(logo_path):
-            self.setWindowIcon(QIcon(logo_path))
-
-        # Flag to track initial load
-        self.initial_load = True
+        # Show the bundled icon now and swap in the websim.ai logo when it arrives
+        self.setWindowIcon(QIcon(DEFAULT_ICON))
+        self.asset_loader = AssetLoader(self)
+        self.asset_loader.assetReady.connect(self.on_asset_ready)
+        self.asset_loader.start(LOGO_NAME, LOGO_URLS)
+        self.timeline.mark("asset loader")
 
         # Setup persistent storage for cookies and cache
-        BrowserSettings.setup_persistent_storage(self)
+        ProfileManager.attach(self)
+        self.timeline.mark("profile")
 
         # Create central widget and layout
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
 
-        # Create web view with persistent profile first
-        self.web_view = QWebEngineView()
-        
-        # Create page with enhanced settings
-        page = QWebEnginePage(self.profile, self.web_view)
-        BrowserSettings.setup_page_settings(page)
-        self.web_view.setPage(page)
-        
-        # Connect to loadFinished signal for auto-reload
-        page.loadFinished.connect(self.on_load_finished)
-        
-        self.web_view.setUrl(QUrl("https://websim.ai"))
+        # Page scripts are matched and injected by Chromium, not on every loadFinished
+        self.page_scripts = default_page_scripts()
+        # Learned per-project origins are preconnected at document creation
+        self.preconnect = PreconnectPredictor(self, self.page_scripts)
+        # Pages and Python exchange batched messages over a QWebChannel instead of runJavaScript
+        self.bridge_manager = BridgeManager(self)
+
+        # Tabs share the persistent profile; create the first one up front
+        self.tabs = TabManager(self, self.setup_page)
+        self.tabs.new_tab()
+        self.timeline.mark("page")
+
+        # Show the page from the end of the last session until its live copy has loaded
+        self.session_store = SessionStore(os.path.join(self.storage_path, 'session'))
+        self.session_snapshot = SessionSnapshot(self.session_store.directory)
+        session_entries, session_current = self.session_store.load()
+        startup_url = self.session_store.current_url()
+        pixmap = self.session_snapshot.pixmap() if startup_url else None
+        self.snapshot_overlay = SnapshotOverlay(self.web_view, pixmap) if pixmap else None
+        self.timeline.mark("snapshot")
+
+        # Navigate once the cookie store has loaded instead of loading twice
+        self.startup_navigator = StartupNavigator(self, url=startup_url or HOME_URL, launch_time=LAUNCH_TIME)
+        self.startup_navigator.firstPaint.connect(self.on_first_paint)
+        if self.snapshot_overlay is not None:
+            self.startup_navigator.firstPaint.connect(self.snapshot_overlay.fade_out)
+        self.startup_navigator.start()
+        self.timeline.mark("first navigation")
 
         # Create button layouts
         top_button_layout = QHBoxLayout()
@@ -99,7 +106,7 @@ class WebSimBrowser(QMainWindow):
 
         # Create Reload button
         self.reload_button = QPushButton("🔄 Reload")
-        self.reload_button.clicked.connect(self.web_view.reload)
+        self.reload_button.clicked.connect(lambda: self.web_view.reload())
         self.style_button(self.reload_button, "#607D8B")
         top_button_layout.addWidget(self.reload_button)
 
@@ -130,6 +137,18 @@ class WebSimBrowser(QMainWindow):
         self.api_button.clicked.connect(self.show_api_menu)
         self.style_button(self.api_button, "#FF5722")
         bottom_button_layout.addWidget(self.api_button)
+
+        # Create Power Saver button
+        self.power_button = QPushButton("🔋 Power Saver")
+        self.power_button.clicked.connect(self.show_power_menu)
+        self.style_button(self.power_button, "#689F38")
+        bottom_button_layout.addWidget(self.power_button)
+
+        # Create Offline bundles button
+        self.offline_button = QPushButton("📦 Offline")
+        self.offline_button.clicked.connect(self.show_offline_menu)
+        self.style_button(self.offline_button, "#00796B")
+        bottom_button_layout.addWidget(self.offline_button)
         
         # Add stretch to push buttons to the left
         bottom_button_layout.addStretch()
@@ -137,14 +156,78 @@ class WebSimBrowser(QMainWindow):
         # Add button layouts to main layout
         main_layout.addLayout(top_button_layout)
         main_layout.addLayout(bottom_button_layout)
-        main_layout.addWidget(self.web_view)
+        main_layout.addWidget(self.tabs.widget)
 
         # Remove window frame margins
         main_layout.setContentsMargins(0, 0, 0, 0)
+        self.timeline.mark("toolbar")
 
         # Initialize managers
         self.plugin_manager = PluginManager(self)
         self.api_manager = ApiManager(self)
+        self.power_saver = PowerSaver(self, BrowserSettings.app_settings())
+        self.bundle_manager = BundleManager(self)
+        # The other tabs of the last session come back as placeholders until selected
+        self.session_manager = SessionManager(self, self.session_store)
+        self.session_manager.restore(session_entries, session_current)
+        self.timeline.mark("managers")
+
+        # Watch renderer memory and step in before a WebGL project eats the machine
+        self.memory_monitor = MemoryMonitor(self, BrowserSettings.app_settings())
+        self.statusBar().addPermanentWidget(self.memory_monitor.label)
+        self.memory_monitor.start()
+        self.storage_gc = StorageGC(self, BrowserSettings.app_settings())
+        QApplication.instance().aboutToQuit.connect(self.storage_gc.update_access)
+        self.storage_gc.start()
+        self.timeline.report()
+
+        # Welcome note goes on top once the window is up, while the page keeps loading
+        QTimer.singleShot(0, self.show_welcome)
+
+    def on_first_paint(self, elapsed_ms):
+        """Close the startup timeline at the first successful load"""
+        self.timeline.add("first loadFinished", self.timeline.launch_time, elapsed_ms / 1000)
+        if STARTUP_PROFILER is not None:
+            STARTUP_PROFILER.finish(self.timeline)
+
+    def show_welcome(self):
+        """Show the non-modal welcome note unless the user opted out"""
+        settings = BrowserSettings.app_settings()
+        if settings.value("welcome/skip", False, type=bool):
+            return
+        box = QMessageBox(QMessageBox.Icon.Information, "Welcome",
+            "Welcome to WebSim Browser!\n\n"
+            "This application is still in development.\n"
+            "Some features may not work as expected.",
+            QMessageBox.StandardButton.Ok, self)
+        box.setCheckBox(QCheckBox("Don't show this again"))
+        box.setWindowModality(Qt.WindowModality.NonModal)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        box.finished.connect(lambda _: settings.setValue("welcome/skip", box.checkBox().isChecked()))
+        box.show()
+
+    @property
+    def web_view(self):
+        """The web view of the selected tab"""
+        return self.tabs.current_view()
+
+    def closeEvent(self, event):
+        """Remember the session and the visible page for the next launch"""
+        self.session_manager.save()
+        try:
+            self.session_snapshot.save(self.web_view)
+        except OSError as e:
+            print(f"Could not save session snapshot: {str(e)}")
+        super().closeEvent(event)
+
+    def setup_page(self, page):
+        """Apply settings and page scripts to a newly created tab page"""
+        BrowserSettings.setup_page_settings(page)
+        self.page_scripts.install(page)
+        self.bridge_manager.attach_page(page)
+        self.preconnect.attach_page(page)
+        if hasattr(self, "plugin_manager"):
+            self.plugin_manager.attach_page(page)
 
     def style_button(self, button, color):
         """Apply consistent styling to buttons"""
@@ -164,8 +247,12 @@ class WebSimBrowser(QMainWindow):
         """)
 
     def go_home(self):
-        """Navigate to WebSim home page"""
-        self.web_view.setUrl(QUrl("https://websim.ai"))
+        """Navigate to WebSim home page, keeping an open project in its own tab"""
+        url = self.web_view.url()
+        if (url.host() == "websim.ai" or url.host().endswith(".websim.ai")) and url.path() not in ("", "/"):
+            self.tabs.new_tab(QUrl(HOME_URL))
+        else:
+            self.web_view.setUrl(QUrl(HOME_URL))
 
     def show_settings(self):
         """Show the settings dialog"""
@@ -176,15 +263,11 @@ class WebSimBrowser(QMainWindow):
             settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptEnabled,
                                dialog.js_checkbox.isChecked())
             self.profile.setHttpCacheMaximumSize(dialog.cache_size.value() * 1024 * 1024)
+            BrowserSettings.app_settings().setValue("performance/profile", dialog.selected_profile())
 
     def clear_cache(self):
-        """Clear browser cache and cookies"""
-        reply = self.question("Clear Cache",
-                            "Are you sure you want to clear all browsing data?")
-        if reply:
-            self.profile.clearHttpCache()
-            self.profile.clearAllVisitedLinks()
-            self.information("Success", "Cache cleared successfully!")
+        """Clear all or part of the HTTP cache"""
+        ClearCacheDialog(self).exec()
 
     def show_plugins_menu(self):
         """Show the plugins dropdown menu"""
@@ -198,49 +281,24 @@ class WebSimBrowser(QMainWindow):
             self.api_button.rect().bottomLeft()
         ))
 
-    def on_load_finished(self, ok):
-        """Handle page load completion"""
-        if ok:
-            # Check for plugin in URL
-            current_url = self.web_view.url().toString()
-            if "plugin=@Trey6383/test123" in current_url:
-                script = """
-                function injectPlugin() {
-                    // Create a div element
-                    const div = document.createElement('div');
-                    div.style.position = 'fixed';
-                    div.style.bottom = '20px';
-                    div.style.right = '20px';
-                    div.style.backgroundColor = '#9C27B0';
-                    div.style.color = 'white';
-                    div.style.padding = '10px';
-                    div.style.borderRadius = '5px';
-                    div.style.zIndex = '9999';
-                    div.style.fontFamily = 'Arial, sans-serif';
-                    div.textContent = 'Plugin: test123 by @Trey6383';
-                    
-                    // Add div to the page
-                    document.body.appendChild(div);
-                    
-                    // Fade out after 3 seconds
-                    setTimeout(() => {
-                        div.style.transition = 'opacity 1s';
-                        div.style.opacity = '0';
-                        setTimeout(() => div.remove(), 1000);
-                    }, 3000);
-                }
-                injectPlugin();
-                """
-                self.web_view.page().runJavaScript(script)
-            
-            # Handle initial load
-            if self.initial_load:
-                QTimer.singleShot(1000, self.reload_once)
-
-    def reload_once(self):
-        """Perform one-time reload and reset the flag"""
-        self.web_view.reload()
-        self.initial_load = False
+    def show_power_menu(self):
+        """Show the power saver policy menu"""
+        self.power_saver.menu.exec(self.power_button.mapToGlobal(
+            self.power_button.rect().bottomLeft()
+        ))
+
+    def show_offline_menu(self):
+        """Show the offline bundle menu"""
+        self.bundle_manager.menu.exec(self.offline_button.mapToGlobal(
+            self.offline_button.rect().bottomLeft()
+        ))
+
+    def on_asset_ready(self, name, path):
+        """Swap in a downloaded asset once the background loader has it"""
+        if name == LOGO_NAME and not QPixmap(path).isNull():
+            icon = QIcon(path)
+            self.setWindowIcon(icon)
+            QApplication.instance().setWindowIcon(icon)
 
     def question(self, title, message):
         """Show a question dialog"""
@@ -255,16 +313,25 @@ class WebSimBrowser(QMainWindow):
         QMessageBox.information(self, title, message)
 
 def main():
+    # Chromium reads its flags once, when the first web engine object starts
+    apply_chromium_flags(BrowserSettings.app_settings())
+    # Custom schemes have to be registered before the application exists
+    register_library_scheme()
+    register_bundle_scheme()
     app = QApplication(sys.argv)
+    # Coroutines run on the GUI thread, scheduled by the Qt event loop
+    install_event_loop(app)
+    STARTUP_TIMELINE.mark("QApplication")
     
-    # Set application-wide icon if logo is available
-    logo_path = download_websim_logo()
-    if logo_path is not None and os.path.exists(logo_path):
-        app.setWindowIcon(QIcon(logo_path))
+    # Bundled icon until the downloaded logo replaces it
+    app.setWindowIcon(QIcon(DEFAULT_ICON))
     
     browser = WebSimBrowser()
     browser.show()
-    sys.exit(app.exec())
+    if STARTUP_PROFILER is not None:
+        # Still write the trace if the first load never finishes
+        app.aboutToQuit.connect(lambda: STARTUP_PROFILER.finish(STARTUP_TIMELINE))
+    sys.exit(run_event_loop(app))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
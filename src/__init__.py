@@ -1,15 +1,65 @@
 from .interceptor import ChromeRequestInterceptor
+from .request_filter import RequestFilter
+from .request_telemetry import RequestRecorder
 from .settings_dialog import SettingsDialog
+from .clear_cache_dialog import ClearCacheDialog
 from .database_handler import DatabaseHandler
 from .plugin_manager import PluginManager
+from .plugin_cache import PluginCache
+from .library_store import LibraryStore, LibrarySchemeHandler
+from .offline_bundles import BundleLibrary, BundleManager
+from .page_scripts import PageScriptRegistry
+from .preconnect import PreconnectPredictor
+from .page_bridge import BridgeManager
+from .async_runtime import install_event_loop, run_event_loop, spawn
+from .tab_manager import TabManager
+from .memory_monitor import MemoryMonitor
+from .power_saver import PowerSaver
+from .storage_gc import StorageGC
 from .browser_settings import BrowserSettings
+from .profile_manager import ProfileManager
 from .api_manager import ApiManager
+from .startup import StartupNavigator, StartupTimeline
+from .startup_profiler import StartupProfiler
+from .session_snapshot import SessionSnapshot
+from .session_manager import SessionStore, SessionManager
+from .asset_loader import AssetCache, AssetLoader
+from .performance_profiles import PROFILES, apply_chromium_flags
 
 __all__ = [
     'ChromeRequestInterceptor',
+    'RequestFilter',
+    'RequestRecorder',
     'SettingsDialog',
+    'ClearCacheDialog',
     'DatabaseHandler',
     'PluginManager',
+    'PluginCache',
+    'LibraryStore',
+    'LibrarySchemeHandler',
+    'BundleLibrary',
+    'BundleManager',
+    'PageScriptRegistry',
+    'PreconnectPredictor',
+    'BridgeManager',
+    'install_event_loop',
+    'run_event_loop',
+    'spawn',
+    'TabManager',
+    'MemoryMonitor',
+    'PowerSaver',
+    'StorageGC',
     'BrowserSettings',
-    'ApiManager'
+    'ProfileManager',
+    'ApiManager',
+    'StartupNavigator',
+    'StartupTimeline',
+    'StartupProfiler',
+    'SessionSnapshot',
+    'SessionStore',
+    'SessionManager',
+    'AssetCache',
+    'AssetLoader',
+    'PROFILES',
+    'apply_chromium_flags'
 ] 
\ No newline at end of file
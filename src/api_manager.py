@@ -1,8 +1,21 @@
 from PyQt6.QtWidgets import QMenu, QPushButton, QHBoxLayout, QMessageBox, QInputDialog
 from PyQt6.QtCore import QUrl
+import asyncio
 import os
+from .async_runtime import spawn, message_box
+
+# Page bridge handler: resolves with the feature's new state, or null without a project
+TOGGLE_FEATURE_HANDLER = """async (projectId, feature) => {
+        const project = await window.websim.getProject(projectId);
+        if (!project || !project.lore) return null;
+        project.lore[feature] = !project.lore[feature];
+        await window.websim.updateProject(project);
+        return !!project.lore[feature];
+    }"""
 
 class ApiManager:
+    FEATURE_TIMEOUT = 15
+
     def __init__(self, browser):
         self.browser = browser
         self.menu = QMenu(browser)
@@ -68,27 +81,24 @@ class ApiManager:
         current_url = self.browser.web_view.url().toString()
         if "/project/" in current_url:
             project_id = current_url.split("/project/")[1].split("/")[0]
-            # Execute JavaScript to toggle the feature
-            script = f"""
-            async function toggleFeature() {{
-                const project = await window.websim.getProject('{project_id}');
-                if (project && project.lore) {{
-                    project.lore['{feature}'] = !project.lore['{feature}'];
-                    await window.websim.updateProject(project);
-                    return true;
-                }}
-                return false;
-            }}
-            toggleFeature();
-            """
-            self.browser.web_view.page().runJavaScript(script, lambda result: 
-                QMessageBox.information(self.browser, "Success", f"Feature {'enabled' if result else 'disabled'}.")
-                if result is not None else
-                QMessageBox.warning(self.browser, "Error", "Could not toggle feature. Please try again.")
-            )
+            spawn(self.toggle_feature(self.browser.web_view.page(), project_id, feature))
         else:
             QMessageBox.information(self.browser, "Info", "Please open a project first to modify features.")
 
+    async def toggle_feature(self, page, project_id, feature):
+        """Await the page handler's promise, which resolves over the bridge with the feature's new state"""
+        try:
+            enabled = await self.browser.bridge_manager.call(page, "project.toggleFeature", project_id, feature,
+                                                             timeout=self.FEATURE_TIMEOUT)
+        except (RuntimeError, asyncio.TimeoutError) as e:
+            print(f"Could not toggle {feature}: {str(e)}")
+            enabled = None
+        if enabled is not None:
+            await message_box(self.browser, "Success", f"Feature {'enabled' if enabled else 'disabled'}.")
+        else:
+            await message_box(self.browser, "Error", "Could not toggle feature. Please try again.",
+                              QMessageBox.Icon.Warning)
+
     def open_editor_settings(self):
         """Open editor settings"""
         self.browser.web_view.setUrl(QUrl("https://websim.ai/settings/editor"))
@@ -0,0 +1,158 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from PyQt6.QtCore import QObject, QStandardPaths, pyqtSignal
+from .async_runtime import spawn, run_blocking
+from .storage_layout import APP_DIR
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+DEFAULT_ICON = os.path.join(ASSETS_DIR, "favicon.ico")
+
+LOGO_NAME = "websim_logo"
+LOGO_URLS = [
+    "https://websim.ai/favicon.ico",
+    "https://websim.ai/favicon.png",
+    "https://websim.ai/logo.png"
+]
+
+class AssetCache:
+    """Versioned on-disk cache for downloaded assets with ETag/Last-Modified revalidation"""
+    # Bump when the cache layout changes so old entries are ignored
+    VERSION = 1
+
+    def __init__(self, cache_dir=None, timeout=5.0):
+        # The install directory is often read-only, so downloads go to the user's cache
+        root = cache_dir or os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation), APP_DIR, "assets")
+        self.cache_dir = os.path.join(root, f"v{self.VERSION}")
+        self.timeout = timeout
+
+    def _paths(self, name):
+        return (os.path.join(self.cache_dir, name),
+                os.path.join(self.cache_dir, name + ".json"))
+
+    def _read_meta(self, name):
+        _, meta_path = self._paths(name)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def cached(self, name):
+        """Return the cached file for an asset, or None if there is none"""
+        data_path, _ = self._paths(name)
+        if self._read_meta(name) is None or not os.path.exists(data_path):
+            return None
+        if os.path.getsize(data_path) == 0:
+            return None
+        return data_path
+
+    def _store(self, name, url, body, headers):
+        """Write the asset and its validators atomically"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, meta_path = self._paths(name)
+        with open(data_path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(data_path + ".tmp", data_path)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified")
+        }
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        return data_path
+
+    def _request(self, url, meta=None):
+        """Fetch a URL, returning (status, body, headers); 304 comes back with no body"""
+        request = urllib.request.Request(url)
+        if meta:
+            if meta.get("etag"):
+                request.add_header("If-None-Match", meta["etag"])
+            if meta.get("last_modified"):
+                request.add_header("If-Modified-Since", meta["last_modified"])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, b"", e.headers
+            raise
+
+    def revalidate(self, name):
+        """Revalidate a cached asset; return (path, changed) or (None, False) if it is not cached"""
+        meta = self._read_meta(name)
+        data_path = self.cached(name)
+        if meta is None or data_path is None:
+            return None, False
+        try:
+            status, body, headers = self._request(meta["url"], meta)
+        except (OSError, ValueError):
+            # Offline or server error: the cached copy is still good
+            return data_path, False
+        if status == 304 or not body:
+            return data_path, False
+        return self._store(name, meta["url"], body, headers), True
+
+    def fetch(self, name, urls):
+        """Fetch all candidate URLs concurrently and cache the first usable response"""
+        if not urls:
+            return None
+        # Not a with block: its exit would wait for the slowest mirror after the first answered
+        pool = ThreadPoolExecutor(max_workers=len(urls))
+        try:
+            pending = {pool.submit(self._request, url): url for url in urls}
+            deadline = time.monotonic() + self.timeout
+            while pending:
+                done, _ = wait(pending, timeout=max(0, deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        status, body, headers = future.result()
+                    except (OSError, ValueError):
+                        continue
+                    if status == 200 and body:
+                        return self._store(name, url, body, headers)
+            return None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def get(self, name, urls):
+        """Return a fresh path for an asset, revalidating or fetching as needed"""
+        path, _ = self.revalidate(name)
+        return path or self.fetch(name, urls)
+
+class AssetLoader(QObject):
+    """Load startup assets off the GUI thread and report them on it"""
+    assetReady = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, cache=None):
+        super().__init__(parent)
+        self.cache = cache or AssetCache()
+
+    def start(self, name, urls):
+        """Start loading an asset; assetReady fires for the cached copy and again if it changes"""
+        return spawn(self.load(name, urls))
+
+    async def load(self, name, urls):
+        try:
+            cached = await run_blocking(self.cache.cached, name)
+            if cached:
+                self.assetReady.emit(name, cached)
+                path, changed = await run_blocking(self.cache.revalidate, name)
+                if changed:
+                    self.assetReady.emit(name, path)
+                return
+            path = await run_blocking(self.cache.fetch, name, urls)
+            if path:
+                self.assetReady.emit(name, path)
+        except Exception as e:
+            print(f"Could not load asset {name}: {str(e)}")
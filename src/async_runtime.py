@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import urllib.request
+from concurrent.futures import Executor, Future
+import qasync
+from PyQt6.QtWidgets import QInputDialog, QMessageBox
+
+# Running tasks; the loop itself only keeps weak references to them
+TASKS = set()
+
+class DaemonExecutor(Executor):
+    """Run each call on its own daemon thread
+
+    Closing the loop shuts its default executor down and waits for it; with daemon
+    threads and nothing to wait for, quitting never hangs on a slow fetch or disk walk.
+    """
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+def install_event_loop(app):
+    """Make a qasync loop, driven by the Qt event loop, the current asyncio loop"""
+    loop = qasync.QEventLoop(app)
+    loop.set_default_executor(DaemonExecutor())
+    asyncio.set_event_loop(loop)
+    return loop
+
+def run_event_loop(app):
+    """Run the application until it quits; replaces app.exec()"""
+    loop = asyncio.get_event_loop()
+    quit_event = asyncio.Event()
+    app.aboutToQuit.connect(quit_event.set)
+    with loop:
+        loop.run_until_complete(quit_event.wait())
+        for task in list(TASKS):
+            task.cancel()
+    return 0
+
+def _task_done(task):
+    TASKS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Background task failed: {task.exception()!r}")
+
+def spawn(coro):
+    """Schedule a coroutine on the GUI thread's loop; failures are printed rather than lost"""
+    task = asyncio.get_event_loop().create_task(coro)
+    TASKS.add(task)
+    task.add_done_callback(_task_done)
+    return task
+
+async def run_blocking(func, *args, timeout=None):
+    """Run blocking disk or network work on a worker thread
+
+    Cancelling or timing out stops the wait; the worker finishes on its own and its
+    result is dropped.
+    """
+    return await asyncio.wait_for(asyncio.to_thread(func, *args), timeout)
+
+async def fetch_url(url, timeout, headers=None):
+    """(body, response headers) for a GET, bounded by timeout as a whole"""
+    def get():
+        request = urllib.request.Request(url, headers=headers or {})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read(), response.headers
+    return await run_blocking(get, timeout=timeout)
+
+async def wait_signal(signal, timeout=None):
+    """Wait for the next emission of a Qt signal and return its arguments"""
+    future = asyncio.get_running_loop().create_future()
+    def receive(*args):
+        if not future.done():
+            future.set_result(args[0] if len(args) == 1 else args)
+    signal.connect(receive)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    finally:
+        try:
+            signal.disconnect(receive)
+        except (TypeError, RuntimeError):
+            # The sender was deleted in the meantime
+            pass
+
+async def get_text(parent, title, label):
+    """Window-modal text prompt that doesn't start a nested event loop; None if cancelled"""
+    dialog = QInputDialog(parent)
+    dialog.setWindowTitle(title)
+    dialog.setLabelText(label)
+    dialog.open()
+    try:
+        accepted = await wait_signal(dialog.finished) == QInputDialog.DialogCode.Accepted.value
+        return dialog.textValue() if accepted else None
+    finally:
+        dialog.deleteLater()
+
+async def message_box(parent, title, text, icon=QMessageBox.Icon.Information):
+    """Show a message without blocking the loop and wait until it is dismissed"""
+    box = QMessageBox(icon, title, text, QMessageBox.StandardButton.Ok, parent)
+    box.open()
+    try:
+        await wait_signal(box.finished)
+    finally:
+        box.deleteLater()
@@ -0,0 +1,157 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+                           QLabel, QCheckBox, QComboBox, QMessageBox)
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from .http_cache_index import (KIND_LABELS, scan_cache, select_entries, schedule_removal)
+from .plugin_manager import project_key
+from .power_saver import page_frames
+from .request_telemetry import origin_of
+from .async_runtime import spawn, run_blocking
+
+AGE_CHOICES = [
+    ("Any age", None),
+    ("Older than 1 hour", 3600),
+    ("Older than 1 day", 86400),
+    ("Older than 1 week", 7 * 86400),
+    ("Older than 30 days", 30 * 86400)
+]
+
+EVERYTHING = "everything"
+PROJECT = "project"
+
+class ClearCacheDialog(QDialog):
+    """Clear part of the HTTP cache by scope, resource type and age, showing what it frees"""
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.browser = browser
+        self.entries = None
+        self.setWindowTitle("Clear Cache")
+
+        layout = QVBoxLayout()
+
+        scope_layout = QHBoxLayout()
+        scope_layout.addWidget(QLabel("Clear:"))
+        self.scope = QComboBox()
+        self.scope.addItem("Everything", EVERYTHING)
+        self.project = project_key(browser.web_view.url())
+        self.scope.addItem(f"This project ({self.project})", PROJECT)
+        scope_layout.addWidget(self.scope)
+        layout.addLayout(scope_layout)
+
+        self.kinds = {}
+        for kind, label in KIND_LABELS.items():
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(True)
+            checkbox.toggled.connect(self.update_estimate)
+            self.kinds[kind] = checkbox
+            layout.addWidget(checkbox)
+
+        self.age = QComboBox()
+        for label, seconds in AGE_CHOICES:
+            self.age.addItem(label, seconds)
+        layout.addWidget(self.age)
+
+        self.estimate = QLabel("Measuring cache...")
+        layout.addWidget(self.estimate)
+
+        button_layout = QHBoxLayout()
+        self.clear_button = QPushButton("Clear")
+        self.clear_button.clicked.connect(self.clear)
+        # Only clearing everything can be done before the scan has listed the cache
+        self.clear_button.setEnabled(self.clears_everything())
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.clear_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.scope.currentIndexChanged.connect(self.update_estimate)
+        self.age.currentIndexChanged.connect(self.update_estimate)
+        self.cache_path = browser.profile.cachePath()
+        spawn(self.scan())
+
+    async def scan(self):
+        try:
+            entries = await run_blocking(scan_cache, self.cache_path)
+        except Exception as e:
+            print(f"Cache scan failed: {str(e)}")
+            self.estimate.setText("Could not measure the cache")
+            return
+        self.on_scanned(entries)
+
+    def on_scanned(self, entries):
+        self.entries = entries
+        # One scope entry per origin, biggest first
+        sizes = {}
+        for entry in entries:
+            sizes[entry.origin] = sizes.get(entry.origin, 0) + entry.size
+        for origin, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            if origin is not None:
+                self.scope.addItem(f"{origin} ({size / 2**20:.1f} MB)", origin)
+        self.update_estimate()
+
+    def project_origins(self):
+        """Origins whose frames were last opened from the current project"""
+        storage_gc = getattr(self.browser, "storage_gc", None)
+        if storage_gc is None:
+            return set()
+        return {origin for origin, entry in storage_gc.access.items() if entry.get("project") == self.project}
+
+    def selected_kinds(self):
+        return tuple(kind for kind, checkbox in self.kinds.items() if checkbox.isChecked())
+
+    def clears_everything(self):
+        return (self.scope.currentData() == EVERYTHING and self.age.currentData() is None
+                and len(self.selected_kinds()) == len(KIND_LABELS))
+
+    def selection(self):
+        scope = self.scope.currentData()
+        options = {"kinds": self.selected_kinds(), "older_than": self.age.currentData()}
+        if scope == PROJECT:
+            options["origins"] = self.project_origins()
+            options["url_prefixes"] = (self.project,)
+        elif scope != EVERYTHING:
+            options["origins"] = {scope}
+        return select_entries(self.entries, **options)
+
+    def update_estimate(self):
+        if self.entries is None:
+            self.clear_button.setEnabled(self.clears_everything())
+            return
+        selected = self.selection()
+        size = sum(entry.size for entry in selected)
+        self.estimate.setText(f"Frees about {size / 2**20:.1f} MB ({len(selected)} of {len(self.entries)} cached files)")
+        self.clear_button.setEnabled(bool(selected) or self.clears_everything())
+
+    def clear(self):
+        profile = self.browser.profile
+        if self.clears_everything():
+            profile.clearHttpCache()
+            profile.clearAllVisitedLinks()
+            QMessageBox.information(self, "Success", "Cache cleared successfully!")
+        elif self.entries is not None:
+            selected = self.selection()
+            size, count = schedule_removal(selected, self.cache_path)
+            reloaded = self.reload_pages({entry.origin for entry in selected})
+            message = f"{count} cached files ({size / 2**20:.1f} MB) will be removed the next time the browser starts."
+            if reloaded:
+                message += f" {reloaded} open pages using them were reloaded from the network."
+            QMessageBox.information(self, "Success", message)
+        else:
+            return
+        self.accept()
+
+    def reload_pages(self, origins):
+        """Reload, bypassing the cache, every open page with a frame on one of origins
+
+        The files themselves can only go once the cache is closed at the next start.
+        """
+        tabs = getattr(self.browser, "tabs", None)
+        views = tabs.views() if tabs is not None else [self.browser.web_view]
+        reloaded = 0
+        for view in views:
+            page = view.page()
+            if any(origin_of(frame.url().toString()) in origins for frame in page_frames(page)):
+                page.triggerAction(QWebEnginePage.WebAction.ReloadAndBypassCache)
+                reloaded += 1
+        return reloaded
@@ -1,35 +1,96 @@
 class DatabaseHandler:
+    SCRIPT_NAME = "databaseFunctionality"
+    BRIDGE_CALL = "database.open"
+
     @staticmethod
     def extract_project_id(url):
-        """Extract project ID from URL (not needed for test message)"""
-        return None
+        """Extract project ID from URL, or an empty string if there is none"""
+        if "/project/" in url:
+            return url.split("/project/")[-1].split("/")[0]
+        return ""
 
     @staticmethod
-    def get_injection_script(project_id=None):
-        """Return a simple script that injects test message"""
+    def get_injection_script():
+        """Return the script that defines injectDatabaseFunctionality in the page
+
+        It is installed once through the page script registry and called through the page
+        bridge, so no script is compiled per click.
+        """
         return """
-        function injectDatabaseFunctionality() {
-            // Create a div element
-            const div = document.createElement('div');
-            div.style.position = 'fixed';
-            div.style.bottom = '20px';
-            div.style.right = '20px';
-            div.style.backgroundColor = '#4CAF50';
-            div.style.color = 'white';
-            div.style.padding = '10px';
-            div.style.borderRadius = '5px';
-            div.style.zIndex = '9999';
-            div.style.fontFamily = 'Arial, sans-serif';
-            div.textContent = 'test123 by @Trey6383';
-            
-            // Add div to the page
-            document.body.appendChild(div);
-            
-            // Fade out after 3 seconds
-            setTimeout(() => {
-                div.style.transition = 'opacity 1s';
-                div.style.opacity = '0';
-                setTimeout(() => div.remove(), 1000);
-            }, 3000);
-        }
-        """
\ No newline at end of file
+        window.injectDatabaseFunctionality = function(projectId) {
+            // Get the current project context
+            if (!projectId) {
+                projectId = document.querySelector('[data-project-id]')?.dataset.projectId;
+            }
+
+            // Get the current websim origin
+            let baseUrl = window.location.origin;
+
+            // Create database window
+            let dbWindow = window.open(
+                baseUrl + '/database' + (projectId ? '?project=' + projectId : ''),
+                'WebSimDatabase',
+                'width=800,height=800,resizable=yes,scrollbars=yes,status=yes'
+            );
+
+            // Add window features
+            if (dbWindow) {
+                // Inject custom styles and functionality
+                dbWindow.addEventListener('DOMContentLoaded', function() {
+                    // Add custom styles
+                    const style = dbWindow.document.createElement('style');
+                    style.textContent = `
+                        body { font-family: 'Segoe UI', sans-serif; }
+                        .websim-db-header {
+                            background: #4CAF50;
+                            color: white;
+                            padding: 10px;
+                            position: sticky;
+                            top: 0;
+                            z-index: 1000;
+                        }
+                        .websim-db-content {
+                            padding: 20px;
+                        }
+                        .websim-db-button {
+                            background: #4CAF50;
+                            color: white;
+                            border: none;
+                            padding: 8px 16px;
+                            border-radius: 4px;
+                            cursor: pointer;
+                            margin: 5px;
+                        }
+                        .websim-db-button:hover {
+                            background: #45a049;
+                        }
+                    `;
+                    dbWindow.document.head.appendChild(style);
+
+                    // Add header
+                    const header = dbWindow.document.createElement('div');
+                    header.className = 'websim-db-header';
+                    header.innerHTML = `
+                        <h2>WebSim Database</h2>
+                        <div>Project ID: ${projectId || 'None'}</div>
+                    `;
+                    dbWindow.document.body.insertBefore(header, dbWindow.document.body.firstChild);
+
+                    // Add functionality to sync with main window
+                    const syncButton = dbWindow.document.createElement('button');
+                    syncButton.className = 'websim-db-button';
+                    syncButton.textContent = 'Sync with Project';
+                    syncButton.onclick = function() {
+                        // Refresh the database content
+                        dbWindow.location.reload();
+                    };
+                    header.appendChild(syncButton);
+                });
+            }
+        };
+        """
+
+    @staticmethod
+    def get_bridge_handler():
+        """Return the page bridge handler for BRIDGE_CALL"""
+        return "projectId => window.injectDatabaseFunctionality(projectId)"
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import struct
+import time
+from .request_telemetry import origin_of
+
+# Chromium's simple cache backend keeps one <hash>_0 file per entry, plus _1 and _s for streams
+ENTRY_FILE = re.compile(r"^([0-9a-f]{16})_([0-9s])$")
+SIMPLE_MAGIC = 0xfcfb6d1ba7725c30
+PENDING_FILE = "pending_removals.json"
+
+DOCUMENT = "document"
+STATIC = "static"
+
+KIND_LABELS = {
+    DOCUMENT: "Pages and API responses",
+    STATIC: "Static assets (scripts, styles, fonts, images, models)"
+}
+
+STATIC_EXTENSIONS = {
+    "js", "mjs", "css", "woff", "woff2", "ttf", "otf", "eot",
+    "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico",
+    "glb", "gltf", "bin", "obj", "fbx", "hdr", "ktx2", "basis", "wasm",
+    "mp3", "ogg", "wav", "m4a", "mp4", "webm"
+}
+
+def classify(url):
+    """Static asset or document/API response, judged by the path extension"""
+    path = url.split("?", 1)[0].split("#", 1)[0]
+    extension = path.rsplit("/", 1)[-1].rpartition(".")[2].lower()
+    return STATIC if extension in STATIC_EXTENSIONS else DOCUMENT
+
+def read_entry_url(path):
+    """URL stored in a simple cache entry file, or None if it isn't one"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(4096)
+    except OSError:
+        return None
+    if len(data) < 20 or struct.unpack_from("<Q", data)[0] != SIMPLE_MAGIC:
+        return None
+    key_length = struct.unpack_from("<I", data, 12)[0]
+    # The header is 20 bytes of fields, padded to 24 on most builds
+    for offset in (24, 20):
+        key = data[offset:offset + key_length].decode("utf-8", "replace")
+        # Keys are prefixed with the network isolation key; the URL itself comes last
+        url = key.rsplit(" ", 1)[-1]
+        start = url.find("http")
+        if start >= 0:
+            return url[start:]
+    return None
+
+class CacheEntry:
+    __slots__ = ("url", "origin", "kind", "size", "mtime", "files")
+
+    def __init__(self, url, files):
+        self.url = url
+        self.origin = origin_of(url)
+        self.kind = classify(url)
+        self.files = files
+        self.size = 0
+        self.mtime = 0
+        for path in files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            self.size += stat.st_size
+            self.mtime = max(self.mtime, stat.st_mtime)
+
+def scan_cache(cache_path):
+    """Every entry in the HTTP disk cache below cache_path"""
+    groups = {}
+    for root, _, files in os.walk(cache_path):
+        for name in files:
+            match = ENTRY_FILE.match(name)
+            if match:
+                groups.setdefault((root, match.group(1)), []).append(os.path.join(root, name))
+    entries = []
+    for (root, entry_hash), files in groups.items():
+        url = read_entry_url(os.path.join(root, f"{entry_hash}_0"))
+        if url is not None:
+            entries.append(CacheEntry(url, files))
+    return entries
+
+def select_entries(entries, origins=None, url_prefixes=(), kinds=(DOCUMENT, STATIC), older_than=None, now=None):
+    """Entries matching every given filter
+
+    origins and url_prefixes together form the scope: an entry is in scope if its origin is
+    listed or its URL, without scheme, starts with one of the prefixes. With neither given
+    every entry is in scope. older_than is an age in seconds.
+    """
+    now = time.time() if now is None else now
+    scoped = origins is not None or url_prefixes
+    selected = []
+    for entry in entries:
+        if entry.kind not in kinds:
+            continue
+        if older_than is not None and now - entry.mtime < older_than:
+            continue
+        if scoped:
+            bare = entry.url.split("://", 1)[-1]
+            if not ((origins and entry.origin in origins) or any(bare.startswith(p) for p in url_prefixes)):
+                continue
+        selected.append(entry)
+    return selected
+
+def schedule_removal(entries, cache_path):
+    """Queue entry files for deletion at the next start, before the engine opens its cache
+
+    The running engine owns the files and keeps its index in memory, so deleting them now
+    would leave that index stale. Returns (bytes scheduled, number of entries).
+    """
+    pending_path = os.path.join(cache_path, PENDING_FILE)
+    try:
+        with open(pending_path, "r") as f:
+            pending = json.load(f)
+    except (OSError, ValueError):
+        pending = []
+    queued = set(pending)
+    for entry in entries:
+        pending.extend(path for path in entry.files if path not in queued)
+        queued.update(entry.files)
+    with open(pending_path + ".tmp", "w") as f:
+        json.dump(pending, f)
+    os.replace(pending_path + ".tmp", pending_path)
+    return sum(entry.size for entry in entries), len(entries)
+
+def apply_pending_removals(cache_path):
+    """Remove entries queued by schedule_removal; call before the profile opens its cache"""
+    pending_path = os.path.join(cache_path, PENDING_FILE)
+    try:
+        with open(pending_path, "r") as f:
+            pending = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    for path in pending + [pending_path]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    print(f"Removed {len(pending)} deferred cache files")
+    return len(pending)
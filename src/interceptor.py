@@ -1,15 +1,74 @@
-from PyQt6.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+from PyQt6.QtCore import QUrl
+from PyQt6.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+from .request_filter import RequestFilter, DEFAULT_RULES_PATH, same_site
+from .library_store import is_library_url, to_local_url
+from .offline_bundles import SCHEME as BUNDLE_SCHEME, to_bundle_url
+
+ResourceType = QWebEngineUrlRequestInfo.ResourceType
+# Subresources that may be served from the local library store
+LIBRARY_RESOURCE_TYPES = {
+    ResourceType.ResourceTypeScript,
+    ResourceType.ResourceTypeStylesheet,
+    ResourceType.ResourceTypeFontResource
+}
+# Opening a listed site on purpose is never blocked, only what other pages load from it
+NAVIGATION_TYPES = {
+    ResourceType.ResourceTypeMainFrame,
+    ResourceType.ResourceTypeSubFrame
+}
 
 class ChromeRequestInterceptor(QWebEngineUrlRequestInterceptor):
-    def __init__(self, chrome_version):
+    def __init__(self, chrome_version, rules_path=DEFAULT_RULES_PATH):
         super().__init__()
         self.chrome_version = chrome_version
-        
+        # Built once here; interceptRequest runs for every subresource
+        self.sec_ch_ua = (
+            f'"Not_A Brand";v="8", "Chromium";v="{chrome_version}", "Google Chrome";v="{chrome_version}"'
+        ).encode()
+        self.request_filter = RequestFilter.from_file(rules_path)
+        self.blocked_count = 0
+        # Optional RequestRecorder; recording never blocks this thread
+        self.recorder = None
+        # Set once the websimlib:// handler is installed on the profile
+        self.serve_libraries = False
+        # URLs with a known-good digest, served locally whatever CDN they are on
+        self.library_pins = {}
+        # Set once the websimbundle:// handler is installed; bundle pages never reach the network
+        self.serve_bundles = False
+        self.bundle_scheme = BUNDLE_SCHEME.decode()
+
+    def load_rules(self, rules_path):
+        """Swap in a new rule set; the old one keeps serving until the new one is compiled"""
+        self.request_filter = RequestFilter.from_file(rules_path)
+
     def interceptRequest(self, info):
+        url = info.requestUrl()
+        host = url.host()
+        url_string = url.toString()
+        blocked, headers = self.request_filter.match(host, url_string)
+        if blocked and (info.resourceType() in NAVIGATION_TYPES or same_site(host, info.firstPartyUrl().host())):
+            blocked = False
+        if self.recorder is not None:
+            self.recorder.record(url_string, host, info.requestMethod(), info.resourceType(),
+                                 info.navigationType(), info.initiator(), info.firstPartyUrl(), blocked)
+        if blocked:
+            self.blocked_count += 1
+            info.block(True)
+            return
+
+        if self.serve_bundles and info.firstPartyUrl().scheme() == self.bundle_scheme \
+                and url.scheme() in ("http", "https"):
+            info.redirect(QUrl(to_bundle_url(url_string)))
+            return
+
+        if self.serve_libraries and (is_library_url(host, url_string) or url_string in self.library_pins) \
+                and info.resourceType() in LIBRARY_RESOURCE_TYPES:
+            info.redirect(QUrl(to_local_url(url_string)))
+            return
+
         # Add Chrome-specific headers
-        info.setHttpHeader(
-            b"sec-ch-ua",
-            f'"Not_A Brand";v="8", "Chromium";v="{self.chrome_version}", "Google Chrome";v="{self.chrome_version}"'.encode()
-        )
+        info.setHttpHeader(b"sec-ch-ua", self.sec_ch_ua)
         info.setHttpHeader(b"sec-ch-ua-mobile", b"?0")
-        info.setHttpHeader(b"sec-ch-ua-platform", b'"Windows"') 
\ No newline at end of file
+        info.setHttpHeader(b"sec-ch-ua-platform", b'"Windows"')
+        for name, value in headers:
+            info.setHttpHeader(name, value)
@@ -0,0 +1,263 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import urllib.request
+from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtWebEngineCore import (QWebEngineUrlScheme, QWebEngineUrlSchemeHandler,
+                                   QWebEngineUrlRequestJob)
+from .async_runtime import spawn, run_blocking
+
+SCHEME = b"websimlib"
+DEFAULT_PINS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "assets", "library_pins.txt")
+
+# Public CDNs that publish a digest for every file they serve, so a download can be
+# checked against something other than itself. Other URLs are only stored if pinned.
+LIBRARY_HOSTS = {
+    "cdn.jsdelivr.net",
+    "unpkg.com",
+    "cdnjs.cloudflare.com"
+}
+# A pinned version in the path, e.g. three@0.160.0 or /ajax/libs/tone/14.8.49/
+VERSIONED_PATH = re.compile(r"[@/]v?\d+\.\d+\.\d+")
+# npm files as served by jsDelivr and unpkg: (package, version, path)
+NPM_FILE = re.compile(r"^https://(?:cdn\.jsdelivr\.net/npm|unpkg\.com)/((?:@[^/@]+/)?[^/@]+)@([^/]+)(/.+)$")
+CDNJS_FILE = re.compile(r"^https://cdnjs\.cloudflare\.com/ajax/libs/([^/]+)/([^/]+)/(.+)$")
+NPM_LISTING_URL = "https://data.jsdelivr.com/v1/packages/npm/{package}@{version}?structure=flat"
+CDNJS_LISTING_URL = "https://api.cdnjs.com/libraries/{library}/{version}?fields=sri"
+SHA256_HEX = re.compile(r"^[0-9a-fA-F]{64}$")
+SRI_ALGORITHMS = ("sha256", "sha384", "sha512")
+FETCH_TIMEOUT = 15
+
+def register_library_scheme():
+    """Register websimlib://; must run before QApplication is created"""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setDefaultPort(QWebEngineUrlScheme.SpecialPort.PortUnspecified.value)
+    # Secure so https pages can load from it, CORS so module scripts and fonts are allowed
+    scheme.setFlags(QWebEngineUrlScheme.Flag.SecureScheme |
+                    QWebEngineUrlScheme.Flag.CorsEnabled |
+                    QWebEngineUrlScheme.Flag.FetchApiAllowed)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+def is_library_url(host, url):
+    """True for a versioned https URL on a CDN that publishes file digests"""
+    if host not in LIBRARY_HOSTS or not url.startswith("https://") or VERSIONED_PATH.search(url) is None:
+        return False
+    return NPM_FILE.match(url) is not None or CDNJS_FILE.match(url) is not None
+
+def to_local_url(url):
+    """https://cdn/... -> websimlib://cdn/...; keeps host and path so relative imports still resolve"""
+    return SCHEME.decode() + url[len("https"):]
+
+def to_remote_url(url):
+    return "https" + url[len(SCHEME):]
+
+def load_pins(path):
+    """Known-good digests from a sha256sum-style file: '<sha256>  <url>' per line
+
+    The digest may also be written as an SRI string (sha256-, sha384- or sha512-<base64>).
+    """
+    pins = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                digest, _, url = line.partition(" ")
+                if SHA256_HEX.match(digest):
+                    digest = "sha256-" + base64.b64encode(bytes.fromhex(digest)).decode("ascii")
+                elif digest.partition("-")[0] not in SRI_ALGORITHMS:
+                    print(f"Ignoring library pin with an unknown digest: {line}")
+                    continue
+                pins[url.strip()] = digest
+    except OSError:
+        pass
+    return pins
+
+def matches_integrity(data, integrity):
+    """True if data matches an SRI string like sha384-<base64>"""
+    algorithm, _, expected = integrity.partition("-")
+    if algorithm not in SRI_ALGORITHMS:
+        return False
+    return base64.b64encode(hashlib.new(algorithm, data).digest()).decode("ascii") == expected
+
+def published_integrity(url, user_agent, listings=None):
+    """The digest the CDN publishes for url, as an SRI string, or None if it has none
+
+    jsDelivr lists a sha256 for every file of an npm package version (unpkg serves the same
+    files), and cdnjs an SRI hash per file. listings caches the parsed listings by URL.
+    """
+    listings = {} if listings is None else listings
+    npm = NPM_FILE.match(url)
+    cdnjs = CDNJS_FILE.match(url)
+    if npm is not None:
+        package, version, path = npm.groups()
+        listing_url = NPM_LISTING_URL.format(package=package, version=version)
+    elif cdnjs is not None:
+        library, version, path = cdnjs.groups()
+        listing_url = CDNJS_LISTING_URL.format(library=library, version=version)
+    else:
+        return None
+    if listing_url not in listings:
+        request = urllib.request.Request(listing_url, headers={"User-Agent": user_agent})
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            listing = json.load(response)
+        if npm is not None:
+            listings[listing_url] = {entry["name"]: "sha256-" + entry["hash"] for entry in listing.get("files", [])}
+        else:
+            listings[listing_url] = {"/" + name: sri for name, sri in listing.get("sri", {}).items()}
+    return listings[listing_url].get(path if path.startswith("/") else "/" + path)
+
+def reply_job(job, data, content_type):
+    """Answer a scheme handler job with data; pages on any origin may read it"""
+    # A QMultiMap: every header maps to a list of values
+    job.setAdditionalResponseHeaders({b"Access-Control-Allow-Origin": [b"*"]})
+    # The job owns the buffer so it lives exactly as long as the reply
+    buffer = QBuffer(job)
+    buffer.setData(data)
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    job.reply(content_type.encode("ascii", "replace"), buffer)
+
+class LibraryStore:
+    """Content-addressed store of CDN library files shared by every project
+
+    Each file is stored once under objects/<sha256> whatever URL or project it came from,
+    and an index maps URLs to digests. A file is only stored if it matches a digest from
+    outside the download: the pins file, or the digest the CDN publishes for it. Every read
+    is checked against the stored digest.
+    """
+    def __init__(self, store_dir, pins_path=DEFAULT_PINS_PATH):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, "objects")
+        self.index_path = os.path.join(store_dir, "index.json")
+        self.pins = load_pins(pins_path)
+        self.lock = threading.Lock()
+        self.index = self._load_index()
+        # Parsed CDN file listings, shared by the fetch threads
+        self.listings = {}
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(self.index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def get(self, url):
+        """Return (data, content_type) for a stored URL, or None on a miss or failed integrity check"""
+        with self.lock:
+            entry = self.index.get(url)
+        # Entries from before downloads were verified were trusted on first use; fetch them again
+        if entry is None or not entry.get("verified"):
+            return None
+        try:
+            with open(self._object_path(entry["sha256"]), "rb") as f:
+                data = f.read()
+        except OSError:
+            data = None
+        if data is None or hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            print(f"Library store integrity check failed for {url}")
+            with self.lock:
+                self.index.pop(url, None)
+                self._save_index()
+            return None
+        return data, entry["type"]
+
+    def expected_integrity(self, url, user_agent):
+        """The pinned or published digest for url, or None if there is nothing to check against"""
+        if url in self.pins:
+            return self.pins[url]
+        try:
+            return published_integrity(url, user_agent, self.listings)
+        except Exception as e:
+            print(f"Could not look up the published digest of {url}: {str(e)}")
+            return None
+
+    def put(self, url, data, content_type, user_agent):
+        """Store a fetched file that matches its pinned or published digest
+
+        Returns False if it doesn't match, so it isn't served either. A file with no digest
+        to check against is served but not stored.
+        """
+        integrity = self.expected_integrity(url, user_agent)
+        if integrity is None:
+            return True
+        if not matches_integrity(data, integrity):
+            print(f"Library {url} does not match its {'pinned' if url in self.pins else 'published'} digest, not storing it")
+            return False
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Fetch threads may store the same file at once; each writes its own temp file
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        with self.lock:
+            self.index[url] = {"sha256": digest, "type": content_type, "size": len(data), "verified": True}
+            self._save_index()
+        return True
+
+class LibrarySchemeHandler(QWebEngineUrlSchemeHandler):
+    """Serve websimlib:// from the store, fetching and storing a file the first time it is asked for"""
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        # Jobs waiting on a worker thread; a job deleted in the meantime is dropped here
+        self.pending = set()
+
+    def requestStarted(self, job):
+        remote_url = to_remote_url(job.requestUrl().toString())
+        self.pending.add(job)
+        job.destroyed.connect(lambda _=None, j=job: self.pending.discard(j))
+        # Send the profile's own user agent: some CDNs pick what they serve by it
+        user_agent = self.parent().httpUserAgent()
+        spawn(self.load(job, remote_url, user_agent))
+
+    async def load(self, job, url, user_agent):
+        # Reading and hashing a stored file happens on the worker too, not on the GUI thread
+        try:
+            data, content_type = await run_blocking(self._load, url, user_agent)
+        except Exception as e:
+            print(f"Could not fetch library {url}: {str(e)}")
+            data, content_type = None, ""
+        self.finish(job, data, content_type)
+
+    def _load(self, url, user_agent):
+        stored = self.store.get(url)
+        if stored is not None:
+            return stored
+        request = urllib.request.Request(url, headers={"User-Agent": user_agent})
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            data = response.read()
+            content_type = response.headers.get("Content-Type", "application/octet-stream")
+        host = url.split("://", 1)[1].split("/", 1)[0]
+        # Unversioned URLs reached through relative imports are served but not kept
+        if (url in self.store.pins or is_library_url(host, url)) \
+                and not self.store.put(url, data, content_type, user_agent):
+            data = None
+        return data, content_type
+
+    def finish(self, job, data, content_type):
+        if job not in self.pending:
+            return
+        self.pending.discard(job)
+        if data is None:
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+        else:
+            reply_job(job, data, content_type)
@@ -0,0 +1,171 @@
+import os
+import time
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QLabel
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def read_rss(pid):
+    """Resident set size of a process in bytes from /proc, or None if unavailable"""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _read_stat(pid):
+    """Return (name, ppid) from /proc/<pid>/stat"""
+    with open(f"/proc/{pid}/stat", "r") as f:
+        data = f.read()
+    # The name is in parentheses and may itself contain spaces or parentheses
+    name = data[data.index("(") + 1:data.rindex(")")]
+    ppid = int(data[data.rindex(")") + 2:].split()[1])
+    return name, ppid
+
+def descendant_pids(root_pid):
+    """All processes below root_pid, found by walking the /proc parent links"""
+    children = {}
+    names = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            name, ppid = _read_stat(entry)
+        except (OSError, ValueError):
+            continue
+        pid = int(entry)
+        names[pid] = name
+        children.setdefault(ppid, []).append(pid)
+    found = {}
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        found[pid] = names[pid]
+        stack.extend(children.get(pid, []))
+    return found
+
+class MemorySample:
+    def __init__(self, main_rss, renderer_rss):
+        self.time = time.time()
+        self.main_rss = main_rss or 0
+        # pid -> rss for every QtWebEngineProcess below the browser
+        self.renderer_rss = renderer_rss
+
+    @property
+    def renderers_total(self):
+        return sum(self.renderer_rss.values())
+
+    @property
+    def total(self):
+        return self.main_rss + self.renderers_total
+
+    def describe(self):
+        return (f"main {self.main_rss / 2**20:.0f} MB, "
+                f"{len(self.renderer_rss)} web processes {self.renderers_total / 2**20:.0f} MB")
+
+class MemoryMonitor(QObject):
+    """Sample browser and QtWebEngineProcess memory and step in when thresholds are crossed
+
+    Mitigations run in order, at most one per sample, each with its own threshold on the
+    total RSS: freeze hidden pages, then discard the least recently used page. Every action
+    is logged with the memory reading before it and one a few seconds after.
+    """
+    sampled = pyqtSignal(object)
+
+    INTERVAL_MS = 5000
+    AFTER_MS = 3000
+    # An action is not repeated within this many seconds
+    COOLDOWN = 60
+    # The full /proc walk for helper processes is repeated at most this often, or when a
+    # page reports a renderer that wasn't seen yet
+    RESCAN_SECONDS = 60
+    DEFAULT_THRESHOLDS_MB = {
+        "freeze": 1500,
+        "discard": 3000
+    }
+
+    def __init__(self, browser, settings=None):
+        super().__init__(browser)
+        self.browser = browser
+        self.thresholds = dict(self.DEFAULT_THRESHOLDS_MB)
+        if settings is not None:
+            for name, default in self.DEFAULT_THRESHOLDS_MB.items():
+                self.thresholds[name] = settings.value(f"memory/{name}_mb", default, type=int)
+        self.last_action = {}
+        self.last_sample = None
+        self.web_pids = set()
+        self.scanned_at = None
+
+        self.label = QLabel()
+        self.label.setToolTip("Memory used by the browser and its web processes")
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.INTERVAL_MS)
+        self.timer.timeout.connect(self.check)
+
+    def start(self):
+        self.timer.start()
+
+    def web_process_pids(self):
+        """Renderer pids straight from the pages, plus GPU and utility processes from a cached scan"""
+        tabs = getattr(self.browser, "tabs", None)
+        views = tabs.views() if tabs is not None else []
+        page_pids = {pid for pid in (view.page().renderProcessPid() for view in views) if pid > 0}
+        now = time.monotonic()
+        if self.scanned_at is None or now - self.scanned_at > self.RESCAN_SECONDS \
+                or not page_pids <= self.web_pids:
+            self.web_pids = {pid for pid, name in descendant_pids(os.getpid()).items() if "QtWebEngine" in name}
+            self.scanned_at = now
+        return self.web_pids | page_pids
+
+    def sample(self):
+        renderers = {}
+        for pid in self.web_process_pids():
+            rss = read_rss(pid)
+            if rss is not None:
+                renderers[pid] = rss
+            else:
+                # Exited since the last scan
+                self.web_pids.discard(pid)
+        return MemorySample(read_rss(os.getpid()), renderers)
+
+    def check(self):
+        """Take a sample, update the status widget and apply the next mitigation if needed"""
+        sample = self.sample()
+        self.last_sample = sample
+        self.label.setText(f"Memory: {sample.main_rss / 2**20:.0f} MB + "
+                           f"{sample.renderers_total / 2**20:.0f} MB web")
+        self.label.setToolTip(sample.describe())
+        self.sampled.emit(sample)
+
+        total_mb = sample.total / 2**20
+        now = time.monotonic()
+        for name, action in (("freeze", self.freeze_hidden_pages),
+                             ("discard", self.discard_lru_page)):
+            if total_mb < self.thresholds[name]:
+                break
+            if now - self.last_action.get(name, -self.COOLDOWN) < self.COOLDOWN:
+                continue
+            self.last_action[name] = now
+            result = action()
+            print(f"Memory {total_mb:.0f} MB over {name} threshold ({self.thresholds[name]} MB): "
+                  f"{result}; before: {sample.describe()}")
+            QTimer.singleShot(self.AFTER_MS, lambda n=name: print(f"Memory after {n}: {self.sample().describe()}"))
+            break
+
+    def freeze_hidden_pages(self):
+        tabs = getattr(self.browser, "tabs", None)
+        if tabs is None:
+            return "no hidden pages"
+        return f"froze {tabs.freeze_hidden_tabs()} hidden pages"
+
+    def discard_lru_page(self):
+        tabs = getattr(self.browser, "tabs", None)
+        view = tabs.discard_least_recently_used() if tabs is not None else None
+        if view is None:
+            return "no page could be discarded"
+        return f"discarded {view.url().toString()}"
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import urllib.request
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QUrl, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QMenu, QMessageBox
+from PyQt6.QtWebEngineCore import (QWebEngineUrlScheme, QWebEngineUrlSchemeHandler,
+                                   QWebEngineUrlRequestJob, QWebEngineDownloadRequest)
+from .plugin_manager import project_key
+from .library_store import reply_job
+from .async_runtime import spawn, run_blocking
+
+SCHEME = b"websimbundle"
+MANIFEST = "bundle.json"
+SNAPSHOT = "snapshot.mhtml"
+FETCH_TIMEOUT = 15
+FETCH_WORKERS = 8
+SNAPSHOT_TIMEOUT_MS = 15000
+# Already compressed; deflating them again only costs time
+STORED_TYPES = ("image/", "font/", "audio/", "video/", "application/wasm", "model/gltf-binary",
+                "application/zip", "application/octet-stream")
+
+def register_bundle_scheme():
+    """Register websimbundle://; must run before QApplication is created"""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setDefaultPort(QWebEngineUrlScheme.SpecialPort.PortUnspecified.value)
+    scheme.setFlags(QWebEngineUrlScheme.Flag.SecureScheme |
+                    QWebEngineUrlScheme.Flag.CorsEnabled |
+                    QWebEngineUrlScheme.Flag.FetchApiAllowed)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+def to_bundle_url(url):
+    """https://host/path -> websimbundle://host/path, so relative and root URLs stay in the bundle"""
+    return SCHEME.decode() + url[url.index(":"):]
+
+def from_bundle_url(url):
+    return "https" + url[len(SCHEME):].split("#", 1)[0]
+
+def bundle_file_name(project):
+    return re.sub(r"[^A-Za-z0-9@._-]+", "_", project).strip("_") + ".zip"
+
+def write_bundle(path, entry_url, project, resources, snapshot_path=None):
+    """Write one zip holding the manifest, each distinct resource body once and the snapshot
+
+    resources maps URL -> (body, content type). The zip's central directory is the index,
+    so a single resource can be read without touching the rest of the file.
+    """
+    manifest = {"version": 1, "project": project, "entry": entry_url, "created": time.time(), "resources": {}}
+    temp_path = path + ".tmp"
+    with zipfile.ZipFile(temp_path, "w") as archive:
+        written = set()
+        for url, (body, content_type) in resources.items():
+            digest = hashlib.sha256(body).hexdigest()
+            name = f"resources/{digest}"
+            if digest not in written:
+                compression = zipfile.ZIP_STORED if content_type.startswith(STORED_TYPES) else zipfile.ZIP_DEFLATED
+                archive.writestr(name, body, compress_type=compression)
+                written.add(digest)
+            manifest["resources"][url] = {"name": name, "type": content_type}
+        # An empty file means page.save never wrote the snapshot
+        if snapshot_path is not None and os.path.exists(snapshot_path) and os.path.getsize(snapshot_path) > 0:
+            archive.write(snapshot_path, SNAPSHOT, compress_type=zipfile.ZIP_DEFLATED)
+            manifest["snapshot"] = SNAPSHOT
+        archive.writestr(MANIFEST, json.dumps(manifest), compress_type=zipfile.ZIP_DEFLATED)
+    os.replace(temp_path, path)
+    return manifest
+
+class OfflineBundle:
+    """An exported project opened for reading"""
+    def __init__(self, path):
+        self.path = path
+        self.archive = zipfile.ZipFile(path, "r")
+        self.manifest = json.loads(self.archive.read(MANIFEST))
+        self.entry = self.manifest["entry"]
+        self.project = self.manifest["project"]
+        # Extracted snapshot, removed again when the bundle closes
+        self.snapshot_file = None
+
+    def read(self, url):
+        """(body, content type) for a URL in the bundle, or None"""
+        resource = self.manifest["resources"].get(url)
+        if resource is None:
+            return None
+        return self.archive.read(resource["name"]), resource["type"]
+
+    def snapshot_path(self):
+        """Extract the page.save snapshot to a private temp file and return its path, or None"""
+        if "snapshot" not in self.manifest:
+            return None
+        if self.snapshot_file is None:
+            fd, self.snapshot_file = tempfile.mkstemp(prefix="websim-", suffix=".mhtml")
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.archive.read(self.manifest["snapshot"]))
+        return self.snapshot_file
+
+    def close(self):
+        self.archive.close()
+        if self.snapshot_file is not None:
+            try:
+                os.remove(self.snapshot_file)
+            except OSError:
+                pass
+            self.snapshot_file = None
+
+class BundleLibrary:
+    """The bundles under one directory, indexed by the URLs they can answer"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.bundles = {}
+        # URL -> bundle; when two bundles hold a URL the newer one wins
+        self.index = {}
+        os.makedirs(directory, exist_ok=True)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".zip"):
+                self.load(os.path.join(directory, name))
+
+    def load(self, path):
+        old = self.bundles.pop(path, None)
+        if old is not None:
+            old.close()
+        try:
+            bundle = OfflineBundle(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            print(f"Could not open offline bundle {path}: {str(e)}")
+            return None
+        self.bundles[path] = bundle
+        self.index = {}
+        for other in sorted(self.bundles.values(), key=lambda b: b.manifest["created"]):
+            for url in other.manifest["resources"]:
+                self.index[url] = other
+        return bundle
+
+    def close(self):
+        for bundle in self.bundles.values():
+            bundle.close()
+
+    def path_for(self, project):
+        return os.path.join(self.directory, bundle_file_name(project))
+
+    def read(self, url):
+        bundle = self.index.get(url)
+        return bundle.read(url) if bundle is not None else None
+
+class BundleSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Answer websimbundle:// from the bundles only; nothing reaches the network"""
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.library = library
+
+    def requestStarted(self, job):
+        found = self.library.read(from_bundle_url(job.requestUrl().toString()))
+        if found is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        reply_job(job, *found)
+
+class BundleExporter(QObject):
+    """Export the current page: a page.save snapshot plus every resource the interceptor saw"""
+    exported = pyqtSignal(str, int, int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.browser = browser
+        self.job = None
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.setSingleShot(True)
+        self.snapshot_timer.setInterval(SNAPSHOT_TIMEOUT_MS)
+        self.snapshot_timer.timeout.connect(self.fetch_resources)
+        browser.profile.downloadRequested.connect(self.on_download_requested)
+
+    def export(self, page):
+        if self.job is not None:
+            return False
+        entry_url = page.url().toString()
+        urls = self.browser.request_recorder.page_resources(entry_url)
+        urls.add(entry_url.split("#", 1)[0])
+        # Created here so no other user can claim the name first; page.save overwrites it
+        fd, snapshot = tempfile.mkstemp(prefix="websim-export-", suffix=".mhtml")
+        os.close(fd)
+        self.job = {
+            "entry": entry_url,
+            "project": project_key(page.url()),
+            # Bundle URLs map back to https, so plain http resources can't be served offline
+            "urls": sorted(url for url in urls if url.startswith("https://")),
+            "user_agent": self.browser.profile.httpUserAgent(),
+            "snapshot": snapshot
+        }
+        self.snapshot_timer.start()
+        page.save(self.job["snapshot"], QWebEngineDownloadRequest.SavePageFormat.MimeHtmlSaveFormat)
+        return True
+
+    def on_download_requested(self, download):
+        if self.job is None or not download.isSavePageDownload():
+            return
+        download.isFinishedChanged.connect(lambda: self.fetch_resources() if download.isFinished() else None)
+
+    def fetch_resources(self):
+        """Continue once the snapshot is written (or gave up); the rest runs off the GUI thread"""
+        if self.job is None or self.job.get("fetching"):
+            return
+        self.job["fetching"] = True
+        self.snapshot_timer.stop()
+        spawn(self.build(dict(self.job)))
+
+    def _fetch(self, url, user_agent):
+        request = urllib.request.Request(url, headers={"User-Agent": user_agent})
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            return response.read(), response.headers.get("Content-Type", "application/octet-stream")
+
+    async def build(self, job):
+        try:
+            path, fetched = await run_blocking(self._build, job)
+            self.exported.emit(path, fetched, len(job["urls"]) - fetched)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            try:
+                os.remove(job["snapshot"])
+            except OSError:
+                pass
+
+    def _build(self, job):
+        """Fetch the recorded resources and write the bundle; (path, resources fetched)"""
+        resources = {}
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            futures = {url: pool.submit(self._fetch, url, job["user_agent"]) for url in job["urls"]}
+            for url, future in futures.items():
+                try:
+                    resources[url] = future.result()
+                except Exception as e:
+                    print(f"Offline bundle: skipped {url}: {str(e)}")
+        path = self.browser.bundle_library.path_for(job["project"])
+        write_bundle(path, job["entry"], job["project"], resources, job["snapshot"])
+        return path, len(resources)
+
+class BundleManager:
+    """Menu for exporting the current project and reopening exported ones"""
+    def __init__(self, browser):
+        self.browser = browser
+        self.library = browser.bundle_library
+        self.exporter = BundleExporter(browser)
+        self.exporter.exported.connect(self.on_exported)
+        self.exporter.failed.connect(self.on_failed)
+        self.menu = QMenu(browser)
+        self.menu.aboutToShow.connect(self.setup_menu)
+
+    def setup_menu(self):
+        self.menu.clear()
+        export = self.menu.addAction("Export this project for offline use")
+        export.setEnabled(self.exporter.job is None)
+        export.triggered.connect(self.export_current)
+        bundles = sorted(self.library.bundles.values(), key=lambda b: -b.manifest["created"])
+        if bundles:
+            self.menu.addSeparator()
+        for bundle in bundles:
+            action = self.menu.addAction(f"Open {bundle.project} offline")
+            action.triggered.connect(lambda checked, b=bundle: self.open_bundle(b))
+
+    def export_current(self):
+        if self.exporter.export(self.browser.web_view.page()):
+            self.browser.statusBar().showMessage("Exporting project for offline use...")
+
+    def on_exported(self, path, stored, missing):
+        self.exporter.job = None
+        self.library.load(path)
+        message = f"Saved {stored} resources to {os.path.basename(path)}"
+        if missing:
+            message += f"; {missing} could not be fetched and will be missing offline"
+        self.browser.statusBar().showMessage(message, 10000)
+
+    def on_failed(self, error):
+        self.exporter.job = None
+        QMessageBox.warning(self.browser, "Offline Bundle", f"Export failed: {error}")
+
+    def open_bundle(self, bundle):
+        """Open the bundle's live page, or its snapshot if the page itself couldn't be saved"""
+        entry = bundle.entry.split("#", 1)[0]
+        if entry in bundle.manifest["resources"]:
+            self.browser.tabs.new_tab(QUrl(to_bundle_url(bundle.entry)))
+            return
+        snapshot = bundle.snapshot_path()
+        if snapshot is not None:
+            self.browser.tabs.new_tab(QUrl.fromLocalFile(snapshot))
+        else:
+            QMessageBox.warning(self.browser, "Offline Bundle", "This bundle has no page to open.")
@@ -0,0 +1,302 @@
+import asyncio
+import json
+from PyQt6.QtCore import QObject, QFile, QIODevice, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtWebChannel import QWebChannel
+from PyQt6.QtWebEngineCore import QWebEngineScript
+from .plugin_manager import project_key
+
+SCRIPT_NAME = "websimBridge"
+MAIN_WORLD_SCRIPT_NAME = "websimBridgeMainWorld"
+CHANNEL_OBJECT = "websimBridge"
+BRIDGE_INCLUDES = ["https://websim.ai/*", "https://*.websim.ai/*", "websimbundle://*"]
+QWEBCHANNEL_JS = ":/qtwebchannel/qwebchannel.js"
+# The channel and the bridge live in their own world, out of reach of the page's scripts
+BRIDGE_WORLD = QWebEngineScript.ScriptWorldId.ApplicationWorld
+MAIN_CALL_EVENT = "websim-bridge-main-call"
+MAIN_REPLY_EVENT = "websim-bridge-main-reply"
+
+# Page side of the bridge. Calls made in one task are sent to Python as a single batch
+# from a microtask; Python answers in one batch per event-loop turn.
+BRIDGE_SCRIPT = """
+(function() {
+    if (window.websimBridge || typeof qt === 'undefined') return;
+%(qwebchannel)s
+    const queue = [];
+    const pending = new Map();
+    const handlers = new Map();
+    let nextId = 1;
+    let scheduled = false;
+    let remote = null;
+
+    function flush() {
+        scheduled = false;
+        if (remote && queue.length) remote.dispatch(JSON.stringify(queue.splice(0)));
+    }
+    function send(message) {
+        queue.push(message);
+        if (!scheduled) {
+            scheduled = true;
+            queueMicrotask(flush);
+        }
+    }
+    async function answer(message) {
+        try {
+            const handler = handlers.get(message.name);
+            if (!handler) throw new Error('No page handler for ' + message.name);
+            const value = await handler(...message.args);
+            // Round-trip here so a value that can't be sent rejects instead of breaking the batch
+            const json = JSON.stringify(value === undefined ? null : value);
+            if (message.id) send({reply: message.id, ok: true, value: JSON.parse(json)});
+        } catch (e) {
+            if (message.id) send({reply: message.id, ok: false, value: String(e && e.message || e)});
+            else console.error(e);
+        }
+    }
+    function receive(batch) {
+        for (const message of JSON.parse(batch)) {
+            if (message.reply) {
+                const call = pending.get(message.reply);
+                pending.delete(message.reply);
+                if (call) message.ok ? call.resolve(message.value) : call.reject(new Error(message.value));
+            } else {
+                answer(message);
+            }
+        }
+    }
+
+    window.websimBridge = {
+        // Call a Python handler; resolves with its return value
+        call(name, ...args) {
+            return new Promise((resolve, reject) => {
+                const id = nextId++;
+                pending.set(id, {resolve, reject});
+                send({id, name, args});
+            });
+        },
+        // Fire-and-forget, for events that need no answer
+        notify(name, ...args) {
+            send({name, args});
+        },
+        // Handle calls from Python; the handler may return a promise
+        on(name, handler) {
+            handlers.set(name, handler);
+        }
+    };
+
+    // Handlers that need the page's own globals run in the main world; the worlds share
+    // only the DOM, so calls and replies cross it as JSON in document events
+    const mainCalls = new Map();
+    let nextMainId = 1;
+    document.addEventListener('%(reply_event)s', event => {
+        const reply = JSON.parse(event.detail);
+        const call = mainCalls.get(reply.id);
+        mainCalls.delete(reply.id);
+        if (call) reply.ok ? call.resolve(reply.value) : call.reject(new Error(reply.value));
+    });
+    function mainWorld(name) {
+        return (...args) => new Promise((resolve, reject) => {
+            const id = nextMainId++;
+            mainCalls.set(id, {resolve, reject});
+            document.dispatchEvent(new CustomEvent('%(call_event)s', {detail: JSON.stringify({id, name, args})}));
+        });
+    }
+%(handlers)s
+    new QWebChannel(qt.webChannelTransport, channel => {
+        remote = channel.objects.%(object)s;
+        remote.delivered.connect(receive);
+        flush();
+    });
+})();
+"""
+
+# Main-world end of mainWorld(): runs the named handler and dispatches its result back
+MAIN_WORLD_SCRIPT = """
+(function() {
+    const handlers = {%(handlers)s};
+    document.addEventListener('%(call_event)s', async event => {
+        let reply;
+        try {
+            const call = JSON.parse(event.detail);
+            reply = {id: call.id};
+            if (!Object.hasOwn(handlers, call.name)) throw new Error('No main world handler for ' + call.name);
+            const value = await handlers[call.name](...call.args);
+            reply.ok = true;
+            reply.value = value === undefined ? null : value;
+        } catch (e) {
+            reply = {id: reply && reply.id, ok: false, value: String(e && e.message || e)};
+        }
+        document.dispatchEvent(new CustomEvent('%(reply_event)s', {detail: JSON.stringify(reply)}));
+    });
+})();
+"""
+
+def bridge_script(page_handlers, main_world_handlers=None):
+    """The bridge script with qwebchannel.js inlined and page_handlers (name -> JS function) registered
+
+    Names in main_world_handlers are answered by main_world_script instead, for handlers
+    that use the page's own globals.
+    """
+    source = QFile(QWEBCHANNEL_JS)
+    if not source.open(QIODevice.OpenModeFlag.ReadOnly):
+        raise RuntimeError(f"Could not read {QWEBCHANNEL_JS}")
+    # Inlined inside the wrapper so QWebChannel doesn't become a page global
+    qwebchannel = bytes(source.readAll()).decode("utf-8")
+    source.close()
+    handlers = [f"    window.websimBridge.on({json.dumps(name)}, {handler});" for name, handler in page_handlers.items()]
+    handlers += [f"    window.websimBridge.on({json.dumps(name)}, mainWorld({json.dumps(name)}));"
+                 for name in main_world_handlers or {}]
+    return BRIDGE_SCRIPT % {"qwebchannel": qwebchannel, "handlers": "\n".join(handlers), "object": CHANNEL_OBJECT,
+                            "call_event": MAIN_CALL_EVENT, "reply_event": MAIN_REPLY_EVENT}
+
+def main_world_script(main_world_handlers):
+    """The main-world script answering the bridge's calls to main_world_handlers (name -> JS function)"""
+    handlers = ",\n".join(f"        {json.dumps(name)}: {handler}" for name, handler in main_world_handlers.items())
+    return MAIN_WORLD_SCRIPT % {"handlers": "\n" + handlers + "\n    ", "call_event": MAIN_CALL_EVENT,
+                                "reply_event": MAIN_REPLY_EVENT}
+
+def bridge_allowed(url):
+    host = url.host()
+    return (url.scheme() == "https" and (host == "websim.ai" or host.endswith(".websim.ai"))) \
+        or url.scheme() == "websimbundle"
+
+class PageBridge(QObject):
+    """One page's end of the bridge, registered on its QWebChannel
+
+    Both directions carry JSON batches: the page sends everything it queued in one task
+    through dispatch, and messages for the page are collected until the event loop comes
+    round and then delivered in one signal. A message with an id expects a reply carrying
+    the same id, which resolves the promise (page) or runs the callback (Python).
+    """
+    delivered = pyqtSignal(str)
+
+    def __init__(self, manager, page):
+        super().__init__(page)
+        self.manager = manager
+        self.page = page
+        self.outgoing = []
+        # Request id -> callback(ok, value) for calls waiting on the page
+        self.callbacks = {}
+        self.next_id = 1
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(0)
+        self.flush_timer.timeout.connect(self.flush)
+
+    @pyqtSlot(str)
+    def dispatch(self, batch):
+        """Entry point for the page: a JSON list of calls, notifications and replies"""
+        if not bridge_allowed(self.page.url()):
+            return
+        try:
+            messages = json.loads(batch)
+        except ValueError:
+            return
+        if not isinstance(messages, list):
+            return
+        for message in messages:
+            if not isinstance(message, dict):
+                continue
+            # One bad message or failing callback must not cost the rest of the batch
+            try:
+                if "reply" in message:
+                    callback = self.callbacks.pop(message["reply"], None)
+                    if callback is not None:
+                        callback(bool(message.get("ok")), message.get("value"))
+                else:
+                    self.answer(message)
+            except Exception as e:
+                print(f"Bridge message failed: {str(e)}")
+
+    def answer(self, message):
+        message_id = message.get("id")
+        handler = self.manager.handlers.get(message.get("name"))
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for {message.get('name')}")
+            args = message.get("args", [])
+            if not isinstance(args, list):
+                raise TypeError("Bridge call arguments must be a list")
+            reply = {"ok": True, "value": handler(self.page, *args)}
+        except Exception as e:
+            if message_id is None:
+                print(f"Bridge call {message.get('name')} failed: {str(e)}")
+            reply = {"ok": False, "value": str(e)}
+        if message_id is not None:
+            reply["reply"] = message_id
+            self.send(reply)
+
+    def send(self, message):
+        self.outgoing.append(message)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        if self.outgoing:
+            batch, self.outgoing = self.outgoing, []
+            self.delivered.emit(json.dumps(batch, default=str))
+
+    def notify(self, name, *args):
+        self.send({"name": name, "args": list(args)})
+
+    def request(self, name, args, callback):
+        """Call a page handler; callback(ok, value) runs with its resolved result or error"""
+        message_id = self.next_id
+        self.next_id += 1
+        self.callbacks[message_id] = callback
+        self.send({"id": message_id, "name": name, "args": list(args)})
+
+    def reset(self):
+        """A new document replaces the page side; nothing queued for the old one can be answered"""
+        self.outgoing = []
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback(False, "The page navigated away")
+
+class BridgeManager(QObject):
+    """Give every page a QWebChannel bridge and hold the Python handlers pages can call
+
+    The channel is only exposed to BRIDGE_WORLD, so the page's own scripts can't call
+    the handlers; only the bridge script installed there can.
+    """
+    def __init__(self, browser):
+        super().__init__(browser)
+        self.browser = browser
+        # name -> handler(page, *args); the return value must be JSON-serializable
+        self.handlers = {}
+        self.handle("plugins.active", self.active_plugins)
+
+    def handle(self, name, handler):
+        self.handlers[name] = handler
+
+    def attach_page(self, page):
+        bridge = PageBridge(self, page)
+        channel = QWebChannel(page)
+        channel.registerObject(CHANNEL_OBJECT, bridge)
+        page.setWebChannel(channel, BRIDGE_WORLD)
+        page.loadStarted.connect(bridge.reset)
+
+    def bridge_for(self, page):
+        return page.findChild(PageBridge)
+
+    def notify(self, page, name, *args):
+        self.bridge_for(page).notify(name, *args)
+
+    def request(self, page, name, args, callback):
+        self.bridge_for(page).request(name, args, callback)
+
+    async def call(self, page, name, *args, timeout=None):
+        """Await a page handler's result; raises RuntimeError if it fails or the page navigates"""
+        future = asyncio.get_running_loop().create_future()
+        def resolve(ok, value):
+            if future.done():
+                return
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+        self.request(page, name, args, resolve)
+        return await asyncio.wait_for(future, timeout)
+
+    def active_plugins(self, page):
+        plugin_manager = getattr(self.browser, "plugin_manager", None)
+        return list(plugin_manager.active_plugins(project_key(page.url()))) if plugin_manager else []
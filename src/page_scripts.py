@@ -0,0 +1,110 @@
+from PyQt6.QtWebEngineCore import QWebEngineScript
+from .plugin_manager import BUILTIN_PLUGIN_SCRIPTS, wrap_plugin_source
+from .database_handler import DatabaseHandler
+from .api_manager import TOGGLE_FEATURE_HANDLER
+from .page_bridge import (SCRIPT_NAME as BRIDGE_SCRIPT_NAME, MAIN_WORLD_SCRIPT_NAME, BRIDGE_INCLUDES,
+                          BRIDGE_WORLD, bridge_script, main_world_script)
+
+class PageScript:
+    """A script plus the URL patterns and injection settings it is installed with"""
+    def __init__(self, name, source, includes=("*",), excludes=(),
+                 injection_point=QWebEngineScript.InjectionPoint.DocumentReady,
+                 world=QWebEngineScript.ScriptWorldId.MainWorld, subframes=False):
+        self.name = name
+        self.source = source
+        self.includes = tuple(includes)
+        self.excludes = tuple(excludes)
+        self.injection_point = injection_point
+        self.world = world
+        self.subframes = subframes
+
+    def user_script_source(self):
+        """Prefix the source with a Greasemonkey header so Chromium matches the URL itself"""
+        header = ["// ==UserScript==", f"// @name {self.name}"]
+        header += [f"// @include {pattern}" for pattern in self.includes]
+        header += [f"// @exclude {pattern}" for pattern in self.excludes]
+        header.append("// ==/UserScript==")
+        return "\n".join(header) + "\n" + self.source
+
+    def compile(self):
+        script = QWebEngineScript()
+        script.setName(self.name)
+        script.setSourceCode(self.user_script_source())
+        script.setInjectionPoint(self.injection_point)
+        script.setWorldId(self.world)
+        script.setRunsOnSubFrames(self.subframes)
+        return script
+
+class PageScriptRegistry:
+    """Scripts installed into every page once, matched against URLs by Chromium
+
+    Each script carries @include/@exclude patterns in its user script header. Chromium
+    compiles them into its URL pattern set and injects matching scripts at document
+    creation, so a navigation costs no Python call however many scripts are registered.
+    """
+    def __init__(self):
+        self.scripts = {}
+        # name -> QWebEngineScript, built once and reused for every page
+        self.compiled = {}
+        # Names unregistered since startup, taken out of pages on their next install
+        self.removed = set()
+
+    def register(self, name, source, **options):
+        """Add or replace a script; pages pick it up on the next install"""
+        self.scripts[name] = PageScript(name, source, **options)
+        self.removed.discard(name)
+        self.compiled.pop(name, None)
+
+    def unregister(self, name):
+        if self.scripts.pop(name, None) is not None:
+            self.removed.add(name)
+            self.compiled.pop(name, None)
+
+    def compile(self, name):
+        if name not in self.compiled:
+            self.compiled[name] = self.scripts[name].compile()
+        return self.compiled[name]
+
+    def install(self, page, names=None):
+        """Insert registered scripts into a page, replacing earlier copies
+
+        names limits the update to those scripts, each of which is removed from the page
+        if it is no longer registered; by default every script is installed.
+        """
+        collection = page.scripts()
+        if names is None:
+            names, removed = list(self.scripts), self.removed
+        else:
+            removed = [name for name in names if name not in self.scripts]
+            names = [name for name in names if name in self.scripts]
+        for name in removed:
+            for old in collection.find(name):
+                collection.remove(old)
+        for name in names:
+            for old in collection.find(name):
+                collection.remove(old)
+            collection.insert(self.compile(name))
+
+def default_page_scripts():
+    """Registry with the scripts every browser page gets"""
+    registry = PageScriptRegistry()
+    registry.register("plugin:@Trey6383/test123",
+                      wrap_plugin_source("@Trey6383/test123", BUILTIN_PLUGIN_SCRIPTS["@Trey6383/test123"]),
+                      includes=["*plugin=@Trey6383/test123*", "*plugin=%40Trey6383%2Ftest123*"])
+    # Only called through the bridge, so it lives in the bridge's world
+    registry.register(DatabaseHandler.SCRIPT_NAME, DatabaseHandler.get_injection_script(),
+                      includes=["https://websim.ai/*", "https://*.websim.ai/*"],
+                      injection_point=QWebEngineScript.InjectionPoint.DocumentCreation,
+                      world=BRIDGE_WORLD)
+    # Needs window.websim from the page
+    main_world_handlers = {"project.toggleFeature": TOGGLE_FEATURE_HANDLER}
+    registry.register(BRIDGE_SCRIPT_NAME, bridge_script({
+                          DatabaseHandler.BRIDGE_CALL: DatabaseHandler.get_bridge_handler()
+                      }, main_world_handlers),
+                      includes=BRIDGE_INCLUDES,
+                      injection_point=QWebEngineScript.InjectionPoint.DocumentCreation,
+                      world=BRIDGE_WORLD)
+    registry.register(MAIN_WORLD_SCRIPT_NAME, main_world_script(main_world_handlers),
+                      includes=BRIDGE_INCLUDES,
+                      injection_point=QWebEngineScript.InjectionPoint.DocumentCreation)
+    return registry
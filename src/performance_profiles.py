@@ -0,0 +1,117 @@
+import html
+import os
+from PyQt6.QtWebEngineCore import QWebEngineSettings, qWebEngineChromiumVersion
+from .memory_monitor import descendant_pids
+
+FLAGS_ENV = "QTWEBENGINE_CHROMIUM_FLAGS"
+
+PROFILES = {
+    "low-memory": {
+        "label": "Low memory",
+        "flags": ["--process-per-site"],
+        "cache_mb": 50,
+        "dns_prefetch": False
+    },
+    "balanced": {
+        "label": "Balanced",
+        "flags": [],
+        "cache_mb": 100,
+        "dns_prefetch": True
+    },
+    "max-performance": {
+        "label": "Max performance",
+        "flags": ["--enable-gpu-rasterization", "--enable-zero-copy", "--enable-quic"],
+        "cache_mb": 500,
+        "dns_prefetch": True
+    }
+}
+DEFAULT_PROFILE = "balanced"
+
+# What apply_chromium_flags did at startup, for the diagnostics page
+APPLIED = {"profile": None, "flags": [], "env": None}
+
+def profile_name(settings):
+    """Name of the selected performance profile"""
+    name = settings.value("performance/profile", DEFAULT_PROFILE)
+    return name if name in PROFILES else DEFAULT_PROFILE
+
+def current_profile(settings):
+    """The profile this process runs with; a new selection only counts after a restart"""
+    return PROFILES[APPLIED["profile"] or profile_name(settings)]
+
+def apply_chromium_flags(settings, environ=None):
+    """Add the selected profile's Chromium flags to the environment; must run before QApplication"""
+    environ = os.environ if environ is None else environ
+    name = profile_name(settings)
+    existing = environ.get(FLAGS_ENV, "").split()
+    # Flags the user set themselves win over the profile
+    names = {flag.split("=", 1)[0] for flag in existing}
+    added = [flag for flag in PROFILES[name]["flags"] if flag.split("=", 1)[0] not in names]
+    if added:
+        environ[FLAGS_ENV] = " ".join(existing + added)
+    APPLIED["profile"] = name
+    APPLIED["flags"] = added
+    APPLIED["env"] = environ.get(FLAGS_ENV, "")
+    return added
+
+def engine_switches():
+    """Switches Chromium started its helper processes with, from /proc; None where it can't be read
+
+    Chromium copies the switches that matter to a process type onto its command line, so
+    this is what the engine really applied, not just what was put in the environment.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    switches = set()
+    for pid, name in descendant_pids(os.getpid()).items():
+        if not name.startswith("QtWebEngine"):
+            continue
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+        except OSError:
+            continue
+        switches.update(arg.decode("utf-8", "replace") for arg in args if arg.startswith(b"--"))
+    return switches
+
+def flag_status(flags, switches):
+    """One line per profile flag saying whether the engine's helper processes got it"""
+    if switches is None:
+        return "(unknown on this platform)"
+    names = {switch.split("=", 1)[0] for switch in switches}
+    # Browser-process switches such as --process-per-site are never copied to helpers
+    return ", ".join(f"{flag} {'applied' if flag.split('=', 1)[0] in names else 'not seen in helpers'}"
+                     for flag in flags) or "(none)"
+
+def diagnostics_html(profile, settings, switches=None):
+    """Describe the active performance profile and what actually reached the engine
+
+    switches is engine_switches(), read off the GUI thread by the caller.
+    """
+    name = APPLIED["profile"] or profile_name(settings)
+    rows = [
+        ("Selected profile", profile_name(settings)),
+        ("Profile at startup", name),
+        ("Flags added by profile", " ".join(APPLIED["flags"]) or "(none)"),
+        (f"{FLAGS_ENV} at startup", APPLIED["env"] or "(empty)"),
+        ("Profile flags in engine processes", flag_status(PROFILES[name]["flags"], switches)),
+        ("Engine process switches", " ".join(sorted(switches)) if switches else "(none found)"),
+        ("Chromium version", qWebEngineChromiumVersion()),
+        ("HTTP cache type", profile.httpCacheType().name),
+        ("HTTP cache maximum", f"{profile.httpCacheMaximumSize() / 2**20:.0f} MB"),
+        ("DNS prefetch", str(profile.settings().testAttribute(QWebEngineSettings.WebAttribute.DnsPrefetchEnabled)))
+    ]
+    table = "\n".join(f"<tr><th>{html.escape(k)}</th><td>{html.escape(str(v))}</td></tr>" for k, v in rows)
+    return f"""<!DOCTYPE html>
+<html><head><title>Performance diagnostics</title>
+<style>
+body {{ font-family: 'Segoe UI', sans-serif; margin: 24px; }}
+th {{ text-align: left; padding-right: 16px; color: #555; }}
+td, th {{ padding: 4px 0; }}
+</style></head>
+<body>
+<h2>Performance diagnostics</h2>
+<table>{table}</table>
+<p>Profile changes apply after a restart. GPU rasterization and zero-copy status is shown under
+"Graphics Feature Status" on <a href="chrome://gpu">chrome://gpu</a>.</p>
+</body></html>"""
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import time
+
+class PluginCache:
+    """Content-addressed on-disk cache of plugin sources
+
+    Sources are stored once under objects/<sha256>.js and an index maps each plugin id to
+    the hash of its current source. Entries older than max_age are still served but
+    reported as stale so the caller can revalidate in the background. Least recently
+    used entries are evicted when the cache grows past max_bytes.
+    """
+    MAX_AGE = 24 * 60 * 60
+    MAX_BYTES = 20 * 1024 * 1024
+
+    def __init__(self, cache_dir, max_age=MAX_AGE, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.index = self._load_index()
+        # Access times changed since the index was last written
+        self.dirty = False
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(self.index_path + ".tmp", self.index_path)
+        self.dirty = False
+
+    def flush(self):
+        """Write access times recorded by get(); they only matter for eviction order"""
+        if self.dirty:
+            self._save_index()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest + ".js")
+
+    @staticmethod
+    def digest(source):
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def get(self, plugin_id):
+        """Return (source, stale) for a cached plugin, or (None, True) on a miss or failed integrity check"""
+        entry = self.index.get(plugin_id)
+        if entry is None:
+            return None, True
+        try:
+            with open(self._object_path(entry["hash"]), "rb") as f:
+                data = f.read()
+        except OSError:
+            self.remove(plugin_id)
+            return None, True
+        # Never hand out a source whose content no longer matches its hash
+        if hashlib.sha256(data).hexdigest() != entry["hash"]:
+            print(f"Plugin cache integrity check failed for {plugin_id}")
+            self.remove(plugin_id)
+            return None, True
+        entry["accessed"] = time.time()
+        self.dirty = True
+        return data.decode("utf-8"), time.time() - entry["fetched"] > self.max_age
+
+    def put(self, plugin_id, source):
+        """Store a source; returns True if it differs from what was cached"""
+        digest = self.digest(source)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(self.objects_dir, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(source.encode("utf-8"))
+            os.replace(path + ".tmp", path)
+        old = self.index.get(plugin_id)
+        now = time.time()
+        self.index[plugin_id] = {
+            "hash": digest,
+            "size": len(source.encode("utf-8")),
+            "fetched": now,
+            "accessed": now
+        }
+        if old is not None and old["hash"] != digest:
+            self._drop_object(old["hash"])
+        self._evict()
+        self._save_index()
+        return old is None or old["hash"] != digest
+
+    def remove(self, plugin_id):
+        entry = self.index.pop(plugin_id, None)
+        if entry is not None:
+            self._drop_object(entry["hash"])
+            self._save_index()
+
+    def _drop_object(self, digest):
+        """Delete an object unless another plugin still points at it"""
+        if any(entry["hash"] == digest for entry in self.index.values()):
+            return
+        try:
+            os.remove(self._object_path(digest))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used plugins until the distinct objects fit in max_bytes"""
+        def total():
+            return sum({entry["hash"]: entry["size"] for entry in self.index.values()}.values())
+        while self.index and total() > self.max_bytes:
+            plugin_id = min(self.index, key=lambda key: self.index[key]["accessed"])
+            entry = self.index.pop(plugin_id)
+            self._drop_object(entry["hash"])
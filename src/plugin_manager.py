@@ -1,75 +1,370 @@
-from PyQt6.QtWidgets import QMenu, QInputDialog, QMessageBox
-from PyQt6.QtCore import QUrl
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from PyQt6.QtWidgets import QApplication, QMenu
+from PyQt6.QtCore import QObject, QUrl, QUrlQuery, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineScript
+from .browser_settings import BrowserSettings
+from .plugin_cache import PluginCache
+from .async_runtime import spawn, fetch_url, get_text, message_box
+
+# websim.ai publishes no plain-script URL for plugins. A plugin with no bundled or cached
+# source is loaded once through ?plugin=, and the script websim fetched for it is kept, so
+# from then on it applies in place. A mirror can also be set as plugins/source_url, e.g.
+# "https://example.com/{plugin_id}.js".
+PLUGIN_SOURCE_SETTING = "plugins/source_url"
+PLUGIN_FETCH_TIMEOUT = 10
+# Long enough for the request recorder to have flushed what the page loaded
+PLUGIN_CAPTURE_DELAY = 3
+
+# Plugins whose source ships with the browser
+TEST123_SCRIPT = """
+function injectPlugin() {
+    // Create a div element
+    const div = document.createElement('div');
+    div.style.position = 'fixed';
+    div.style.bottom = '20px';
+    div.style.right = '20px';
+    div.style.backgroundColor = '#9C27B0';
+    div.style.color = 'white';
+    div.style.padding = '10px';
+    div.style.borderRadius = '5px';
+    div.style.zIndex = '9999';
+    div.style.fontFamily = 'Arial, sans-serif';
+    div.textContent = 'Plugin: test123 by @Trey6383';
+
+    // Add div to the page
+    document.body.appendChild(div);
+
+    // Fade out after 3 seconds
+    setTimeout(() => {
+        div.style.transition = 'opacity 1s';
+        div.style.opacity = '0';
+        setTimeout(() => div.remove(), 1000);
+    }, 3000);
+}
+injectPlugin();
+"""
+
+BUILTIN_PLUGIN_SCRIPTS = {
+    "@Trey6383/test123": TEST123_SCRIPT
+}
+
+PLUGIN_SCRIPT_NAME = "websimPlugin"
+
+PRESET_PLUGINS = [
+    "@Trey6383/test123",
+    "@Trey6383/injectify",
+    "@hintbl0ck/edit5",
+    "@Trey6383/edit6-real"
+]
+
+# Bundles kept in memory, keyed by the hash of their members
+MAX_BUNDLES = 32
+
+def wrap_plugin_source(plugin_id, source):
+    """Guard a plugin source so it runs at most once per document and can't break its neighbours"""
+    key = json.dumps(plugin_id)
+    return (
+        "(function() {\n"
+        "  window.__websimPlugins = window.__websimPlugins || {};\n"
+        f"  if (window.__websimPlugins[{key}]) return;\n"
+        f"  window.__websimPlugins[{key}] = true;\n"
+        "  try {\n"
+        f"{source}\n"
+        f"  }} catch (e) {{ console.error('Plugin ' + {key} + ' failed', e); }}\n"
+        "})();"
+    )
+
+def project_key(url):
+    """Identify a websim project by host and path, ignoring the query"""
+    return url.host() + url.path()
+
+def plugin_script_urls(plugin_id, urls):
+    """URLs a page loaded that name plugin_id's author and plugin, e.g. .../@Trey6383/injectify/index.js"""
+    author, _, name = plugin_id.lstrip("@").partition("/")
+    found = []
+    for url in sorted(urls):
+        decoded = QUrl.fromPercentEncoding(url.encode("utf-8"))
+        if f"{author}/{name}" in decoded and "plugin=" not in decoded:
+            found.append(url)
+    return found
+
+class PluginFetcher(QObject):
+    """Fetch plugin sources without blocking the GUI thread; several can be in flight at once"""
+    fetched = pyqtSignal(str, str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source_url = BrowserSettings.app_settings().value(PLUGIN_SOURCE_SETTING, "", type=str)
+
+    def fetch(self, plugin_id, urls=None):
+        """Start a fetch from the first of urls that holds a script, by default the source URL
+
+        Returns False when there is nowhere to fetch from.
+        """
+        if urls is None:
+            urls = [self.source_url.format(plugin_id=plugin_id)] if self.source_url else []
+        if not urls:
+            return False
+        spawn(self._fetch(plugin_id, urls))
+        return True
+
+    async def _fetch(self, plugin_id, urls):
+        for url in urls:
+            try:
+                body, headers = await fetch_url(url, PLUGIN_FETCH_TIMEOUT)
+                content_type = headers.get("Content-Type", "")
+                source = body.decode("utf-8")
+                if not source.strip() or "html" in content_type:
+                    raise ValueError(f"no script at {url}")
+                self.fetched.emit(plugin_id, source)
+                return
+            except Exception as e:
+                print(f"Could not fetch plugin {plugin_id}: {str(e)}")
+        self.failed.emit(plugin_id)
 
 class PluginManager:
     def __init__(self, browser):
         self.browser = browser
         self.menu = QMenu(browser)
+        self.menu.aboutToShow.connect(self.setup_menu)
+        # Plugin sources known this session, keyed by plugin id
+        self.sources = dict(BUILTIN_PLUGIN_SCRIPTS)
+        # Fetched sources persist under the profile so plugins load instantly and offline
+        self.plugins_dir = os.path.join(browser.storage_path, 'plugins')
+        self.cache = PluginCache(self.plugins_dir)
+        # Bundled sources go in the cache too, so it holds every plugin that can run offline
+        for plugin_id, source in BUILTIN_PLUGIN_SCRIPTS.items():
+            if plugin_id not in self.cache.index:
+                self.cache.put(plugin_id, source)
+        QApplication.instance().aboutToQuit.connect(self.cache.flush)
+        # Ordered list of active plugin ids per project
+        self.active_path = os.path.join(self.plugins_dir, 'active.json')
+        self.active = self.load_active()
+        self.bundles = OrderedDict()
+        self.fetcher = PluginFetcher(browser)
+        self.fetcher.fetched.connect(self.on_plugin_fetched)
+        self.fetcher.failed.connect(self.on_plugin_failed)
+        self.attach_page(browser.web_view.page())
         self.setup_menu()
 
+    def attach_page(self, page):
+        """Swap the bundle whenever the page moves to another project"""
+        page.urlChanged.connect(lambda url, p=page: self.on_url_changed(p, url))
+        page.loadFinished.connect(lambda ok, p=page: self.on_load_finished(p, ok))
+
     def setup_menu(self):
-        """Setup the plugins dropdown menu"""
+        """Setup the plugins dropdown menu with the current project's plugins checked"""
         self.menu.clear()
-        
-        # Add preset plugins
-        self.menu.addAction("@Trey6383/test123", 
-                          lambda: self.apply_preset_plugin("@Trey6383/test123"))
-        self.menu.addAction("@Trey6383/injectify", 
-                          lambda: self.apply_preset_plugin("@Trey6383/injectify"))
-        self.menu.addAction("@hintbl0ck/edit5", 
-                          lambda: self.apply_preset_plugin("@hintbl0ck/edit5"))
-        self.menu.addAction("@Trey6383/edit6-real", 
-                          lambda: self.apply_preset_plugin("@Trey6383/edit6-real"))
+        active = self.active_plugins()
+
+        # Add preset and previously used plugins
+        for plugin_id in PRESET_PLUGINS + [p for p in active if p not in PRESET_PLUGINS]:
+            action = self.menu.addAction(plugin_id,
+                                         lambda checked, p=plugin_id: self.toggle_plugin(p))
+            action.setCheckable(True)
+            action.setChecked(plugin_id in active)
         self.menu.addSeparator()
         self.menu.addAction("New Plugin...", self.add_plugin)
+        disable_action = self.menu.addAction("Disable All Plugins", self.disable_all)
+        disable_action.setEnabled(bool(active))
+
+    def load_active(self):
+        try:
+            with open(self.active_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_active(self):
+        os.makedirs(self.plugins_dir, exist_ok=True)
+        with open(self.active_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.active, f)
+        os.replace(self.active_path + ".tmp", self.active_path)
+
+    def current_project(self):
+        return project_key(self.browser.web_view.url())
+
+    def active_plugins(self, project=None):
+        return self.active.get(project or self.current_project(), [])
 
     def add_plugin(self):
         """Handle adding a custom plugin"""
-        # Get current URL
-        current_url = self.browser.web_view.url().toString()
-        
-        # Remove any existing plugin parameter
-        if "?plugin=" in current_url:
-            current_url = current_url.split("?plugin=")[0]
-        
+        spawn(self.ask_for_plugin())
+
+    async def ask_for_plugin(self):
+        """Prompt for a plugin without nested event loops, so the page and other tasks keep running"""
         # Get plugin creator username
-        username, ok = QInputDialog.getText(self.browser, 
-            "Plugin Creator", 
+        username = await get_text(self.browser,
+            "Plugin Creator",
             "Who made the plugin? Enter their websim username with the @:")
-        if not ok or not username:
+        if not username:
             return
-        
+
         # Ensure username starts with @
         if not username.startswith("@"):
             username = "@" + username
-        
+
         # Get plugin name
-        plugin_name, ok = QInputDialog.getText(self.browser, 
-            "Plugin Name", 
+        plugin_name = await get_text(self.browser,
+            "Plugin Name",
             "What's the name of the plugin?")
-        if not ok or not plugin_name:
+        if not plugin_name:
             return
-        
-        # Construct plugin URL
-        plugin_param = f"?plugin={username}/{plugin_name}"
-        new_url = current_url + plugin_param
-        
-        # Navigate to the new URL
-        self.browser.web_view.setUrl(QUrl(new_url))
-        
+
+        self.apply_preset_plugin(f"{username}/{plugin_name}")
+
         # Show confirmation
-        QMessageBox.information(self.browser, 
-            "Plugin Added", 
+        await message_box(self.browser,
+            "Plugin Added",
             f"Plugin {username}/{plugin_name} has been added to the current page.")
 
     def apply_preset_plugin(self, plugin_id):
-        """Apply a preset plugin to the current page"""
-        current_url = self.browser.web_view.url().toString()
-        
-        # Remove any existing plugin parameter
-        if "?plugin=" in current_url:
-            current_url = current_url.split("?plugin=")[0]
-        
-        # Add the new plugin
-        new_url = current_url + f"?plugin={plugin_id}"
-        self.browser.web_view.setUrl(QUrl(new_url)) 
\ No newline at end of file
+        """Enable a plugin on the current project without reloading the page"""
+        if plugin_id not in self.active_plugins():
+            self.toggle_plugin(plugin_id)
+
+    def toggle_plugin(self, plugin_id):
+        """Enable or disable a plugin on the current project and rebuild its bundle"""
+        project = self.current_project()
+        plugins = list(self.active_plugins(project))
+        if plugin_id in plugins:
+            plugins.remove(plugin_id)
+        else:
+            plugins.append(plugin_id)
+            self.ensure_source(plugin_id)
+        if plugins:
+            self.active[project] = plugins
+        else:
+            self.active.pop(project, None)
+        self.save_active()
+        self.install_bundle()
+        if plugin_id in plugins and plugin_id not in self.sources and not self.fetcher.source_url:
+            # Nothing to inject; let websim load it
+            self.navigate_with_plugin(plugin_id)
+
+    def disable_all(self):
+        """Disable every plugin on the current project"""
+        self.active.pop(self.current_project(), None)
+        self.save_active()
+        self.install_bundle()
+
+    def ensure_source(self, plugin_id):
+        """Make a plugin's source available, from memory, disk or the network"""
+        if plugin_id in self.sources:
+            return
+        source, stale = self.cache.get(plugin_id)
+        if source is not None:
+            self.sources[plugin_id] = source
+        if stale:
+            # Serve the cached copy now and refresh it in the background
+            self.fetcher.fetch(plugin_id)
+
+    def on_plugin_fetched(self, plugin_id, source):
+        """Cache the fetched source and rebuild the bundle if it changed and is in use"""
+        changed = self.cache.put(plugin_id, source)
+        if not changed and plugin_id in self.sources:
+            return
+        self.sources[plugin_id] = source
+        if plugin_id in self.active_plugins():
+            self.install_bundle()
+
+    def on_plugin_failed(self, plugin_id):
+        """Let websim load the plugin itself when there is no source at all"""
+        if plugin_id in self.active_plugins() and plugin_id not in self.sources \
+                and plugin_id not in QUrlQuery(self.browser.web_view.url()).allQueryItemValues("plugin"):
+            self.navigate_with_plugin(plugin_id)
+
+    def on_load_finished(self, page, ok):
+        """Keep the sources of plugins websim just loaded through ?plugin=, so they apply in place next time"""
+        if not ok:
+            return
+        missing = [p for p in QUrlQuery(page.url()).allQueryItemValues("plugin") if p not in self.sources]
+        if missing:
+            spawn(self.capture_sources(page.url().toString(), missing))
+
+    async def capture_sources(self, page_url, plugin_ids):
+        recorder = getattr(self.browser, "request_recorder", None)
+        if recorder is None:
+            return
+        await asyncio.sleep(PLUGIN_CAPTURE_DELAY)
+        resources = recorder.page_resources(page_url)
+        for plugin_id in plugin_ids:
+            urls = plugin_script_urls(plugin_id, resources)
+            if urls:
+                self.fetcher.fetch(plugin_id, urls)
+
+    def on_url_changed(self, page, url):
+        """Install the bundle for the project the page is moving to"""
+        if project_key(url) != page.property("pluginProject"):
+            self.install_bundle(page, run_now=False)
+
+    def bundle_for(self, plugin_ids):
+        """Concatenate plugin sources into one script, cached by the hash of its members"""
+        members = "\n".join(f"{p}:{PluginCache.digest(self.sources[p])}" for p in plugin_ids)
+        key = hashlib.sha256(members.encode("utf-8")).hexdigest()
+        bundle = self.bundles.get(key)
+        if bundle is None:
+            bundle = "\n".join(wrap_plugin_source(p, self.sources[p]) for p in plugin_ids)
+            self.bundles[key] = bundle
+            while len(self.bundles) > MAX_BUNDLES:
+                self.bundles.popitem(last=False)
+        else:
+            self.bundles.move_to_end(key)
+        return bundle
+
+    def install_bundle(self, page=None, run_now=True):
+        """Replace a page's plugin script with its project's bundle; defaults to the current page"""
+        page = page or self.browser.web_view.page()
+        project = project_key(page.url())
+        for plugin_id in self.active_plugins(project):
+            self.ensure_source(plugin_id)
+        plugin_ids = [p for p in self.active_plugins(project) if p in self.sources]
+        page.setProperty("pluginProject", project)
+
+        scripts = page.scripts()
+        for old in scripts.find(PLUGIN_SCRIPT_NAME):
+            scripts.remove(old)
+        if plugin_ids:
+            bundle = self.bundle_for(plugin_ids)
+            # The guard keeps the bundle off other projects if a navigation races the swap
+            source = (f"if (location.host + location.pathname === {json.dumps(project)}) {{\n"
+                      f"{bundle}\n}}")
+            script = QWebEngineScript()
+            script.setName(PLUGIN_SCRIPT_NAME)
+            script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+            script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+            script.setRunsOnSubFrames(False)
+            script.setSourceCode(source)
+            scripts.insert(script)
+            if run_now:
+                # Plugins that already ran in this document are skipped by their guards
+                page.runJavaScript(bundle)
+
+        if run_now:
+            # Only the address changes so the URL can be shared; the page keeps its state
+            page.runJavaScript(
+                "(function(ids) {"
+                " const url = new URL(location.href);"
+                " url.searchParams.delete('plugin');"
+                " ids.forEach(id => url.searchParams.append('plugin', id));"
+                " history.replaceState(history.state, '', url);"
+                f"}})({json.dumps(self.active_plugins(project))});"
+            )
+
+    def navigate_with_plugin(self, plugin_id):
+        """Reload the current page with ?plugin= set for every active plugin, keeping the rest of the query"""
+        url = QUrl(self.browser.web_view.url())
+        plugin_ids = list(self.active_plugins(project_key(url)))
+        if plugin_id not in plugin_ids:
+            plugin_ids.append(plugin_id)
+        query = QUrlQuery(url)
+        query.removeAllQueryItems("plugin")
+        for active_id in plugin_ids:
+            query.addQueryItem("plugin", active_id)
+        url.setQuery(query)
+        self.browser.web_view.setUrl(url)
@@ -0,0 +1,208 @@
+from PyQt6.QtCore import QObject, QEvent
+from PyQt6.QtGui import QAction, QActionGroup
+from PyQt6.QtWidgets import QMenu
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from .plugin_manager import project_key
+
+LifecycleState = QWebEnginePage.LifecycleState
+
+FREEZE = "freeze"
+THROTTLE = "throttle"
+OFF = "off"
+
+POLICY_LABELS = {
+    FREEZE: "Freeze when hidden",
+    THROTTLE: "Throttle when hidden (keeps audio and multiplayer)",
+    OFF: "Keep running"
+}
+
+# Run in every frame of a page when the saver engages, so nothing is wrapped until then.
+# window.__websimThrottle(on, ms) switches it; switching off puts the native functions back.
+THROTTLE_SCRIPT = """
+(function(on, ms) {
+    if (!window.__websimThrottle) {
+        const native = {
+            requestAnimationFrame: window.requestAnimationFrame,
+            cancelAnimationFrame: window.cancelAnimationFrame,
+            setTimeout: window.setTimeout,
+            setInterval: window.setInterval
+        };
+        const pending = new Map();
+        let interval = 1000;
+        let nextId = 1;
+        let flushTimer = null;
+
+        function flush() {
+            flushTimer = null;
+            const callbacks = Array.from(pending.values());
+            pending.clear();
+            const now = performance.now();
+            callbacks.forEach(cb => { try { cb(now); } catch (e) { console.error(e); } });
+        }
+        const throttled = {
+            requestAnimationFrame(cb) {
+                // Negative ids can't clash with the native ones
+                const id = -(nextId++);
+                pending.set(id, cb);
+                if (flushTimer === null) flushTimer = native.setTimeout.call(window, flush, interval);
+                return id;
+            },
+            cancelAnimationFrame(id) {
+                if (!pending.delete(id)) native.cancelAnimationFrame.call(window, id);
+            },
+            setTimeout(fn, delay, ...args) {
+                return native.setTimeout.call(window, fn, Math.max(delay || 0, interval), ...args);
+            },
+            setInterval(fn, delay, ...args) {
+                return native.setInterval.call(window, fn, Math.max(delay || 0, interval), ...args);
+            }
+        };
+        window.__websimThrottle = function(on, ms) {
+            if (ms) interval = ms;
+            Object.assign(window, on ? throttled : native);
+            if (!on && flushTimer !== null) {
+                // Hand the held frames back to the native loop so they run on the next frame
+                clearTimeout(flushTimer);
+                flushTimer = null;
+                const callbacks = Array.from(pending.values());
+                pending.clear();
+                callbacks.forEach(cb => window.requestAnimationFrame(cb));
+            }
+        };
+    }
+    window.__websimThrottle(on, ms);
+})(%s, %d);
+"""
+
+def page_frames(page):
+    """The main frame and every frame below it"""
+    stack = [page.mainFrame()]
+    while stack:
+        frame = stack.pop()
+        if frame.isValid():
+            yield frame
+            stack.extend(frame.children())
+
+class PowerSaver(QObject):
+    """Freeze or throttle pages while the browser window is minimized or covered
+
+    The policy is chosen per project. Pages are throttled as soon as the window is hidden;
+    a page whose policy is to freeze is frozen once Chromium recommends it (no audio, for
+    example), which it only decides after the page has noticed it is hidden. Everything is
+    undone as soon as the window is shown again.
+    """
+    THROTTLE_INTERVAL_MS = 1000
+
+    def __init__(self, browser, settings):
+        super().__init__(browser)
+        self.browser = browser
+        self.settings = settings
+        self.saving = False
+        self.frozen_pages = []
+        self.throttled_pages = []
+        # Pages to freeze once Chromium recommends it
+        self.freeze_candidates = []
+        self.window_handle = None
+
+        browser.installEventFilter(self)
+
+        self.menu = QMenu("🔋 Power Saver", browser)
+        self.menu.aboutToShow.connect(self.setup_menu)
+
+    def setup_menu(self):
+        """Offer the policies for the current project"""
+        self.menu.clear()
+        group = QActionGroup(self.menu)
+        current = self.policy_for(self.browser.web_view.url())
+        for policy, label in POLICY_LABELS.items():
+            action = QAction(label, self.menu, checkable=True)
+            action.setChecked(policy == current)
+            action.triggered.connect(lambda checked, p=policy: self.set_policy(self.browser.web_view.url(), p))
+            group.addAction(action)
+            self.menu.addAction(action)
+
+    def policy_for(self, url):
+        default = self.settings.value("power_saver/default", FREEZE)
+        return self.settings.value(f"power_saver/projects/{project_key(url)}", default)
+
+    def set_policy(self, url, policy):
+        self.settings.setValue(f"power_saver/projects/{project_key(url)}", policy)
+
+    def views(self):
+        tabs = getattr(self.browser, "tabs", None)
+        return tabs.views() if tabs is not None else [self.browser.web_view]
+
+    def eventFilter(self, obj, event):
+        if obj is self.browser and event.type() == QEvent.Type.Show and self.window_handle is None:
+            # Expose events, which tell us about covered windows, only reach the QWindow
+            self.window_handle = self.browser.windowHandle()
+            if self.window_handle is not None:
+                self.window_handle.installEventFilter(self)
+        if event.type() in (QEvent.Type.WindowStateChange, QEvent.Type.Show,
+                            QEvent.Type.Hide, QEvent.Type.Expose):
+            self.update()
+        return False
+
+    def is_hidden(self):
+        if self.browser.isMinimized() or not self.browser.isVisible():
+            return True
+        return self.window_handle is not None and not self.window_handle.isExposed()
+
+    def update(self):
+        hidden = self.is_hidden()
+        if hidden and not self.saving:
+            self.engage()
+        elif not hidden and self.saving:
+            self.release()
+
+    def engage(self):
+        """Apply each page's policy now that the window can't be seen"""
+        self.saving = True
+        for view in self.views():
+            page = view.page()
+            policy = self.policy_for(page.url())
+            if policy == OFF or page.lifecycleState() != LifecycleState.Active:
+                continue
+            self.throttle(page, True)
+            self.throttled_pages.append(page)
+            if policy == FREEZE:
+                self.freeze_candidates.append(page)
+                page.recommendedStateChanged.connect(self.on_recommended_state)
+                self.on_recommended_state(page.recommendedState(), page)
+
+    def throttle(self, page, on):
+        script = THROTTLE_SCRIPT % ("true" if on else "false", self.THROTTLE_INTERVAL_MS)
+        for frame in page_frames(page):
+            frame.runJavaScript(script)
+
+    def on_recommended_state(self, state, page=None):
+        page = page or self.sender()
+        if not self.saving or page not in self.freeze_candidates or state == LifecycleState.Active:
+            return
+        if page.lifecycleState() == LifecycleState.Active:
+            page.setLifecycleState(LifecycleState.Frozen)
+            self.frozen_pages.append(page)
+
+    def release(self):
+        """Bring every page this saver touched back to full speed"""
+        self.saving = False
+        for page in self.freeze_candidates:
+            try:
+                page.recommendedStateChanged.disconnect(self.on_recommended_state)
+            except (RuntimeError, TypeError):
+                # The tab was closed while the window was hidden
+                pass
+        for page in self.frozen_pages:
+            try:
+                if page.lifecycleState() == LifecycleState.Frozen:
+                    page.setLifecycleState(LifecycleState.Active)
+            except RuntimeError:
+                pass
+        for page in self.throttled_pages:
+            try:
+                self.throttle(page, False)
+            except RuntimeError:
+                pass
+        self.freeze_candidates = []
+        self.frozen_pages = []
+        self.throttled_pages = []
@@ -0,0 +1,155 @@
+import json
+import os
+import time
+from PyQt6.QtCore import QObject, QTimer, QUrl
+from PyQt6.QtWebEngineCore import QWebEngineScript
+from .plugin_manager import project_key
+from .request_telemetry import origin_of
+from .library_store import is_library_url
+
+SCRIPT_PREFIX = "preconnect:"
+
+# Inserted at document creation, before the parser has seen any of the page's own hints
+PRECONNECT_SCRIPT = """
+(function() {
+    // Chromium's match also takes in longer paths, which are other projects
+    if (location.host + location.pathname !== %s) return;
+    const origins = %s;
+    const links = [];
+    function hint() {
+        const root = document.documentElement;
+        if (!root) return false;
+        for (const origin of origins) {
+            for (const rel of ['preconnect', 'dns-prefetch']) {
+                const link = document.createElement('link');
+                link.rel = rel;
+                link.href = origin;
+                root.appendChild(link);
+                links.push(link);
+            }
+        }
+        return true;
+    }
+    if (!hint()) {
+        const observer = new MutationObserver(() => { if (hint()) observer.disconnect(); });
+        observer.observe(document, { childList: true });
+    }
+    // The connections are open by then; don't leave the extra elements in the page's DOM
+    window.addEventListener('load', () => links.forEach(link => link.remove()));
+})();
+"""
+
+class HostIndex:
+    """Per-project origin scores that fade unless the project keeps contacting them
+
+    Every visit multiplies a project's scores by DECAY and adds one for each origin seen.
+    Origins that fall below MIN_SCORE are dropped, each project keeps its MAX_ORIGINS
+    best, and projects not visited for MAX_AGE days are forgotten.
+    """
+    DECAY = 0.7
+    MIN_SCORE = 0.3
+    MAX_ORIGINS = 12
+    MAX_PROJECTS = 100
+    MAX_AGE = 30 * 24 * 60 * 60
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.projects = json.load(f)
+        except (OSError, ValueError):
+            self.projects = {}
+        self.prune()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.projects, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def observe(self, project, origins, now=None):
+        """Record one visit to project that contacted origins"""
+        now = time.time() if now is None else now
+        entry = self.projects.setdefault(project, {"visited": now, "origins": {}})
+        scores = {origin: score * self.DECAY for origin, score in entry["origins"].items()}
+        for origin in origins:
+            scores[origin] = scores.get(origin, 0) + 1
+        best = sorted(((score, origin) for origin, score in scores.items() if score >= self.MIN_SCORE), reverse=True)
+        entry["origins"] = {origin: round(score, 3) for score, origin in best[:self.MAX_ORIGINS]}
+        entry["visited"] = now
+        self.prune(now)
+
+    def prune(self, now=None):
+        now = time.time() if now is None else now
+        fresh = [(entry["visited"], project) for project, entry in self.projects.items()
+                 if now - entry["visited"] < self.MAX_AGE and entry["origins"]]
+        keep = {project for _, project in sorted(fresh, reverse=True)[:self.MAX_PROJECTS]}
+        self.projects = {project: entry for project, entry in self.projects.items() if project in keep}
+
+    def origins(self, project):
+        return list(self.projects.get(project, {}).get("origins", {}))
+
+class PreconnectPredictor(QObject):
+    """Learn which origins each project contacts and preconnect to them on the next visit
+
+    After a page finishes loading, the origins the interceptor saw for it are folded into
+    the HostIndex. Each known project gets a document-creation script matched to its URL,
+    so the hints go out before the page's HTML asks for anything, including on the first
+    navigation after a restart.
+    """
+    # Give late requests (lazy modules, fonts, APIs) a chance to show up before learning
+    LEARN_DELAY_MS = 5000
+
+    def __init__(self, browser, page_scripts):
+        super().__init__(browser)
+        self.browser = browser
+        self.page_scripts = page_scripts
+        self.index = HostIndex(os.path.join(browser.storage_path, "preconnect.json"))
+        for project in self.index.projects:
+            self.register(project)
+
+    def register(self, project):
+        """Add or refresh the hint script for one project"""
+        name = SCRIPT_PREFIX + project
+        origins = self.index.origins(project)
+        if not origins:
+            self.page_scripts.unregister(name)
+            return
+        self.page_scripts.register(name, PRECONNECT_SCRIPT % (json.dumps(project), json.dumps(origins)),
+                                   includes=[f"https://{project}*"],
+                                   injection_point=QWebEngineScript.InjectionPoint.DocumentCreation)
+
+    def attach_page(self, page):
+        page.loadFinished.connect(lambda ok, p=page: self.on_load_finished(p, ok))
+
+    def on_load_finished(self, page, ok):
+        if ok:
+            QTimer.singleShot(self.LEARN_DELAY_MS, lambda: self.learn(page))
+
+    def learn(self, page):
+        try:
+            url = page.url()
+        except RuntimeError:
+            # The tab was closed in the meantime
+            return
+        if url.scheme() != "https":
+            return
+        own = origin_of(url.toString())
+        # Library files are served from the local store, so their CDNs need no connection
+        origins = {origin_of(resource) for resource in self.browser.request_recorder.page_resources(url.toString())
+                   if not is_library_url(QUrl(resource).host(), resource)}
+        origins.discard(None)
+        origins.discard(own)
+        if not origins:
+            return
+        before = set(self.index.projects)
+        self.index.observe(project_key(url), origins)
+        self.index.save()
+        changed = [SCRIPT_PREFIX + project for project in before - set(self.index.projects)]
+        for name in changed:
+            self.page_scripts.unregister(name)
+        self.register(project_key(url))
+        changed.append(SCRIPT_PREFIX + project_key(url))
+        # Open tabs pick up the new hints on their next navigation
+        for view in self.browser.tabs.views():
+            self.page_scripts.install(view.page(), changed)
@@ -0,0 +1,127 @@
+import os
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEngineSettings
+from .browser_settings import BrowserSettings
+from .interceptor import ChromeRequestInterceptor
+from .request_telemetry import RequestRecorder
+from .performance_profiles import current_profile
+from .storage_layout import StorageLayout
+from .http_cache_index import apply_pending_removals
+from .library_store import SCHEME, LibraryStore, LibrarySchemeHandler
+from .offline_bundles import SCHEME as BUNDLE_SCHEME, BundleLibrary, BundleSchemeHandler
+
+CHROME_VERSION = "120.0.0.0"
+WEBKIT_VERSION = "537.36"
+
+class SharedProfile:
+    """A built profile together with the interceptor and recorder installed on it"""
+    def __init__(self, name, profile, interceptor, storage_path, request_recorder, layout, bundle_library):
+        self.name = name
+        self.profile = profile
+        self.interceptor = interceptor
+        self.storage_path = storage_path
+        self.request_recorder = request_recorder
+        self.layout = layout
+        self.bundle_library = bundle_library
+
+class ProfileManager:
+    """Process-wide registry that builds each named QWebEngineProfile once
+
+    Every window and page of both entry points asks the manager for its profile, so they
+    share one HTTP cache, cookie store and interceptor. Only the first window pays for
+    building the profile; later ones attach to the warm one.
+    """
+    DEFAULT_PROFILE = "WebSimProfile"
+    _profiles = {}
+
+    @classmethod
+    def get(cls, name=DEFAULT_PROFILE):
+        """Return the shared profile called name, building it on first use"""
+        shared = cls._profiles.get(name)
+        if shared is None:
+            shared = cls._build(name)
+            cls._profiles[name] = shared
+        return shared
+
+    @classmethod
+    def attach(cls, browser, name=DEFAULT_PROFILE):
+        """Give a browser window the shared profile and the objects that go with it"""
+        shared = cls.get(name)
+        browser.profile = shared.profile
+        browser.interceptor = shared.interceptor
+        browser.storage_path = shared.storage_path
+        browser.request_recorder = shared.request_recorder
+        browser.bundle_library = shared.bundle_library
+        return shared
+
+    @classmethod
+    def _build(cls, name):
+        # Platform data and cache locations, carrying over data from the old layout once
+        layout = StorageLayout()
+        layout.migrate()
+        layout.ensure()
+        apply_pending_removals(layout.cache_path)
+        storage_path = layout.data_root
+
+        # Print storage path for debugging
+        print(f"Storage path: {storage_path}")
+
+        # Owned by the application rather than a window, so closing a window keeps it alive
+        profile = QWebEngineProfile(name, QApplication.instance())
+        profile.setPersistentStoragePath(layout.profile_path)
+        profile.setCachePath(layout.cache_path)
+        profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+        # Cache size comes from the selected performance profile
+        performance = current_profile(BrowserSettings.app_settings())
+        profile.setHttpCacheMaximumSize(performance["cache_mb"] * 1024 * 1024)
+
+        # Configure security settings
+        settings = profile.settings()
+        BrowserSettings._configure_settings(settings)
+
+        # Set modern Chrome user agent with full security features
+        profile.setHttpUserAgent(
+            f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/{WEBKIT_VERSION} "
+            f"(KHTML, like Gecko) Chrome/{CHROME_VERSION} Safari/{WEBKIT_VERSION} "
+            f"Chromium/{CHROME_VERSION}"
+        )
+
+        # Set language and encoding
+        profile.setHttpAcceptLanguage("en-US,en;q=0.9")
+
+        # One interceptor per profile; the manager keeps the reference the profile doesn't
+        interceptor = ChromeRequestInterceptor(CHROME_VERSION)
+        profile.setUrlRequestInterceptor(interceptor)
+
+        # One local copy of each versioned CDN library, served to every project
+        library_store = LibraryStore(os.path.join(storage_path, 'libraries'))
+        profile.installUrlSchemeHandler(SCHEME, LibrarySchemeHandler(library_store, profile))
+        interceptor.serve_libraries = True
+        interceptor.library_pins = library_store.pins
+
+        # Exported projects open from their bundle with no network at all
+        bundle_library = BundleLibrary(os.path.join(storage_path, 'bundles'))
+        profile.installUrlSchemeHandler(BUNDLE_SCHEME, BundleSchemeHandler(bundle_library, profile))
+        interceptor.serve_bundles = True
+        QApplication.instance().aboutToQuit.connect(bundle_library.close)
+
+        # Record what pages fetch into a rotating log under the profile directory
+        request_recorder = RequestRecorder(os.path.join(storage_path, 'telemetry', 'requests.ndjson'))
+        request_recorder.start()
+        interceptor.recorder = request_recorder
+        QApplication.instance().aboutToQuit.connect(request_recorder.close)
+
+        # Enhanced persistence settings for login
+        profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalStorageEnabled, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanPaste, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.AllowWindowActivationFromJavaScript, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.PdfViewerEnabled, True)
+
+        layout.self_check(profile)
+        QApplication.instance().aboutToQuit.connect(layout.record_usage)
+
+        return SharedProfile(name, profile, interceptor, storage_path, request_recorder, layout, bundle_library)
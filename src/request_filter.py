@@ -0,0 +1,135 @@
+import os
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "filter_rules.txt")
+
+ALLOW = "allow"
+BLOCK = "block"
+HEADER = "header"
+
+class HostRules:
+    """Everything the rule set says about one host and its subdomains"""
+    __slots__ = ("action", "allow_prefixes", "block_prefixes", "headers")
+
+    def __init__(self):
+        self.action = None
+        self.allow_prefixes = ()
+        self.block_prefixes = ()
+        self.headers = ()
+
+def host_suffixes(host):
+    """Yield a host and each parent domain, most specific first"""
+    yield host
+    i = host.find(".")
+    while i != -1:
+        yield host[i + 1:]
+        i = host.find(".", i + 1)
+
+# Second-level labels under which country domains register names, as in example.co.uk.
+# A stand-in for the public suffix list, which isn't shipped.
+COUNTRY_SECOND_LEVELS = {"co", "com", "net", "org", "ac", "gov", "edu", "ne", "or", "go"}
+
+def registrable_domain(host):
+    """The part of a host a site registers: example.com for a.b.example.com"""
+    labels = host.lower().rstrip(".").split(".")
+    count = 3 if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in COUNTRY_SECOND_LEVELS else 2
+    return ".".join(labels[-count:])
+
+def same_site(host, first_party_host):
+    """True if a request to host is first-party for a page on first_party_host"""
+    return bool(first_party_host) and registrable_domain(host) == registrable_domain(first_party_host)
+
+def _prefix_host(prefix):
+    """Return the host part of a URL prefix rule"""
+    rest = prefix.split("://", 1)[1]
+    for sep in "/?#:":
+        rest = rest.split(sep, 1)[0]
+    return rest.lower()
+
+class RequestFilter:
+    """Compiled block/allow/header rules indexed by host
+
+    Rules are one per line:
+        block  tracker.example          host and all its subdomains
+        allow  cdn.tracker.example      exception, the most specific host wins
+        block  https://host/path/       URL prefix
+        header websim.ai  Name: Value   set a header on matching requests (* for all hosts)
+
+    Matching walks the request host's parent domains with one dict lookup each,
+    so the cost depends on the number of labels in the host, not the number of rules.
+    Block rules are meant for third-party requests; the interceptor lets navigations and
+    same-site requests through.
+    """
+    def __init__(self, lines=()):
+        self.hosts = {}
+        self.global_headers = ()
+        self.rule_count = 0
+        self.add_rules(lines)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        """Load rules from a file, returning an empty filter if it does not exist"""
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f)
+
+    def _entry(self, host):
+        entry = self.hosts.get(host)
+        if entry is None:
+            entry = self.hosts[host] = HostRules()
+        return entry
+
+    def add_rules(self, lines):
+        """Parse and index rule lines, skipping blanks, comments and malformed lines"""
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split(None, 2)
+            if len(parts) < 2:
+                continue
+            kind, target = parts[0].lower(), parts[1]
+            if kind == HEADER:
+                if len(parts) < 3 or ":" not in parts[2]:
+                    continue
+                name, value = parts[2].split(":", 1)
+                header = (name.strip().encode(), value.strip().encode())
+                if target == "*":
+                    self.global_headers += (header,)
+                else:
+                    entry = self._entry(target.lower().lstrip("."))
+                    entry.headers += (header,)
+            elif kind in (ALLOW, BLOCK):
+                if "://" in target:
+                    entry = self._entry(_prefix_host(target))
+                    if kind == ALLOW:
+                        entry.allow_prefixes += (target,)
+                    else:
+                        entry.block_prefixes += (target,)
+                else:
+                    self._entry(target.lower().lstrip(".")).action = kind
+            else:
+                continue
+            self.rule_count += 1
+
+    def match(self, host, url):
+        """Return (blocked, headers) for a request in one walk over the host's parent domains"""
+        headers = self.global_headers
+        blocked = None
+        hosts = self.hosts
+        for suffix in host_suffixes(host):
+            entry = hosts.get(suffix)
+            if entry is None:
+                continue
+            if entry.headers:
+                headers = headers + entry.headers
+            if blocked is not None:
+                continue
+            # Prefixes are only compared for hosts that have them
+            if entry.allow_prefixes and url.startswith(entry.allow_prefixes):
+                blocked = False
+            elif entry.block_prefixes and url.startswith(entry.block_prefixes):
+                blocked = True
+            elif entry.action is not None:
+                blocked = entry.action == BLOCK
+        return bool(blocked), headers
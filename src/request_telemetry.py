@@ -0,0 +1,223 @@
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+def site_of(host):
+    """Approximate the registrable domain of a host by its last two labels"""
+    parts = host.rsplit(".", 2)
+    return ".".join(parts[-2:]) if len(parts) > 1 else host
+
+def origin_of(url):
+    """scheme://host[:port] of an http(s) URL string, or None for anything else"""
+    scheme, _, rest = url.partition("://")
+    if scheme not in ("http", "https") or not rest:
+        return None
+    host = rest.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0].rsplit("@", 1)[-1]
+    default_port = ":443" if scheme == "https" else ":80"
+    if host.endswith(default_port):
+        host = host[:-len(default_port)]
+    return f"{scheme}://{host.lower()}"
+
+def _enum_name(value, prefix):
+    name = getattr(value, "name", str(value))
+    return name[len(prefix):] if name.startswith(prefix) else name
+
+class PageLoadSummary:
+    """Per-host counts, third-party share and resource-type mix for one page load"""
+    # Distinct URLs remembered per page, for exporting offline bundles
+    MAX_URLS = 5000
+
+    def __init__(self, page_url, started):
+        self.page_url = page_url
+        self.page_site = site_of(page_url.split("://", 1)[-1].split("/", 1)[0].split(":", 1)[0])
+        self.started = started
+        self.requests = 0
+        self.third_party = 0
+        self.blocked = 0
+        self.hosts = Counter()
+        self.resource_types = Counter()
+        self.urls = set()
+
+    def add(self, host, resource_type, blocked, url=None):
+        self.requests += 1
+        if url is not None and not blocked and len(self.urls) < self.MAX_URLS:
+            self.urls.add(url)
+        self.hosts[host] += 1
+        self.resource_types[resource_type] += 1
+        if site_of(host) != self.page_site:
+            self.third_party += 1
+        if blocked:
+            self.blocked += 1
+
+    def to_dict(self):
+        return {
+            "type": "summary",
+            "page": self.page_url,
+            "started": self.started,
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "third_party_share": round(self.third_party / self.requests, 3) if self.requests else 0.0,
+            "hosts": dict(self.hosts.most_common(25)),
+            "resource_types": dict(self.resource_types)
+        }
+
+class RequestRecorder:
+    """Record intercepted requests into a bounded ring buffer and flush them to a rotating NDJSON log
+
+    record() only appends a tuple to a deque with a fixed maxlen, which is atomic in CPython,
+    so the interceptor never waits on a lock or on disk. When the buffer is full the oldest
+    entries are overwritten and counted as dropped.
+    """
+    BUFFER_SIZE = 8192
+    FLUSH_INTERVAL = 2.0
+    MAX_LOG_BYTES = 5 * 1024 * 1024
+    LOG_BACKUPS = 3
+    # Page load summaries kept in memory
+    MAX_SUMMARIES = 50
+
+    def __init__(self, log_path, buffer_size=BUFFER_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.log_path = log_path
+        self.buffer = deque(maxlen=buffer_size)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.summaries = OrderedDict()
+        self.summaries_lock = threading.Lock()
+        # origin -> (last seen, first party URL) for frames, read by the storage GC
+        self.frame_origins = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.logger = None
+
+    def _open_log(self):
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        logger = logging.getLogger(f"websim.telemetry.{id(self)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(
+            self.log_path, maxBytes=self.MAX_LOG_BYTES, backupCount=self.LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        return logger
+
+    def start(self):
+        """Start the background flush thread"""
+        if self.thread is not None:
+            return
+        self.logger = self._open_log()
+        self.thread = threading.Thread(target=self._run, name="RequestRecorder", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Stop the flush thread and write out whatever is still buffered"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join(timeout=5)
+        self.thread = None
+        self.flush()
+        with self.summaries_lock:
+            for summary in self.summaries.values():
+                self.logger.info(json.dumps(summary.to_dict()))
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
+
+    def record(self, url, host, method, resource_type, navigation_type, initiator, first_party, blocked):
+        """Called from interceptRequest; Qt values are converted later on the flush thread"""
+        buffer = self.buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((time.time(), url, host, method, resource_type, navigation_type,
+                       initiator, first_party, blocked))
+
+    def _run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Request telemetry flush failed: {str(e)}")
+
+    def _drain(self):
+        batch = []
+        popleft = self.buffer.popleft
+        try:
+            while True:
+                batch.append(popleft())
+        except IndexError:
+            return batch
+
+    def flush(self):
+        """Write buffered requests to the log and fold them into the page load summaries"""
+        batch = self._drain()
+        if not batch:
+            return
+        lines = []
+        for ts, url, host, method, resource_type, navigation_type, initiator, first_party, blocked in batch:
+            resource_name = _enum_name(resource_type, "ResourceType")
+            first_party_url = first_party.toString()
+            lines.append(json.dumps({
+                "ts": round(ts, 3),
+                "url": url,
+                "method": bytes(method).decode("ascii", "replace"),
+                "resource_type": resource_name,
+                "navigation_type": _enum_name(navigation_type, "NavigationType"),
+                "initiator": initiator.toString(),
+                "first_party": first_party_url,
+                "blocked": blocked
+            }))
+            self._summarise(ts, url, host, resource_name, first_party_url, blocked)
+            if resource_name in ("MainFrame", "SubFrame") and not blocked:
+                origin = origin_of(url)
+                if origin is not None:
+                    with self.summaries_lock:
+                        self.frame_origins[origin] = (ts, url if resource_name == "MainFrame" else first_party_url)
+        if self.dropped:
+            lines.append(json.dumps({"type": "dropped", "count": self.dropped}))
+            self.dropped = 0
+        self.logger.info("\n".join(lines))
+
+    def _summarise(self, ts, url, host, resource_name, first_party_url, blocked):
+        with self.summaries_lock:
+            if resource_name == "MainFrame":
+                # A main frame request starts a new page load for that URL
+                finished = self.summaries.pop(url, None)
+                if finished is not None:
+                    self.logger.info(json.dumps(finished.to_dict()))
+                first_party_url = url
+            summary = self.summaries.get(first_party_url)
+            if summary is None:
+                summary = self.summaries[first_party_url] = PageLoadSummary(first_party_url, ts)
+                while len(self.summaries) > self.MAX_SUMMARIES:
+                    _, evicted = self.summaries.popitem(last=False)
+                    self.logger.info(json.dumps(evicted.to_dict()))
+            summary.add(host, resource_name, blocked, url)
+
+    def page_summaries(self):
+        """Return the in-memory page load summaries, most recent last"""
+        with self.summaries_lock:
+            return [summary.to_dict() for summary in self.summaries.values()]
+
+    def take_frame_origins(self):
+        """Return and forget the frame origins seen since the last call"""
+        with self.summaries_lock:
+            origins, self.frame_origins = self.frame_origins, {}
+        return origins
+
+    def page_resources(self, page_url):
+        """URLs fetched, and not blocked, while loading page_url; empty if it wasn't seen
+
+        Reads the summaries as of the last flush, at most flush_interval old; flushing here
+        would write the log on the caller's (GUI) thread.
+        """
+        with self.summaries_lock:
+            summary = self.summaries.get(page_url)
+            if summary is None:
+                # The address bar may carry a fragment the request didn't
+                bare = page_url.split("#", 1)[0]
+                summary = next((s for url, s in reversed(self.summaries.items())
+                                if url.split("#", 1)[0] == bare), None)
+            return set(summary.urls) if summary is not None else set()
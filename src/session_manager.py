@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+from PyQt6.QtCore import QObject, QTimer, QUrl
+from PyQt6.QtGui import QIcon
+from .plugin_manager import project_key
+from .tab_manager import TabPlaceholder
+
+class SessionStore:
+    """The session file: one entry per tab plus the selected index, replaced atomically"""
+    VERSION = 2
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, "session.json")
+        self.icons_dir = os.path.join(directory, "icons")
+
+    def load(self):
+        """Return (entries, current index), or ([], 0) without a usable session"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+            if "tabs" not in session:
+                # Sessions written before tab entries only kept the URLs
+                session["tabs"] = [{"url": url} for url in session["urls"]]
+            entries = [entry for entry in session["tabs"] if entry.get("url")]
+            return entries, max(0, min(int(session.get("current", 0)), len(entries) - 1))
+        except (OSError, ValueError, KeyError, TypeError):
+            return [], 0
+
+    def save(self, entries, current):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "current": current, "tabs": entries}, f, separators=(",", ":"))
+        os.replace(self.path + ".tmp", self.path)
+
+    def current_url(self):
+        """The page that was selected at exit, if it can be reopened"""
+        entries, current = self.load()
+        if entries and entries[current]["url"].startswith(("http://", "https://")):
+            return entries[current]["url"]
+        return None
+
+    def icon_path(self, project):
+        """Where the favicon of a project (see project_key) is kept"""
+        return os.path.join(self.icons_dir, hashlib.sha1(project.encode("utf-8")).hexdigest() + ".png")
+
+class SessionManager(QObject):
+    """Keep the session file current and restore it lazily
+
+    Tab changes restart a debounce timer, so a burst of navigations costs one write. On
+    restore only the selected tab gets a page; every other tab is a placeholder showing the
+    saved title and favicon until it is selected, when its page, scroll position and
+    plugins come back.
+    """
+    SAVE_DELAY_MS = 2000
+
+    def __init__(self, browser, store):
+        super().__init__(browser)
+        self.browser = browser
+        self.store = store
+        self.restoring = False
+        # Icon path -> cacheKey of the icon last written there, so unchanged icons aren't rewritten
+        self.saved_icons = {}
+
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(self.SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.save)
+
+        browser.tabs.changed.connect(self.schedule_save)
+        browser.tabs.restored.connect(self.on_restored)
+
+    def schedule_save(self):
+        if not self.restoring:
+            self.save_timer.start()
+
+    def entry_for(self, view):
+        url = view.url().toString()
+        scroll = view.page().scrollPosition()
+        entry = {"url": url, "title": view.title(), "scroll": [round(scroll.x()), round(scroll.y())]}
+        plugins = self.browser.plugin_manager.active_plugins(project_key(view.url())) \
+            if hasattr(self.browser, "plugin_manager") else []
+        if plugins:
+            entry["plugins"] = list(plugins)
+        icon = view.icon()
+        icon_path = self.store.icon_path(project_key(view.url()))
+        if not icon.isNull() and self.saved_icons.get(icon_path) != icon.cacheKey():
+            os.makedirs(self.store.icons_dir, exist_ok=True)
+            if icon.pixmap(16, 16).save(icon_path, "PNG"):
+                self.saved_icons[icon_path] = icon.cacheKey()
+        return entry
+
+    def save(self):
+        """Write every tab; placeholders keep the entry they were restored from"""
+        self.save_timer.stop()
+        entries = []
+        current = 0
+        selected = self.browser.tabs.widget.currentIndex()
+        for index, tab in enumerate(self.browser.tabs.tabs()):
+            # Tabs that aren't saved (bundles, snapshots) shift the entries against the tab indexes
+            if index == selected:
+                current = len(entries)
+            if isinstance(tab, TabPlaceholder):
+                entries.append(tab.entry)
+            elif tab.url().scheme() in ("http", "https"):
+                entries.append(self.entry_for(tab))
+        try:
+            self.store.save(entries, max(0, min(current, len(entries) - 1)))
+        except OSError as e:
+            print(f"Could not save session: {str(e)}")
+
+    def restore(self, entries, current):
+        """Add placeholders around the already open first tab, which shows entries[current]"""
+        self.restoring = True
+        for index, entry in enumerate(entries):
+            if index == current:
+                continue
+            icon_path = self.store.icon_path(project_key(QUrl(entry["url"])))
+            icon = QIcon(icon_path) if os.path.exists(icon_path) else None
+            self.browser.tabs.add_placeholder(entry, icon, index if index < current else -1)
+        self.restoring = False
+        if 0 <= current < len(entries):
+            self.on_restored(self.browser.web_view, entries[current])
+
+    def on_restored(self, view, entry):
+        """Bring back the plugins and, once loaded, the scroll position of a restored tab"""
+        plugin_manager = getattr(self.browser, "plugin_manager", None)
+        if entry.get("plugins") and plugin_manager is not None:
+            project = project_key(QUrl(entry["url"]))
+            if project not in plugin_manager.active:
+                plugin_manager.active[project] = list(entry["plugins"])
+                plugin_manager.save_active()
+        x, y = entry.get("scroll", [0, 0])
+        if x or y:
+            page = view.page()
+            def scroll(ok):
+                page.loadFinished.disconnect(scroll)
+                if ok:
+                    page.runJavaScript(f"window.scrollTo({x}, {y});")
+            page.loadFinished.connect(scroll)
@@ -0,0 +1,75 @@
+import os
+from PyQt6.QtCore import QObject, QEvent, QTimer, QPropertyAnimation, Qt
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QLabel, QGraphicsOpacityEffect
+
+class SessionSnapshot:
+    """A picture of the page that was on screen when the last session ended"""
+    SNAPSHOT_QUALITY = 85
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.image_path = os.path.join(directory, "snapshot.jpg")
+
+    def save(self, view):
+        """Grab the visible page; called while the window is still up"""
+        if view is not None and view.url().scheme() in ("http", "https"):
+            os.makedirs(self.directory, exist_ok=True)
+            view.grab().save(self.image_path, "JPG", self.SNAPSHOT_QUALITY)
+        elif os.path.exists(self.image_path):
+            os.remove(self.image_path)
+
+    def pixmap(self):
+        pixmap = QPixmap(self.image_path) if os.path.exists(self.image_path) else QPixmap()
+        return None if pixmap.isNull() else pixmap
+
+class SnapshotOverlay(QObject):
+    """Cover a widget with the last session's snapshot and fade it out once the live page is ready"""
+    FADE_MS = 250
+    # Give up on the live page and reveal whatever is there after this long
+    MAX_SHOW_MS = 10000
+
+    def __init__(self, target, pixmap):
+        super().__init__(target)
+        self.target = target
+        self.pixmap = pixmap
+        self.label = QLabel(target)
+        self.label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        self.label.setStyleSheet("background: white;")
+        # Clicks go through to the live page underneath
+        self.label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.effect = QGraphicsOpacityEffect(self.label)
+        self.effect.setOpacity(1.0)
+        self.label.setGraphicsEffect(self.effect)
+        self.animation = None
+        self.fit()
+        self.label.show()
+        self.label.raise_()
+        target.installEventFilter(self)
+        QTimer.singleShot(self.MAX_SHOW_MS, self.fade_out)
+
+    def fit(self):
+        self.label.setGeometry(self.target.rect())
+        self.label.setPixmap(self.pixmap.scaledToWidth(
+            self.target.width(), Qt.TransformationMode.SmoothTransformation))
+
+    def eventFilter(self, obj, event):
+        if obj is self.target and event.type() == QEvent.Type.Resize and self.label is not None:
+            self.fit()
+        return False
+
+    def fade_out(self, *args):
+        """Cross-fade to the live page and remove the snapshot"""
+        if self.label is None or self.animation is not None:
+            return
+        self.animation = QPropertyAnimation(self.effect, b"opacity", self)
+        self.animation.setDuration(self.FADE_MS)
+        self.animation.setStartValue(1.0)
+        self.animation.setEndValue(0.0)
+        self.animation.finished.connect(self.remove)
+        self.animation.start()
+
+    def remove(self):
+        self.target.removeEventFilter(self)
+        self.label.deleteLater()
+        self.label = None
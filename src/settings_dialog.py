@@ -1,6 +1,10 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout,
                            QPushButton, QLabel, QCheckBox, QSpinBox,
-                           QMessageBox)
+                           QComboBox)
+from .browser_settings import BrowserSettings
+from .clear_cache_dialog import ClearCacheDialog
+from .performance_profiles import PROFILES, profile_name, current_profile, diagnostics_html, engine_switches
+from .async_runtime import spawn, run_blocking
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -20,10 +24,26 @@ class SettingsDialog(QDialog):
         cache_layout.addWidget(QLabel("Cache Size (MB):"))
         self.cache_size = QSpinBox()
         self.cache_size.setRange(50, 1000)
-        self.cache_size.setValue(100)
+        self.cache_size.setValue(current_profile(BrowserSettings.app_settings())["cache_mb"])
         cache_layout.addWidget(self.cache_size)
         layout.addLayout(cache_layout)
         
+        # Performance profile, applied to the engine at the next start
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("Performance Profile:"))
+        self.performance_profile = QComboBox()
+        for name, profile in PROFILES.items():
+            self.performance_profile.addItem(profile["label"], name)
+        self.performance_profile.setCurrentIndex(
+            self.performance_profile.findData(profile_name(BrowserSettings.app_settings())))
+        profile_layout.addWidget(self.performance_profile)
+        layout.addLayout(profile_layout)
+        layout.addWidget(QLabel("Profile changes take effect after a restart."))
+
+        diagnostics_btn = QPushButton("Performance Diagnostics")
+        diagnostics_btn.clicked.connect(self.show_diagnostics)
+        layout.addWidget(diagnostics_btn)
+
         # Clear data button
         clear_data_btn = QPushButton("Clear Browsing Data")
         clear_data_btn.clicked.connect(self.clear_data)
@@ -37,7 +57,25 @@ class SettingsDialog(QDialog):
         self.setLayout(layout)
     
     def clear_data(self):
-        profile = self.parent().profile
-        profile.clearHttpCache()
-        profile.clearAllVisitedLinks()
-        QMessageBox.information(self, "Success", "Browsing data cleared!") 
\ No newline at end of file
+        ClearCacheDialog(self.parent()).exec()
+
+    def selected_profile(self):
+        return self.performance_profile.currentData()
+
+    def show_diagnostics(self):
+        """Open a tab describing the active profile and what reached the engine
+
+        The dialog stays open: opening diagnostics must not apply the settings being edited.
+        """
+        spawn(self.open_diagnostics(self.parent()))
+
+    async def open_diagnostics(self, browser):
+        try:
+            switches = await run_blocking(engine_switches)
+        except Exception as e:
+            print(f"Could not read engine switches: {str(e)}")
+            switches = None
+        page_html = diagnostics_html(browser.profile, BrowserSettings.app_settings(), switches)
+        tabs = getattr(browser, "tabs", None)
+        view = tabs.new_tab() if tabs is not None else browser.web_view
+        view.setHtml(page_html)
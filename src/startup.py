@@ -0,0 +1,127 @@
+import time
+from PyQt6.QtCore import QObject, QTimer, QUrl, pyqtSignal
+
+HOME_URL = "https://websim.ai"
+
+class StartupNavigator(QObject):
+    """Hold the first navigation until the profile's cookie store has loaded"""
+    storeLoaded = pyqtSignal()
+    firstPaint = pyqtSignal(float)
+
+    # The store counts as loaded once no cookie has arrived for this long
+    SETTLE_MS = 50
+    # Never hold the first navigation back for longer than this
+    MAX_WAIT_MS = 1000
+    # A session cookie this soon after the first load was still loading from disk; later
+    # ones come from the user logging in and need no help
+    RELOAD_WINDOW_MS = 3000
+
+    # Cookies on this domain whose name contains one of the hints carry the login
+    SESSION_COOKIE_DOMAIN = "websim.ai"
+    SESSION_COOKIE_HINTS = ("session", "auth", "token")
+
+    def __init__(self, browser, url=HOME_URL, launch_time=None):
+        super().__init__(browser)
+        self.browser = browser
+        # The view the first navigation goes to; other tabs may be current by the time it loads
+        self.view = browser.web_view
+        self.url = QUrl(url)
+        self.launch_time = launch_time if launch_time is not None else time.perf_counter()
+        self.first_paint_ms = None
+
+        self.store_loaded = False
+        self.first_load_done = False
+        self.first_load_time = None
+        self.has_session_cookie = False
+        self.reloaded = False
+
+        # Debounce timer restarted by every cookieAdded while the store loads
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(self.SETTLE_MS)
+        self.settle_timer.timeout.connect(self.on_store_loaded)
+
+        self.max_wait_timer = QTimer(self)
+        self.max_wait_timer.setSingleShot(True)
+        self.max_wait_timer.setInterval(self.MAX_WAIT_MS)
+        self.max_wait_timer.timeout.connect(self.on_store_loaded)
+
+        browser.profile.cookieStore().cookieAdded.connect(self.on_cookie_added)
+        self.view.page().loadFinished.connect(self.on_load_finished)
+
+    def start(self):
+        """Ask the cookie store to load and navigate once it has settled"""
+        self.browser.profile.cookieStore().loadAllCookies()
+        self.settle_timer.start()
+        self.max_wait_timer.start()
+
+    def is_session_cookie(self, cookie):
+        """Check whether a cookie looks like the websim.ai login cookie"""
+        domain = cookie.domain().lstrip(".")
+        if domain != self.SESSION_COOKIE_DOMAIN and not domain.endswith("." + self.SESSION_COOKIE_DOMAIN):
+            return False
+        name = bytes(cookie.name()).decode("utf-8", "replace").lower()
+        return any(hint in name for hint in self.SESSION_COOKIE_HINTS)
+
+    def on_cookie_added(self, cookie):
+        """Track session cookies and keep the settle timer running while cookies arrive"""
+        if self.is_session_cookie(cookie):
+            # The login only shows up after the page rendered logged out; reload once
+            if self.first_load_done and not self.has_session_cookie and not self.reloaded \
+                    and (time.perf_counter() - self.first_load_time) * 1000 <= self.RELOAD_WINDOW_MS:
+                self.reloaded = True
+                print("Session cookie arrived after first load, reloading once")
+                self.view.reload()
+            self.has_session_cookie = True
+
+        if not self.store_loaded:
+            self.settle_timer.start()
+
+    def on_store_loaded(self):
+        """Issue the single first navigation"""
+        if self.store_loaded:
+            return
+        self.store_loaded = True
+        self.settle_timer.stop()
+        self.max_wait_timer.stop()
+        self.storeLoaded.emit()
+        self.view.setUrl(self.url)
+
+    def on_load_finished(self, ok):
+        """Record the time from launch to the first successful paint"""
+        if not ok or self.first_load_done:
+            return
+        self.first_load_done = True
+        self.first_load_time = time.perf_counter()
+        self.first_paint_ms = (self.first_load_time - self.launch_time) * 1000
+        print(f"Time to first paint: {self.first_paint_ms:.0f} ms")
+        self.firstPaint.emit(self.first_paint_ms)
+
+class StartupTimeline:
+    """Record wall-clock and CPU time for each startup phase, measured from one mark to the next"""
+    def __init__(self, launch_time=None, launch_cpu=None):
+        self.launch_time = launch_time if launch_time is not None else time.perf_counter()
+        self.launch_cpu = launch_cpu if launch_cpu is not None else time.process_time()
+        # The first phase runs from launch, so it covers the imports
+        self.last_mark = self.launch_time
+        self.last_cpu = self.launch_cpu
+        self.phases = []
+
+    def mark(self, name):
+        """End the current phase under the given name and start the next one"""
+        now = time.perf_counter()
+        cpu = time.process_time()
+        self.phases.append((name, self.last_mark, now - self.last_mark, cpu - self.last_cpu))
+        self.last_mark = now
+        self.last_cpu = cpu
+
+    def add(self, name, start, duration, cpu=0.0):
+        """Record a phase that does not follow the previous mark, e.g. an asynchronous wait"""
+        self.phases.append((name, start, duration, cpu))
+
+    def report(self, title="Startup timeline"):
+        """Print each phase with its duration and its offset from launch"""
+        print(f"{title}:")
+        for name, start, duration, cpu in self.phases:
+            offset = (start + duration - self.launch_time) * 1000
+            print(f"  {name:<20} {duration * 1000:8.1f} ms  cpu {cpu * 1000:7.1f} ms   (+{offset:.0f} ms)")
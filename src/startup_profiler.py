@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+
+PROFILE_ENV = "WEBSIM_STARTUP_PROFILE"
+BUDGET_ENV = "WEBSIM_STARTUP_BUDGET"
+PROFILE_FLAG = "--profile-startup"
+BUDGET_FLAG = "--startup-budget"
+DEFAULT_TRACE_PATH = "startup_trace.json"
+
+# Per-phase wall-clock limits in milliseconds, overridable with a JSON budget file
+DEFAULT_BUDGET_MS = {
+    "imports": 1500,
+    "QApplication": 500,
+    "profile": 300,
+    "page": 500,
+    "managers": 100,
+    "first loadFinished": 8000
+}
+
+def _flag_value(argv, flag):
+    """Return the value of --flag or --flag=value, '' for a bare flag and None if absent"""
+    for arg in argv:
+        if arg == flag:
+            return ""
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+def load_budget(path=None):
+    """Load phase limits from a JSON file on top of the defaults"""
+    budget = dict(DEFAULT_BUDGET_MS)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            budget.update(json.load(f))
+    return budget
+
+def check_budget(phases, budget):
+    """Return a message for every phase whose wall-clock time is over its limit"""
+    violations = []
+    for name, duration_ms in phases:
+        limit = budget.get(name)
+        if limit is not None and duration_ms > limit:
+            violations.append(f"{name}: {duration_ms:.1f} ms exceeds budget of {limit} ms")
+    return violations
+
+def trace_phases(trace):
+    """Extract (name, duration_ms) pairs from a Chrome trace written by StartupProfiler"""
+    return [(event["name"], event["dur"] / 1000) for event in trace["traceEvents"] if event.get("ph") == "X"]
+
+class StartupProfiler:
+    """Write a StartupTimeline as a Chrome trace and check it against the phase budget"""
+    def __init__(self, trace_path=DEFAULT_TRACE_PATH, budget_path=None):
+        self.trace_path = trace_path
+        self.budget = load_budget(budget_path)
+        self.finished = False
+
+    @classmethod
+    def from_args(cls, argv=None, environ=None):
+        """Build a profiler if enabled by flag or environment variable, otherwise return None"""
+        argv = sys.argv if argv is None else argv
+        environ = os.environ if environ is None else environ
+        trace_path = _flag_value(argv, PROFILE_FLAG)
+        if trace_path is None:
+            trace_path = environ.get(PROFILE_ENV)
+        if trace_path is None or trace_path.lower() in ("0", "false"):
+            return None
+        if trace_path in ("", "1", "true"):
+            trace_path = DEFAULT_TRACE_PATH
+        budget_path = _flag_value(argv, BUDGET_FLAG) or environ.get(BUDGET_ENV)
+        return cls(trace_path, budget_path)
+
+    def to_trace(self, timeline):
+        """Convert the timeline into Chrome trace event format"""
+        pid = os.getpid()
+        events = [{
+            "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+            "args": {"name": "WebSim Browser startup"}
+        }]
+        for name, start, duration, cpu in timeline.phases:
+            events.append({
+                "name": name,
+                "cat": "startup",
+                "ph": "X",
+                "ts": round((start - timeline.launch_time) * 1e6),
+                "dur": round(duration * 1e6),
+                "pid": pid,
+                "tid": 0,
+                "args": {"cpu_ms": round(cpu * 1000, 3)}
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def finish(self, timeline):
+        """Write the trace once and report budget violations; returns the violations"""
+        if self.finished:
+            return []
+        self.finished = True
+        trace = self.to_trace(timeline)
+        with open(self.trace_path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=1)
+        print(f"Startup trace written to {self.trace_path}")
+        violations = check_budget(trace_phases(trace), self.budget)
+        for violation in violations:
+            print(f"Startup budget exceeded - {violation}")
+        return violations
+
+def main(argv=None):
+    """Check a recorded trace against a budget: python -m src.startup_profiler TRACE [BUDGET]"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python -m src.startup_profiler TRACE [BUDGET]")
+        return 2
+    with open(argv[0], "r", encoding="utf-8") as f:
+        trace = json.load(f)
+    violations = check_budget(trace_phases(trace), load_budget(argv[1] if len(argv) > 1 else None))
+    for violation in violations:
+        print(violation)
+    if not violations:
+        print("All startup phases within budget")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
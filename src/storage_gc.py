@@ -0,0 +1,256 @@
+import json
+import os
+import re
+import time
+from PyQt6.QtCore import QObject, QTimer, QUrl
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from .plugin_manager import project_key
+from .request_telemetry import origin_of
+from .storage_layout import dir_size
+from .async_runtime import spawn, run_blocking
+from .power_saver import page_frames
+
+# Origins holding the websim.ai login; their storage is never evicted
+PROTECTED_ORIGINS = ("https://websim.ai", "https://www.websim.ai")
+
+ORIGIN_IN_INDEX = re.compile(rb"https?://[A-Za-z0-9.\-]+(?::\d+)?")
+
+# Runs in a blank document that has the origin's security context; reports back via the title
+CLEAR_ORIGIN_SCRIPT = """
+<script>
+(async function() {
+    let cleared = 0;
+    const settle = request => new Promise(resolve => {
+        request.onsuccess = request.onerror = request.onblocked = resolve;
+    });
+    try { localStorage.clear(); cleared++; } catch (e) {}
+    try {
+        for (const db of await indexedDB.databases()) {
+            await settle(indexedDB.deleteDatabase(db.name));
+            cleared++;
+        }
+    } catch (e) {}
+    try {
+        for (const key of await caches.keys()) {
+            await caches.delete(key);
+            cleared++;
+        }
+    } catch (e) {}
+    try {
+        for (const registration of await navigator.serviceWorker.getRegistrations()) {
+            await registration.unregister();
+            cleared++;
+        }
+    } catch (e) {}
+    document.title = 'storage-gc:' + cleared;
+})();
+</script>
+"""
+
+def _indexeddb_origin(name):
+    """Origin from an IndexedDB folder name like https_app.websim.ai_0.indexeddb.leveldb"""
+    stem = name.split(".indexeddb", 1)[0]
+    try:
+        scheme, rest = stem.split("_", 1)
+        host, port = rest.rsplit("_", 1)
+    except ValueError:
+        return None
+    return f"{scheme}://{host}" + (f":{port}" if port != "0" else "")
+
+def _cache_storage_origin(folder):
+    """Origin recorded in a CacheStorage folder's index, whose folder name is only a hash"""
+    try:
+        with open(os.path.join(folder, "index.txt"), "rb") as f:
+            match = ORIGIN_IN_INDEX.search(f.read())
+    except OSError:
+        return None
+    return origin_of(match.group(0).decode("ascii")) if match else None
+
+def scan_origin_usage(profile_path):
+    """Bytes of IndexedDB and CacheStorage data per origin under a profile directory"""
+    usage = {}
+    indexeddb = os.path.join(profile_path, "IndexedDB")
+    cache_storage = os.path.join(profile_path, "Service Worker", "CacheStorage")
+    for parent, origin_for in ((indexeddb, lambda name, path: _indexeddb_origin(name)),
+                               (cache_storage, lambda name, path: _cache_storage_origin(path))):
+        try:
+            entries = os.listdir(parent)
+        except OSError:
+            continue
+        for name in entries:
+            path = os.path.join(parent, name)
+            if not os.path.isdir(path):
+                continue
+            origin = origin_for(name, path)
+            if origin is not None:
+                usage[origin] = usage.get(origin, 0) + dir_size(path)
+    return usage
+
+class StorageGC(QObject):
+    """Keep profile storage within a total and a per-origin budget by evicting unused origins
+
+    Last access per origin (and the project it was opened from) comes from the frames the
+    request recorder sees. While the window is idle, a background scan sizes each origin's
+    IndexedDB and CacheStorage; origins over their own budget, then the least recently used
+    ones until the origins' data fits the total budget, have their site storage cleared from
+    a hidden page. Cookies are never touched, and the websim.ai origins and every frame open
+    in a tab are skipped.
+    """
+    INTERVAL_MS = 5 * 60 * 1000
+    EVICT_TIMEOUT_MS = 10000
+    # Origins used this recently are left alone
+    GRACE_SECONDS = 30 * 60
+    DEFAULT_TOTAL_MB = 1024
+    DEFAULT_ORIGIN_MB = 200
+
+    def __init__(self, browser, settings):
+        super().__init__(browser)
+        self.browser = browser
+        self.total_budget = settings.value("storage_gc/total_mb", self.DEFAULT_TOTAL_MB, type=int) * 2**20
+        self.origin_budget = settings.value("storage_gc/origin_mb", self.DEFAULT_ORIGIN_MB, type=int) * 2**20
+        self.profile_path = browser.profile.persistentStoragePath()
+        self.access_path = os.path.join(browser.storage_path, "storage_access.json")
+        self.access = self.load_access()
+        self.scanning = False
+        self.queue = []
+        self.page = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.INTERVAL_MS)
+        self.timer.timeout.connect(self.run)
+
+        self.evict_timer = QTimer(self)
+        self.evict_timer.setSingleShot(True)
+        self.evict_timer.setInterval(self.EVICT_TIMEOUT_MS)
+        self.evict_timer.timeout.connect(self.on_evict_timeout)
+
+    def start(self):
+        self.timer.start()
+
+    def load_access(self):
+        try:
+            with open(self.access_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_access(self):
+        try:
+            with open(self.access_path + ".tmp", "w") as f:
+                json.dump(self.access, f)
+            os.replace(self.access_path + ".tmp", self.access_path)
+        except OSError as e:
+            print(f"Could not save storage access times: {str(e)}")
+
+    def update_access(self):
+        """Fold in the frame origins the recorder saw since the last pass"""
+        for origin, (seen, first_party) in self.browser.request_recorder.take_frame_origins().items():
+            entry = self.access.setdefault(origin, {})
+            entry["last"] = max(seen, entry.get("last", 0))
+            entry["project"] = project_key(QUrl(first_party))
+        self.save_access()
+
+    def open_origins(self):
+        tabs = getattr(self.browser, "tabs", None)
+        views = tabs.views() if tabs is not None else [self.browser.web_view]
+        # Projects run in cross-origin iframes, whose storage is in use as long as the tab is open
+        origins = set()
+        for view in views:
+            origins.add(origin_of(view.url().toString()))
+            origins.update(origin_of(frame.url().toString()) for frame in page_frames(view.page()))
+        return origins
+
+    def is_idle(self):
+        return not self.browser.isActiveWindow() or self.browser.isMinimized()
+
+    def run(self):
+        """Start a background scan if the user is away and no pass is in flight"""
+        if self.scanning or self.queue or not self.is_idle():
+            return
+        self.update_access()
+        self.scanning = True
+        spawn(self.scan())
+
+    async def scan(self):
+        try:
+            usage = await run_blocking(scan_origin_usage, self.profile_path)
+        except Exception as e:
+            print(f"Storage scan failed: {str(e)}")
+            usage = {}
+        self.on_scanned(usage)
+
+    def choose_evictions(self, usage, now=None):
+        """Origins to clear: any over the per-origin budget, then LRU until under the total budget
+
+        Only the origins' own data counts against the total; the HTTP cache and the rest of
+        the profile can't be evicted here, so counting them would clear every candidate.
+        """
+        now = time.time() if now is None else now
+        total = sum(usage.values())
+        keep = set(PROTECTED_ORIGINS) | self.open_origins()
+        candidates = [origin for origin in usage
+                      if origin not in keep
+                      and now - self.access.get(origin, {}).get("last", 0) >= self.GRACE_SECONDS]
+        candidates.sort(key=lambda origin: self.access.get(origin, {}).get("last", 0))
+        chosen = [origin for origin in candidates if usage[origin] > self.origin_budget]
+        total -= sum(usage[origin] for origin in chosen)
+        for origin in candidates:
+            if total <= self.total_budget:
+                break
+            if origin not in chosen:
+                chosen.append(origin)
+                total -= usage[origin]
+        return chosen
+
+    def prune_access(self, usage, now=None):
+        """Forget origins with nothing on disk, unless seen too recently to have written yet"""
+        now = time.time() if now is None else now
+        stale = [origin for origin, entry in self.access.items()
+                 if origin not in usage and now - entry.get("last", 0) >= self.GRACE_SECONDS]
+        for origin in stale:
+            del self.access[origin]
+        if stale:
+            self.save_access()
+        return stale
+
+    def on_scanned(self, usage):
+        self.scanning = False
+        self.prune_access(usage)
+        self.queue = self.choose_evictions(usage)
+        if self.queue:
+            freed = sum(usage[origin] for origin in self.queue)
+            print(f"Storage GC: origins hold {sum(usage.values()) / 2**20:.0f} MB, evicting {len(self.queue)} origins "
+                  f"({freed / 2**20:.0f} MB)")
+            self.evict_next()
+
+    def evict_next(self):
+        """Clear the next queued origin from a hidden page that takes on its origin"""
+        self.evict_timer.stop()
+        if not self.queue or not self.is_idle():
+            # Resume on a later pass if the user came back
+            self.queue = []
+            if self.page is not None:
+                self.page.deleteLater()
+                self.page = None
+            return
+        if self.page is None:
+            self.page = QWebEnginePage(self.browser.profile, self)
+            self.page.titleChanged.connect(self.on_title_changed)
+        origin = self.queue[0]
+        self.evict_timer.start()
+        self.page.setHtml(CLEAR_ORIGIN_SCRIPT, QUrl(origin + "/"))
+
+    def on_evict_timeout(self):
+        if self.queue:
+            print(f"Storage GC: gave up clearing {self.queue.pop(0)}")
+        self.evict_next()
+
+    def on_title_changed(self, title):
+        if not title.startswith("storage-gc:") or not self.queue:
+            return
+        origin = self.queue.pop(0)
+        project = self.access.get(origin, {}).get("project", "unknown project")
+        print(f"Storage GC: cleared {title.split(':', 1)[1]} stores for {origin} ({project})")
+        self.access.pop(origin, None)
+        self.save_access()
+        self.evict_next()
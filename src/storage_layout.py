@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+import time
+from PyQt6.QtCore import QStandardPaths
+from .async_runtime import spawn, run_blocking
+
+APP_DIR = "WebSimBrowser"
+
+def dir_size(path):
+    """Total size in bytes of the files below path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def has_files(path):
+    """True if there is at least one file below path; stops at the first"""
+    for _, _, files in os.walk(path):
+        if files:
+            return True
+    return False
+
+class StorageLayout:
+    """Where the browser keeps its data, resolved per platform through QStandardPaths
+
+    Profile data (cookies, local storage, IndexedDB), plugins and telemetry live under the
+    data location (~/.local/share on Linux, %LOCALAPPDATA% on Windows). The HTTP cache
+    lives under the cache location (~/.cache on Linux).
+    """
+    CHECK_FILE = "storage_check.json"
+
+    def __init__(self, data_root=None, cache_root=None):
+        self.data_root = data_root or os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericDataLocation), APP_DIR)
+        self.cache_root = cache_root or os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation), APP_DIR)
+        self.profile_path = os.path.join(self.data_root, 'profile')
+        self.cache_path = os.path.join(self.cache_root, 'http')
+        self.check_path = os.path.join(self.data_root, self.CHECK_FILE)
+
+    def ensure(self):
+        for path in (self.data_root, self.profile_path, self.cache_path):
+            os.makedirs(path, exist_ok=True)
+
+    def legacy_roots(self):
+        """Directories earlier versions may have written to"""
+        roots = []
+        expanded = os.path.expandvars("%LOCALAPPDATA%")
+        if expanded != "%LOCALAPPDATA%":
+            roots.append(os.path.join(expanded, APP_DIR))
+        # Where %LOCALAPPDATA% doesn't expand, it became a literal folder in the launch directory
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for base in (os.getcwd(), project_dir):
+            roots.append(os.path.join(base, "%LOCALAPPDATA%", APP_DIR))
+        unique = []
+        for root in roots:
+            if os.path.isdir(root) and root not in unique:
+                unique.append(root)
+        return unique
+
+    def migrate(self):
+        """Move data from the old layout into this one; only runs before the profile exists"""
+        if os.path.isdir(self.profile_path):
+            return []
+        moved = []
+        for root in self.legacy_roots():
+            # The old code pointed the persistent storage at 'cookies' last, so that is the profile
+            targets = {
+                'cookies': self.profile_path,
+                'cache': self.cache_path,
+                'plugins': os.path.join(self.data_root, 'plugins'),
+                'telemetry': os.path.join(self.data_root, 'telemetry')
+            }
+            for name, target in targets.items():
+                source = os.path.join(root, name)
+                if not os.path.isdir(source) or os.path.exists(target) or os.path.abspath(source) == os.path.abspath(target):
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    shutil.move(source, target)
+                    moved.append((source, target))
+                except OSError as e:
+                    print(f"Could not migrate {source}: {e}")
+        for source, target in moved:
+            print(f"Migrated {source} -> {target}")
+        return moved
+
+    def usage(self):
+        """What the self-check compares; cheap enough for startup and quit, no full directory walk"""
+        return {
+            "time": time.time(),
+            "cache": has_files(self.cache_path),
+            "cookies": os.path.exists(os.path.join(self.profile_path, 'Cookies'))
+        }
+
+    async def report_cache_size(self):
+        size = await run_blocking(dir_size, self.cache_path)
+        print(f"Storage self-check: reusing {size / 2**20:.1f} MB HTTP cache")
+
+    def self_check(self, profile):
+        """Check the profile really is on disk and that the last run's cache and cookies are still there"""
+        problems = []
+        if profile.isOffTheRecord():
+            problems.append("profile is off the record, nothing will persist")
+        if os.path.abspath(profile.persistentStoragePath()) != os.path.abspath(self.profile_path):
+            problems.append(f"profile storage is {profile.persistentStoragePath()}, expected {self.profile_path}")
+        if os.path.abspath(profile.cachePath()) != os.path.abspath(self.cache_path):
+            problems.append(f"HTTP cache is {profile.cachePath()}, expected {self.cache_path}")
+
+        now = self.usage()
+        try:
+            with open(self.check_path, "r") as f:
+                last = json.load(f)
+        except (OSError, ValueError):
+            last = None
+        if last is None:
+            print("Storage self-check: first run with this layout, starting cold")
+        else:
+            # Files written before the cheap check recorded the cache size instead
+            if last.get("cache", last.get("cache_bytes")) and not now["cache"]:
+                problems.append("HTTP cache from the last run is gone")
+            if last.get("cookies") and not now["cookies"]:
+                problems.append("cookies from the last run are gone")
+        if problems:
+            for problem in problems:
+                print(f"Storage self-check: {problem}")
+        elif last is not None:
+            if now["cookies"]:
+                print("Storage self-check: reusing saved cookies")
+            if now["cache"]:
+                # Sizing a full cache takes seconds; do it off the GUI thread
+                spawn(self.report_cache_size())
+        return problems
+
+    def record_usage(self):
+        """Remember what is on disk at exit for the next run's self-check"""
+        try:
+            with open(self.check_path, "w") as f:
+                json.dump(self.usage(), f)
+        except OSError as e:
+            print(f"Could not write storage check: {e}")
@@ -0,0 +1,214 @@
+import time
+from PyQt6.QtCore import QObject, QTimer, QUrl, Qt, pyqtSignal
+from PyQt6.QtWidgets import QTabWidget, QToolButton, QLabel
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from .startup import HOME_URL
+
+LifecycleState = QWebEnginePage.LifecycleState
+
+class TabPage(QWebEnginePage):
+    """Page that opens new windows as tabs of the same browser"""
+    def __init__(self, profile, parent, tab_manager):
+        super().__init__(profile, parent)
+        self.tab_manager = tab_manager
+
+    def createWindow(self, window_type):
+        background = window_type == QWebEnginePage.WebWindowType.WebBrowserBackgroundTab
+        return self.tab_manager.new_tab(background=background).page()
+
+class TabPlaceholder(QLabel):
+    """Stand-in for a restored tab whose page is only created when the tab is selected"""
+    def __init__(self, entry):
+        super().__init__(entry.get("title") or entry["url"])
+        self.entry = entry
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+    def url(self):
+        return QUrl(self.entry["url"])
+
+class TabManager(QObject):
+    """Tabs sharing one profile, with idle background tabs frozen and then discarded
+
+    Background tabs move Active -> Frozen after FREEZE_AFTER_MS without being selected.
+    Beyond MAX_LIVE_BACKGROUND_TABS, or when discard_least_recently_used is called under
+    memory pressure, the least recently used background tab is Discarded. Chromium
+    reloads a discarded page when it becomes visible again.
+    """
+    FREEZE_AFTER_MS = 5 * 60 * 1000
+    CHECK_INTERVAL_MS = 30 * 1000
+    MAX_LIVE_BACKGROUND_TABS = 4
+
+    # Emitted when the set of tabs, their order, the selection or a page URL or title changes
+    changed = pyqtSignal()
+    # A placeholder became a real tab: (view, saved session entry)
+    restored = pyqtSignal(object, object)
+
+    def __init__(self, browser, setup_page):
+        super().__init__(browser)
+        self.browser = browser
+        self.setup_page = setup_page
+        self.last_active = {}
+
+        self.widget = QTabWidget()
+        self.widget.setTabsClosable(True)
+        self.widget.setMovable(True)
+        self.widget.setDocumentMode(True)
+        self.widget.tabCloseRequested.connect(self.close_tab)
+        self.widget.currentChanged.connect(self.on_current_changed)
+        self.widget.tabBar().tabMoved.connect(lambda *args: self.changed.emit())
+
+        new_tab_button = QToolButton()
+        new_tab_button.setText("➕")
+        new_tab_button.setToolTip("New Tab")
+        new_tab_button.clicked.connect(lambda: self.new_tab(QUrl(HOME_URL)))
+        self.widget.setCornerWidget(new_tab_button)
+
+        self.lifecycle_timer = QTimer(self)
+        self.lifecycle_timer.setInterval(self.CHECK_INTERVAL_MS)
+        self.lifecycle_timer.timeout.connect(self.check_lifecycle)
+        self.lifecycle_timer.start()
+
+    def tabs(self):
+        """Every tab widget in order, placeholders included"""
+        return [self.widget.widget(i) for i in range(self.widget.count())]
+
+    def views(self):
+        """Tabs that have a page; placeholders are left out"""
+        return [tab for tab in self.tabs() if isinstance(tab, QWebEngineView)]
+
+    def current_view(self):
+        return self.widget.currentWidget()
+
+    def new_tab(self, url=None, background=False, index=-1):
+        """Open a tab on the shared profile and return its view"""
+        view = QWebEngineView()
+        page = TabPage(self.browser.profile, view, self)
+        self.setup_page(page)
+        view.setPage(page)
+        view.titleChanged.connect(lambda title, v=view: self.set_tab_text(v, title))
+        view.iconChanged.connect(lambda icon, v=view: self.set_tab_icon(v, icon))
+        view.urlChanged.connect(lambda *args: self.changed.emit())
+
+        index = self.widget.insertTab(index, view, "New Tab")
+        self.last_active[view] = time.monotonic()
+        self.changed.emit()
+        if not background:
+            self.widget.setCurrentIndex(index)
+        if url is not None:
+            view.setUrl(url)
+        return view
+
+    def add_placeholder(self, entry, icon=None, index=-1):
+        """Add a restored tab that costs nothing until it is selected"""
+        placeholder = TabPlaceholder(entry)
+        index = self.widget.insertTab(index, placeholder, (entry.get("title") or "New Tab")[:30])
+        self.widget.setTabToolTip(index, entry.get("title") or entry["url"])
+        if icon is not None:
+            self.widget.setTabIcon(index, icon)
+        return placeholder
+
+    def activate_placeholder(self, placeholder):
+        """Swap a placeholder for a real tab at the same position and load its page"""
+        index = self.widget.indexOf(placeholder)
+        icon = self.widget.tabIcon(index)
+        # Keep currentChanged quiet while the placeholder is swapped for the real tab
+        self.widget.blockSignals(True)
+        self.widget.removeTab(index)
+        view = self.new_tab(index=index)
+        self.widget.blockSignals(False)
+        self.widget.setTabIcon(index, icon)
+        self.set_tab_text(view, placeholder.entry.get("title") or "")
+        placeholder.deleteLater()
+        view.setUrl(placeholder.url())
+        self.restored.emit(view, placeholder.entry)
+        return view
+
+    def close_tab(self, index):
+        """Close a tab, keeping at least one open"""
+        if self.widget.count() <= 1:
+            return
+        view = self.widget.widget(index)
+        self.widget.removeTab(index)
+        self.last_active.pop(view, None)
+        view.deleteLater()
+        self.changed.emit()
+
+    def set_tab_text(self, view, title):
+        index = self.widget.indexOf(view)
+        if index >= 0:
+            self.widget.setTabText(index, title[:30] or "New Tab")
+            self.widget.setTabToolTip(index, title)
+            self.changed.emit()
+
+    def set_tab_icon(self, view, icon):
+        index = self.widget.indexOf(view)
+        if index >= 0:
+            self.widget.setTabIcon(index, icon)
+
+    def on_current_changed(self, index):
+        """Bring the selected tab back to Active; a discarded page reloads here"""
+        view = self.widget.widget(index)
+        if view is None:
+            return
+        if isinstance(view, TabPlaceholder):
+            view = self.activate_placeholder(view)
+        self.last_active[view] = time.monotonic()
+        self.changed.emit()
+        page = view.page()
+        if page.lifecycleState() != LifecycleState.Active:
+            page.setLifecycleState(LifecycleState.Active)
+
+    def background_views(self):
+        """Background tabs, least recently used first"""
+        current = self.current_view()
+        views = [view for view in self.views() if view is not current]
+        return sorted(views, key=lambda view: self.last_active.get(view, 0))
+
+    def check_lifecycle(self):
+        """Freeze idle background tabs and discard the oldest beyond the live tab limit"""
+        now = time.monotonic()
+        live = []
+        for view in self.background_views():
+            page = view.page()
+            state = page.lifecycleState()
+            if state == LifecycleState.Discarded:
+                continue
+            live.append(view)
+            idle_ms = (now - self.last_active.get(view, now)) * 1000
+            if state == LifecycleState.Active and idle_ms >= self.FREEZE_AFTER_MS:
+                self.freeze(view)
+        for view in live[:max(0, len(live) - self.MAX_LIVE_BACKGROUND_TABS)]:
+            self.discard(view)
+
+    def freeze(self, view):
+        """Freeze a hidden page unless Chromium recommends keeping it active (e.g. audio)"""
+        page = view.page()
+        if page.recommendedState() == LifecycleState.Active or page.lifecycleState() != LifecycleState.Active:
+            return False
+        page.setLifecycleState(LifecycleState.Frozen)
+        return True
+
+    def discard(self, view):
+        """Drop a hidden page's renderer state; it reloads when selected
+
+        Chromium only recommends Discarded for pages it has already frozen, so waiting for
+        that would almost never discard; any hidden page it doesn't need kept active goes.
+        """
+        page = view.page()
+        if page.isVisible() or page.lifecycleState() == LifecycleState.Discarded \
+                or page.recommendedState() == LifecycleState.Active:
+            return False
+        page.setLifecycleState(LifecycleState.Discarded)
+        return True
+
+    def freeze_hidden_tabs(self):
+        """Freeze every background tab that can be frozen; returns how many were"""
+        return sum(1 for view in self.background_views() if self.freeze(view))
+
+    def discard_least_recently_used(self):
+        """Discard the least recently used background tab; returns its view or None"""
+        for view in self.background_views():
+            if view.page().lifecycleState() != LifecycleState.Discarded and self.discard(view):
+                return view
+        return None
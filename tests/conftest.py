@@ -0,0 +1,21 @@
+import os
+import sys
+import types
+
+# No display is needed for anything the tests touch
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Register src as a bare package so tests import just the modules they cover; its
+# __init__ pulls in every module, QtWebEngine included
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if "src" not in sys.modules:
+    package = types.ModuleType("src")
+    package.__path__ = [SRC_DIR]
+    sys.modules["src"] = package
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+@pytest.fixture(scope="session")
+def app():
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,77 @@
+import http.server
+import threading
+import pytest
+from PyQt6.QtCore import QStandardPaths
+from src.asset_loader import AssetCache
+
+class AssetHandler(http.server.BaseHTTPRequestHandler):
+    body = b"icon-v1"
+    etag = '"v1"'
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), AssetHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    AssetHandler.body, AssetHandler.etag = b"icon-v1", '"v1"'
+
+def test_fetch_stores_first_usable_response(tmp_path, server):
+    cache = AssetCache(str(tmp_path))
+    path = cache.fetch("logo", [f"{server}/missing", f"{server}/logo.png"])
+    with open(path, "rb") as f:
+        assert f.read() == b"icon-v1"
+    assert cache.cached("logo") == path
+
+def test_fetch_returns_none_when_nothing_answers(tmp_path, server):
+    cache = AssetCache(str(tmp_path))
+    assert cache.fetch("logo", [f"{server}/missing"]) is None
+    assert cache.fetch("logo", []) is None
+    assert cache.cached("logo") is None
+
+def test_revalidate_keeps_unchanged_copy(tmp_path, server):
+    cache = AssetCache(str(tmp_path))
+    path = cache.fetch("logo", [f"{server}/logo.png"])
+    assert cache.revalidate("logo") == (path, False)
+
+def test_revalidate_replaces_changed_copy(tmp_path, server):
+    cache = AssetCache(str(tmp_path))
+    cache.fetch("logo", [f"{server}/logo.png"])
+    AssetHandler.body, AssetHandler.etag = b"icon-v2", '"v2"'
+    path, changed = cache.revalidate("logo")
+    assert changed
+    with open(path, "rb") as f:
+        assert f.read() == b"icon-v2"
+
+def test_revalidate_offline_keeps_cached_copy(tmp_path, server):
+    cache = AssetCache(str(tmp_path), timeout=1)
+    path = cache.fetch("logo", [f"{server}/logo.png"])
+    # Nothing listens on port 9 of the loopback interface
+    cache._store("logo", "http://127.0.0.1:9/logo.png", b"icon-v1", {})
+    assert cache.revalidate("logo") == (path, False)
+
+def test_revalidate_without_cached_copy(tmp_path):
+    assert AssetCache(str(tmp_path)).revalidate("logo") == (None, False)
+
+def test_default_cache_is_outside_the_install_directory():
+    root = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+    assert AssetCache().cache_dir.startswith(root)
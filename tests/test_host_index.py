@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.preconnect import HostIndex
+
+DAY = 24 * 60 * 60
+
+def test_scores_decay_unless_seen_again(tmp_path):
+    index = HostIndex(str(tmp_path / "preconnect.json"))
+    index.observe("websim.ai/p/a", {"https://cdn.example", "https://api.example"}, now=0)
+    for visit in range(1, 4):
+        index.observe("websim.ai/p/a", {"https://cdn.example"}, now=visit)
+    assert index.projects["websim.ai/p/a"]["origins"]["https://cdn.example"] > 2
+    # 0.7 ** 4 is below MIN_SCORE
+    index.observe("websim.ai/p/a", {"https://cdn.example"}, now=4)
+    assert index.origins("websim.ai/p/a") == ["https://cdn.example"]
+
+def test_keeps_best_origins_per_project(tmp_path):
+    index = HostIndex(str(tmp_path / "preconnect.json"))
+    origins = {f"https://{n}.example" for n in range(HostIndex.MAX_ORIGINS + 5)}
+    index.observe("websim.ai/p/a", origins, now=0)
+    assert len(index.origins("websim.ai/p/a")) == HostIndex.MAX_ORIGINS
+
+def test_old_projects_are_forgotten(tmp_path):
+    index = HostIndex(str(tmp_path / "preconnect.json"))
+    index.observe("websim.ai/p/old", {"https://cdn.example"}, now=0)
+    index.observe("websim.ai/p/new", {"https://cdn.example"}, now=HostIndex.MAX_AGE + DAY)
+    assert list(index.projects) == ["websim.ai/p/new"]
+
+def test_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / "sub" / "preconnect.json")
+    index = HostIndex(path)
+    index.observe("websim.ai/p/a", {"https://cdn.example"})
+    index.save()
+    assert HostIndex(path).origins("websim.ai/p/a") == ["https://cdn.example"]
@@ -0,0 +1,86 @@
+import asyncio
+import base64
+import hashlib
+import pytest
+from PyQt6.QtCore import QObject
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.library_store import (load_pins, matches_integrity, is_library_url, published_integrity,
+                               reply_job, LibrarySchemeHandler)
+
+def sri(algorithm, data):
+    return f"{algorithm}-" + base64.b64encode(hashlib.new(algorithm, data).digest()).decode("ascii")
+
+def test_load_pins_reads_hex_and_sri_digests(tmp_path):
+    data = b"export default 1;"
+    path = tmp_path / "pins.txt"
+    path.write_text("# comment\n\n"
+                    f"{hashlib.sha256(data).hexdigest()}  https://cdn.jsdelivr.net/npm/a@1.0.0/a.js\n"
+                    f"{sri('sha384', data)}  https://cdn.tailwindcss.com/3.4.1\n"
+                    "not-hex  https://unpkg.com/b@1.0.0/b.js\n", encoding="utf-8")
+    pins = load_pins(str(path))
+    assert pins == {
+        "https://cdn.jsdelivr.net/npm/a@1.0.0/a.js": sri("sha256", data),
+        "https://cdn.tailwindcss.com/3.4.1": sri("sha384", data)
+    }
+
+def test_load_pins_without_file(tmp_path):
+    assert load_pins(str(tmp_path / "missing.txt")) == {}
+
+def test_matches_integrity():
+    data = b"console.log(1);"
+    assert matches_integrity(data, sri("sha512", data))
+    assert not matches_integrity(b"tampered", sri("sha512", data))
+    assert not matches_integrity(data, "md5-" + base64.b64encode(hashlib.md5(data).digest()).decode("ascii"))
+
+def test_only_verifiable_versioned_urls_are_library_urls():
+    assert is_library_url("cdn.jsdelivr.net", "https://cdn.jsdelivr.net/npm/three@0.160.0/build/three.module.js")
+    assert is_library_url("unpkg.com", "https://unpkg.com/@tensorflow/tfjs@4.1.0/dist/tf.min.js")
+    assert is_library_url("cdnjs.cloudflare.com", "https://cdnjs.cloudflare.com/ajax/libs/tone/14.8.49/Tone.js")
+    assert not is_library_url("cdn.jsdelivr.net", "https://cdn.jsdelivr.net/npm/three/build/three.module.js")
+    assert not is_library_url("cdn.tailwindcss.com", "https://cdn.tailwindcss.com/3.4.1")
+    assert not is_library_url("cdn.jsdelivr.net", "http://cdn.jsdelivr.net/npm/three@0.160.0/build/three.module.js")
+
+def test_published_integrity_uses_cached_listings():
+    listings = {
+        "https://data.jsdelivr.com/v1/packages/npm/three@0.160.0?structure=flat": {"/build/three.js": "sha256-abc"},
+        "https://api.cdnjs.com/libraries/tone/14.8.49?fields=sri": {"/Tone.js": "sha512-def"}
+    }
+    assert published_integrity("https://unpkg.com/three@0.160.0/build/three.js", "UA", listings) == "sha256-abc"
+    assert published_integrity("https://cdnjs.cloudflare.com/ajax/libs/tone/14.8.49/Tone.js", "UA", listings) == "sha512-def"
+    assert published_integrity("https://cdn.jsdelivr.net/npm/three@0.160.0/missing.js", "UA", listings) is None
+    assert published_integrity("https://esm.sh/three@0.160.0", "UA", listings) is None
+
+class StubJob(QObject):
+    def __init__(self):
+        super().__init__()
+        self.headers = None
+        self.replied = None
+
+    def setAdditionalResponseHeaders(self, headers):
+        self.headers = headers
+
+    def reply(self, content_type, device):
+        self.replied = (content_type, bytes(device.readAll()))
+
+def test_reply_sends_body_and_cors_header(app):
+    job = StubJob()
+    reply_job(job, b"export default 1;", "text/javascript")
+    assert job.headers == {b"Access-Control-Allow-Origin": [b"*"]}
+    assert job.replied == (b"text/javascript", b"export default 1;")
+
+class StoredFiles:
+    def __init__(self, files):
+        self.files = files
+
+    def get(self, url):
+        return self.files.get(url)
+
+def test_handler_serves_stored_file_off_the_gui_thread(app):
+    url = "https://cdn.jsdelivr.net/npm/a@1.0.0/a.js"
+    handler = LibrarySchemeHandler(StoredFiles({url: (b"export default 1;", "text/javascript")}))
+    job = StubJob()
+    handler.pending.add(job)
+    asyncio.run(handler.load(job, url, "UA"))
+    assert job.replied == (b"text/javascript", b"export default 1;")
+    assert job not in handler.pending
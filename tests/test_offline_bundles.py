@@ -0,0 +1,63 @@
+import os
+import pytest
+from PyQt6.QtCore import QObject, QUrl
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.offline_bundles import (OfflineBundle, BundleLibrary, BundleSchemeHandler, write_bundle,
+                                 to_bundle_url)
+
+ENTRY = "https://websim.ai/p/a"
+
+class StubJob(QObject):
+    def __init__(self, url):
+        super().__init__()
+        self.url = QUrl(url)
+        self.headers = None
+        self.replied = None
+        self.failed = None
+
+    def requestUrl(self):
+        return self.url
+
+    def setAdditionalResponseHeaders(self, headers):
+        self.headers = headers
+
+    def reply(self, content_type, device):
+        self.replied = (content_type, bytes(device.readAll()))
+
+    def fail(self, error):
+        self.failed = error
+
+@pytest.fixture
+def library(tmp_path):
+    library = BundleLibrary(str(tmp_path / "bundles"))
+    write_bundle(library.path_for("websim.ai/p/a"), ENTRY, "websim.ai/p/a", {
+        ENTRY: (b"<html></html>", "text/html"),
+        "https://cdn.example/lib.js": (b"export default 1;", "text/javascript")
+    })
+    library.load(library.path_for("websim.ai/p/a"))
+    yield library
+    library.close()
+
+def test_resources_are_served_from_the_bundle(app, library):
+    job = StubJob(to_bundle_url("https://cdn.example/lib.js#frag"))
+    BundleSchemeHandler(library).requestStarted(job)
+    assert job.headers == {b"Access-Control-Allow-Origin": [b"*"]}
+    assert job.replied == (b"text/javascript", b"export default 1;")
+
+def test_unknown_urls_fail(app, library):
+    job = StubJob(to_bundle_url("https://cdn.example/missing.js"))
+    BundleSchemeHandler(library).requestStarted(job)
+    assert job.replied is None and job.failed is not None
+
+def test_snapshot_temp_file_is_removed_on_close(tmp_path):
+    snapshot = tmp_path / "page.mhtml"
+    snapshot.write_bytes(b"MIME-Version: 1.0")
+    path = str(tmp_path / "bundle.zip")
+    write_bundle(path, ENTRY, "websim.ai/p/a", {}, str(snapshot))
+    bundle = OfflineBundle(path)
+    extracted = bundle.snapshot_path()
+    with open(extracted, "rb") as f:
+        assert f.read() == b"MIME-Version: 1.0"
+    bundle.close()
+    assert not os.path.exists(extracted)
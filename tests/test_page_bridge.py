@@ -0,0 +1,62 @@
+import json
+import pytest
+from PyQt6.QtCore import QObject, QUrl
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.page_bridge import PageBridge
+
+class FakePage(QObject):
+    def __init__(self, url="https://websim.ai/p/a"):
+        super().__init__()
+        self._url = QUrl(url)
+
+    def url(self):
+        return self._url
+
+class FakeManager:
+    def __init__(self):
+        self.handlers = {"echo": lambda page, *args: list(args), "fail": self.fail}
+
+    def fail(self, page):
+        raise ValueError("handler failed")
+
+@pytest.fixture
+def bridge(app):
+    page = FakePage()
+    return PageBridge(FakeManager(), page)
+
+@pytest.mark.parametrize("batch", ["not json", "{}", '"text"', "42", "null", "[1, null, \"x\", []]"])
+def test_malformed_batches_are_ignored(bridge, batch):
+    bridge.dispatch(batch)
+    assert bridge.outgoing == []
+
+def test_bad_messages_do_not_stop_the_batch(bridge):
+    def broken(ok, value):
+        raise RuntimeError("callback failed")
+    bridge.callbacks[7] = broken
+    bridge.dispatch(json.dumps([
+        {"reply": 7, "ok": True},
+        {"reply": [1]},
+        {"id": 1, "name": "echo", "args": "not a list"},
+        {"id": 2, "name": "fail"},
+        {"id": 3, "name": "missing"},
+        {"id": 4, "name": "echo", "args": [1, "two"]}
+    ]))
+    replies = {message["reply"]: message for message in bridge.outgoing}
+    assert not replies[1]["ok"]
+    assert replies[2] == {"reply": 2, "ok": False, "value": "handler failed"}
+    assert not replies[3]["ok"]
+    assert replies[4] == {"reply": 4, "ok": True, "value": [1, "two"]}
+
+def test_replies_run_callbacks(bridge):
+    results = []
+    bridge.request("page.handler", [1], lambda ok, value: results.append((ok, value)))
+    sent = bridge.outgoing[-1]
+    bridge.dispatch(json.dumps([{"reply": sent["id"], "ok": True, "value": "done"}]))
+    assert results == [(True, "done")]
+
+def test_other_sites_are_ignored(app):
+    page = FakePage("https://evil.example/")
+    bridge = PageBridge(FakeManager(), page)
+    bridge.dispatch(json.dumps([{"id": 1, "name": "echo", "args": []}]))
+    assert bridge.outgoing == []
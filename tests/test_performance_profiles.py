@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.performance_profiles import FLAGS_ENV, apply_chromium_flags, flag_status
+
+class FakeSettings:
+    def __init__(self, profile):
+        self.profile = profile
+
+    def value(self, key, default=None):
+        return self.profile if key == "performance/profile" else default
+
+def test_user_flags_win_over_the_profile():
+    environ = {FLAGS_ENV: "--enable-quic=false"}
+    added = apply_chromium_flags(FakeSettings("max-performance"), environ)
+    assert added == ["--enable-gpu-rasterization", "--enable-zero-copy"]
+    assert environ[FLAGS_ENV] == "--enable-quic=false --enable-gpu-rasterization --enable-zero-copy"
+
+def test_flag_status_reports_what_the_engine_applied():
+    switches = {"--type=renderer", "--enable-gpu-rasterization"}
+    assert flag_status(["--enable-gpu-rasterization", "--process-per-site"], switches) == \
+        "--enable-gpu-rasterization applied, --process-per-site not seen in helpers"
+    assert flag_status(["--enable-zero-copy"], None) == "(unknown on this platform)"
+    assert flag_status([], switches) == "(none)"
@@ -0,0 +1,96 @@
+import http.server
+import threading
+import pytest
+from PyQt6.QtCore import QObject, QUrl, pyqtSignal
+from PyQt6.QtWidgets import QWidget
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.async_runtime import install_event_loop, wait_signal
+from src.plugin_manager import PluginManager, BUILTIN_PLUGIN_SCRIPTS, plugin_script_urls
+
+PLUGIN_SOURCE = b"window.pluginRan = true;"
+
+class PluginHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if not self.path.endswith("/@a/fetched.js"):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/javascript")
+        self.send_header("Content-Length", str(len(PLUGIN_SOURCE)))
+        self.end_headers()
+        self.wfile.write(PLUGIN_SOURCE)
+
+    def log_message(self, *args):
+        pass
+
+class FakePage(QObject):
+    urlChanged = pyqtSignal(QUrl)
+    loadFinished = pyqtSignal(bool)
+
+    def url(self):
+        return QUrl("https://websim.ai/p/a")
+
+class FakeView:
+    def __init__(self):
+        self._page = FakePage()
+
+    def page(self):
+        return self._page
+
+    def url(self):
+        return self._page.url()
+
+class FakeBrowser(QWidget):
+    def __init__(self, storage_path):
+        super().__init__()
+        self.storage_path = storage_path
+        self.web_view = FakeView()
+
+@pytest.fixture(scope="module")
+def loop(app):
+    return install_event_loop(app)
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), PluginHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_bundled_sources_are_cached(app, tmp_path):
+    manager = PluginManager(FakeBrowser(str(tmp_path)))
+    for plugin_id, source in BUILTIN_PLUGIN_SCRIPTS.items():
+        assert manager.cache.get(plugin_id) == (source, False)
+
+def test_fetched_source_is_cached_and_served_offline(loop, tmp_path, server):
+    manager = PluginManager(FakeBrowser(str(tmp_path)))
+    manager.fetcher.source_url = server + "/{plugin_id}.js"
+    manager.ensure_source("@a/fetched")
+    plugin_id, source = loop.run_until_complete(wait_signal(manager.fetcher.fetched, timeout=10))
+    assert (plugin_id, source) == ("@a/fetched", PLUGIN_SOURCE.decode())
+    assert manager.sources["@a/fetched"] == source
+
+    # A new session with nowhere to fetch from still has it
+    restarted = PluginManager(FakeBrowser(str(tmp_path)))
+    restarted.fetcher.source_url = ""
+    restarted.ensure_source("@a/fetched")
+    assert restarted.sources["@a/fetched"] == source
+
+def test_missing_source_reports_failure(loop, tmp_path, server):
+    manager = PluginManager(FakeBrowser(str(tmp_path)))
+    manager.fetcher.source_url = server + "/{plugin_id}.js"
+    manager.ensure_source("@a/missing")
+    assert loop.run_until_complete(wait_signal(manager.fetcher.failed, timeout=10)) == "@a/missing"
+    assert "@a/missing" not in manager.sources
+
+def test_plugin_script_urls():
+    urls = {
+        "https://websim.ai/p/a?plugin=%40a%2Fb",
+        "https://cdn.websim.ai/@a/b/index.js",
+        "https://cdn.websim.ai/%40a%2Fb/main.js",
+        "https://cdn.websim.ai/@a/other.js"
+    }
+    assert plugin_script_urls("@a/b", urls) == ["https://cdn.websim.ai/%40a%2Fb/main.js",
+                                                "https://cdn.websim.ai/@a/b/index.js"]
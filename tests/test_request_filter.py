@@ -0,0 +1,29 @@
+from src.request_filter import RequestFilter, registrable_domain, same_site
+
+RULES = [
+    "block amplitude.com",
+    "allow status.amplitude.com",
+    "block https://cdn.example/track/",
+    "header websim.ai  DNT: 1"
+]
+
+def test_most_specific_rule_wins():
+    rules = RequestFilter(RULES)
+    assert rules.match("api.amplitude.com", "https://api.amplitude.com/2/httpapi")[0]
+    assert not rules.match("status.amplitude.com", "https://status.amplitude.com/")[0]
+    assert rules.match("cdn.example", "https://cdn.example/track/pixel.gif")[0]
+    assert not rules.match("cdn.example", "https://cdn.example/lib.js")[0]
+
+def test_headers_apply_to_subdomains():
+    rules = RequestFilter(RULES)
+    assert rules.match("api.websim.ai", "https://api.websim.ai/")[1] == ((b"DNT", b"1"),)
+
+def test_registrable_domain():
+    assert registrable_domain("a.b.amplitude.com") == "amplitude.com"
+    assert registrable_domain("shop.example.co.uk") == "example.co.uk"
+    assert registrable_domain("localhost") == "localhost"
+
+def test_same_site():
+    assert same_site("api.amplitude.com", "amplitude.com")
+    assert not same_site("api.amplitude.com", "websim.ai")
+    assert not same_site("api.amplitude.com", "")
@@ -0,0 +1,91 @@
+import json
+import pytest
+from PyQt6.QtCore import QObject, QPointF, QUrl, pyqtSignal
+from PyQt6.QtGui import QIcon
+from PyQt6.QtWidgets import QWidget
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.session_manager import SessionStore, SessionManager
+
+def write(tmp_path, session):
+    (tmp_path / "session.json").write_text(json.dumps(session), encoding="utf-8")
+    return SessionStore(str(tmp_path))
+
+def test_loads_sessions_that_only_kept_urls(tmp_path):
+    store = write(tmp_path, {"urls": ["https://websim.ai/", "https://websim.ai/p/a"], "current": 1})
+    assert store.load() == ([{"url": "https://websim.ai/"}, {"url": "https://websim.ai/p/a"}], 1)
+    assert store.current_url() == "https://websim.ai/p/a"
+
+def test_current_index_is_clamped(tmp_path):
+    tabs = [{"url": "https://websim.ai/"}, {"url": "https://websim.ai/p/a"}]
+    assert write(tmp_path, {"tabs": tabs, "current": 7}).load() == (tabs, 1)
+    assert write(tmp_path, {"tabs": tabs, "current": -3}).load() == (tabs, 0)
+
+def test_entries_without_url_are_dropped(tmp_path):
+    store = write(tmp_path, {"tabs": [{"title": "blank"}, {"url": "https://websim.ai/"}], "current": 0})
+    assert store.load() == ([{"url": "https://websim.ai/"}], 0)
+
+def test_missing_or_broken_session(tmp_path):
+    store = SessionStore(str(tmp_path))
+    assert store.load() == ([], 0)
+    (tmp_path / "session.json").write_text("{not json", encoding="utf-8")
+    assert store.load() == ([], 0)
+    assert store.current_url() is None
+
+def test_save_round_trips(tmp_path):
+    store = SessionStore(str(tmp_path / "profile"))
+    tabs = [{"url": "https://websim.ai/p/a", "title": "A", "scroll": [0, 120]}]
+    store.save(tabs, 0)
+    assert store.load() == (tabs, 0)
+
+class FakePage:
+    def scrollPosition(self):
+        return QPointF(0, 0)
+
+class FakeTab:
+    def __init__(self, url):
+        self._url = QUrl(url)
+
+    def url(self):
+        return self._url
+
+    def title(self):
+        return self._url.path()
+
+    def icon(self):
+        return QIcon()
+
+    def page(self):
+        return FakePage()
+
+class FakeTabWidget:
+    def __init__(self, current):
+        self.current = current
+
+    def currentIndex(self):
+        return self.current
+
+class FakeTabs(QObject):
+    changed = pyqtSignal()
+    restored = pyqtSignal(object, object)
+
+    def __init__(self, urls, current):
+        super().__init__()
+        self._tabs = [FakeTab(url) for url in urls]
+        self.widget = FakeTabWidget(current)
+
+    def tabs(self):
+        return self._tabs
+
+class FakeBrowser(QWidget):
+    def __init__(self, tabs):
+        super().__init__()
+        self.tabs = tabs
+
+def test_selected_tab_is_saved_as_current_past_unsaved_tabs(app, tmp_path):
+    tabs = FakeTabs(["websimbundle://websim.ai/p/x", "https://websim.ai/p/a", "https://websim.ai/p/b"], 1)
+    store = SessionStore(str(tmp_path))
+    SessionManager(FakeBrowser(tabs), store).save()
+    entries, current = store.load()
+    assert [entry["url"] for entry in entries] == ["https://websim.ai/p/a", "https://websim.ai/p/b"]
+    assert entries[current]["url"] == "https://websim.ai/p/a"
@@ -0,0 +1,80 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.startup import StartupNavigator
+
+class FakeCookie:
+    def __init__(self, domain, name):
+        self._domain = domain
+        self._name = name
+
+    def domain(self):
+        return self._domain
+
+    def name(self):
+        return self._name
+
+class FakeCookieStore(QObject):
+    cookieAdded = pyqtSignal(object)
+
+    def loadAllCookies(self):
+        pass
+
+class FakeProfile:
+    def __init__(self):
+        self.store = FakeCookieStore()
+
+    def cookieStore(self):
+        return self.store
+
+class FakePage(QObject):
+    loadFinished = pyqtSignal(bool)
+
+class FakeView:
+    def __init__(self):
+        self._page = FakePage()
+        self.url = None
+        self.reloads = 0
+
+    def page(self):
+        return self._page
+
+    def setUrl(self, url):
+        self.url = url
+
+    def reload(self):
+        self.reloads += 1
+
+class FakeBrowser(QObject):
+    def __init__(self):
+        super().__init__()
+        self.profile = FakeProfile()
+        self.web_view = FakeView()
+
+def started(app):
+    browser = FakeBrowser()
+    navigator = StartupNavigator(browser)
+    navigator.on_store_loaded()
+    startup_view = browser.web_view
+    startup_view.page().loadFinished.emit(True)
+    # Another tab becomes current; only the startup view may be reloaded
+    browser.web_view = FakeView()
+    return navigator, browser, startup_view
+
+def test_late_session_cookie_reloads_startup_view_once(app):
+    navigator, browser, startup_view = started(app)
+    assert startup_view.url == navigator.url
+    for _ in range(2):
+        browser.profile.store.cookieAdded.emit(FakeCookie(".websim.ai", b"session_id"))
+    assert startup_view.reloads == 1
+    assert browser.web_view.reloads == 0
+
+def test_login_long_after_startup_does_not_reload(app):
+    navigator, browser, startup_view = started(app)
+    navigator.first_load_time -= StartupNavigator.RELOAD_WINDOW_MS / 1000 + 1
+    browser.profile.store.cookieAdded.emit(FakeCookie("websim.ai", b"auth"))
+    assert startup_view.reloads == 0
+
+def test_other_cookies_are_ignored(app):
+    navigator, browser, startup_view = started(app)
+    browser.profile.store.cookieAdded.emit(FakeCookie("example.com", b"session"))
+    browser.profile.store.cookieAdded.emit(FakeCookie("websim.ai", b"theme"))
+    assert startup_view.reloads == 0
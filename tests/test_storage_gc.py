@@ -0,0 +1,99 @@
+import pytest
+from PyQt6.QtCore import QObject, QSettings, QUrl
+
+pytest.importorskip("PyQt6.QtWebEngineCore", exc_type=ImportError)
+from src.storage_gc import StorageGC, PROTECTED_ORIGINS
+
+MB = 2**20
+NOW = 1_000_000_000
+
+class FakeProfile:
+    def __init__(self, path):
+        self.path = path
+
+    def persistentStoragePath(self):
+        return self.path
+
+class FakeFrame:
+    def __init__(self, url, children=()):
+        self._url = QUrl(url)
+        self._children = list(children)
+
+    def isValid(self):
+        return True
+
+    def url(self):
+        return self._url
+
+    def children(self):
+        return self._children
+
+class FakePage:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def mainFrame(self):
+        return self.frame
+
+class FakeView:
+    def __init__(self, url, frames=()):
+        self._url = QUrl(url)
+        self._page = FakePage(FakeFrame(url, frames))
+
+    def url(self):
+        return self._url
+
+    def page(self):
+        return self._page
+
+class FakeBrowser(QObject):
+    def __init__(self, path):
+        super().__init__()
+        self.profile = FakeProfile(str(path))
+        self.storage_path = str(path)
+        self.web_view = FakeView("https://open.example", [
+            FakeFrame("https://project.example/", [FakeFrame("https://nested.example/")])
+        ])
+
+@pytest.fixture
+def gc(app, tmp_path):
+    settings = QSettings(str(tmp_path / "settings.ini"), QSettings.Format.IniFormat)
+    settings.setValue("storage_gc/total_mb", 100)
+    settings.setValue("storage_gc/origin_mb", 40)
+    return StorageGC(FakeBrowser(tmp_path), settings)
+
+def last_used(gc, **ages):
+    for host, age in ages.items():
+        gc.access[f"https://{host}.example"] = {"last": NOW - age}
+
+def test_origin_over_its_budget_is_evicted(gc):
+    last_used(gc, big=3600, small=3600)
+    usage = {"https://big.example": 50 * MB, "https://small.example": 10 * MB}
+    assert gc.choose_evictions(usage, now=NOW) == ["https://big.example"]
+
+def test_least_recently_used_go_first_until_under_total(gc):
+    last_used(gc, a=7200, b=5400, c=3600)
+    usage = {f"https://{host}.example": 35 * MB for host in "abc"}
+    assert gc.choose_evictions(usage, now=NOW) == ["https://a.example"]
+
+def test_protected_open_and_recent_origins_are_kept(gc):
+    last_used(gc, recent=60, open=7200)
+    usage = {origin: 50 * MB for origin in PROTECTED_ORIGINS}
+    usage.update({"https://recent.example": 50 * MB, "https://open.example": 50 * MB})
+    assert gc.choose_evictions(usage, now=NOW) == []
+
+def test_iframe_origins_of_open_tabs_are_kept(gc):
+    last_used(gc, project=7200, nested=7200, other=7200)
+    usage = {f"https://{host}.example": 50 * MB for host in ("project", "nested", "other")}
+    assert gc.choose_evictions(usage, now=NOW) == ["https://other.example"]
+
+def test_only_origin_data_counts_against_the_total(gc):
+    last_used(gc, a=7200, b=3600)
+    # Well under the 100 MB total however large the rest of the profile is
+    usage = {"https://a.example": 30 * MB, "https://b.example": 30 * MB}
+    assert gc.choose_evictions(usage, now=NOW) == []
+
+def test_prune_access_forgets_origins_with_no_data(gc):
+    last_used(gc, gone=7200, fresh=60, stored=7200)
+    assert gc.prune_access({"https://stored.example": MB}, now=NOW) == ["https://gone.example"]
+    assert set(gc.access) == {"https://fresh.example", "https://stored.example"}
@@ -1,28 +1,37 @@
 import sys
 import os
+import time
+
+# Captured before the Qt imports so startup timings include them
+LAUNCH_TIME = time.perf_counter()
+LAUNCH_CPU = time.process_time()
+
 from PyQt6.QtCore import QUrl, QStandardPaths
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QPushButton, QHBoxLayout, QInputDialog, QMessageBox,
                            QMenu, QDialog, QLabel, QCheckBox, QSpinBox)
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import (QWebEngineScript, QWebEngineProfile, 
-                                  QWebEnginePage, QWebEngineSettings,
-                                  QWebEngineUrlRequestInterceptor)
+                                  QWebEnginePage, QWebEngineSettings)
 from PyQt6.QtGui import QIcon, QAction
 
-class ChromeRequestInterceptor(QWebEngineUrlRequestInterceptor):
-    def __init__(self, chrome_version):
-        super().__init__()
-        self.chrome_version = chrome_version
-        
-    def interceptRequest(self, info):
-        # Add Chrome-specific headers
-        info.setHttpHeader(
-            b"sec-ch-ua",
-            f'"Not_A Brand";v="8", "Chromium";v="{self.chrome_version}", "Google Chrome";v="{self.chrome_version}"'.encode()
-        )
-        info.setHttpHeader(b"sec-ch-ua-mobile", b"?0")
-        info.setHttpHeader(b"sec-ch-ua-platform", b'"Windows"')
+from src.plugin_manager import PluginManager
+from src.page_scripts import default_page_scripts
+from src.database_handler import DatabaseHandler
+from src.page_bridge import BridgeManager
+from src.async_runtime import install_event_loop, run_event_loop
+from src.startup import StartupNavigator, StartupTimeline
+from src.startup_profiler import StartupProfiler
+from src.browser_settings import BrowserSettings
+from src.profile_manager import ProfileManager
+from src.library_store import register_library_scheme
+from src.offline_bundles import register_bundle_scheme
+from src.performance_profiles import apply_chromium_flags, current_profile
+
+STARTUP_TIMELINE = StartupTimeline(LAUNCH_TIME, LAUNCH_CPU)
+STARTUP_TIMELINE.mark("imports")
+# Opt-in via --profile-startup[=trace.json] or WEBSIM_STARTUP_PROFILE
+STARTUP_PROFILER = StartupProfiler.from_args()
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -67,14 +76,14 @@ class SettingsDialog(QDialog):
 class WebSimBrowser(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.timeline = STARTUP_TIMELINE
         self.setWindowTitle("WebSim.ai Browser")
         self.setGeometry(100, 100, 1200, 800)
-
-        # Flag to track initial load
-        self.initial_load = True
+        self.timeline.mark("window")
 
         # Setup persistent storage for cookies and cache
         self.setup_persistent_storage()
+        self.timeline.mark("profile")
 
         # Create central widget and layout
         central_widget = QWidget()
@@ -88,8 +97,18 @@ class WebSimBrowser(QMainWindow):
         page = QWebEnginePage(self.profile, self.web_view)
         self.setup_page_settings(page)
         self.web_view.setPage(page)
-        
-        self.web_view.setUrl(QUrl("https://websim.ai"))
+        self.bridge_manager = BridgeManager(self)
+        self.bridge_manager.attach_page(page)
+        # Page scripts are matched and injected by Chromium, not on every loadFinished
+        self.page_scripts = default_page_scripts()
+        self.page_scripts.install(page)
+        self.timeline.mark("page")
+        
+        # Navigate once the cookie store has loaded instead of loading twice
+        self.startup_navigator = StartupNavigator(self, launch_time=LAUNCH_TIME)
+        self.startup_navigator.firstPaint.connect(self.on_first_paint)
+        self.startup_navigator.start()
+        self.timeline.mark("first navigation")
 
         # Create button layouts
         top_button_layout = QHBoxLayout()
@@ -147,31 +166,21 @@ class WebSimBrowser(QMainWindow):
         # Remove window frame margins
         main_layout.setContentsMargins(0, 0, 0, 0)
 
-        # Initialize the injection script
-        self.setup_injection_script()
-
         # Create plugins menu
-        self.plugins_menu = QMenu(self)
-        self.setup_plugins_menu()
+        self.plugin_manager = PluginManager(self)
+        self.timeline.mark("toolbar")
+        self.timeline.report()
 
-    def setup_plugins_menu(self):
-        """Setup the plugins dropdown menu"""
-        self.plugins_menu.clear()
-        
-        # Add preset plugins
-        self.plugins_menu.addAction("@Trey6383/injectify", 
-                                  lambda: self.apply_preset_plugin("@Trey6383/injectify"))
-        self.plugins_menu.addAction("@hintbl0ck/edit5", 
-                                  lambda: self.apply_preset_plugin("@hintbl0ck/edit5"))
-        self.plugins_menu.addAction("@Trey6383/edit6-real", 
-                                  lambda: self.apply_preset_plugin("@Trey6383/edit6-real"))
-        self.plugins_menu.addSeparator()
-        self.plugins_menu.addAction("New Plugin...", self.add_plugin)
+    def on_first_paint(self, elapsed_ms):
+        """Close the startup timeline at the first successful load"""
+        self.timeline.add("first loadFinished", self.timeline.launch_time, elapsed_ms / 1000)
+        if STARTUP_PROFILER is not None:
+            STARTUP_PROFILER.finish(self.timeline)
 
     def show_plugins_menu(self):
         """Show the plugins dropdown menu"""
         # Show menu at the plugin button's position
-        self.plugins_menu.exec(self.plugin_button.mapToGlobal(
+        self.plugin_manager.menu.exec(self.plugin_button.mapToGlobal(
             self.plugin_button.rect().bottomLeft()
         ))
 
@@ -207,7 +216,8 @@ class WebSimBrowser(QMainWindow):
         settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptEnabled, True)
         settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard, True)
         settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.DnsPrefetchEnabled, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.DnsPrefetchEnabled,
+                              current_profile(BrowserSettings.app_settings())["dns_prefetch"])
         settings.setAttribute(QWebEngineSettings.WebAttribute.FocusOnNavigationEnabled, True)
         settings.setAttribute(QWebEngineSettings.WebAttribute.AllowGeolocationOnInsecureOrigins, False)  # Require HTTPS for geolocation
         settings.setAttribute(QWebEngineSettings.WebAttribute.AllowRunningInsecureContent, False)  # Require HTTPS
@@ -231,9 +241,6 @@ class WebSimBrowser(QMainWindow):
         settings.setFontSize(QWebEngineSettings.FontSize.DefaultFixedFontSize, 13)
         settings.setFontSize(QWebEngineSettings.FontSize.MinimumFontSize, 0)
         settings.setFontSize(QWebEngineSettings.FontSize.MinimumLogicalFontSize, 6)
-        
-        # Connect to loadFinished signal for auto-reload
-        page.loadFinished.connect(self.on_load_finished)
 
     def style_button(self, button, color):
         """Apply consistent styling to buttons"""
@@ -256,230 +263,32 @@ class WebSimBrowser(QMainWindow):
         """Navigate to WebSim home page"""
         self.web_view.setUrl(QUrl("https://websim.ai"))
 
-    def add_plugin(self):
-        """Handle adding a custom plugin"""
-        # Get current URL
-        current_url = self.web_view.url().toString()
-        
-        # Remove any existing plugin parameter
-        if "?plugin=" in current_url:
-            current_url = current_url.split("?plugin=")[0]
-        
-        # Get plugin creator username
-        username, ok = QInputDialog.getText(self, 
-            "Plugin Creator", 
-            "Who made the plugin? Enter their websim username with the @:")
-        if not ok or not username:
-            return
-        
-        # Ensure username starts with @
-        if not username.startswith("@"):
-            username = "@" + username
-        
-        # Get plugin name
-        plugin_name, ok = QInputDialog.getText(self, 
-            "Plugin Name", 
-            "What's the name of the plugin?")
-        if not ok or not plugin_name:
-            return
-        
-        # Construct plugin URL
-        plugin_param = f"?plugin={username}/{plugin_name}"
-        new_url = current_url + plugin_param
-        
-        # Navigate to the new URL
-        self.web_view.setUrl(QUrl(new_url))
-        
-        # Show confirmation
-        QMessageBox.information(self, 
-            "Plugin Added", 
-            f"Plugin {username}/{plugin_name} has been added to the current page.")
-
-    def apply_preset_plugin(self, plugin_id):
-        """Apply a preset plugin to the current page"""
-        current_url = self.web_view.url().toString()
-        
-        # Remove any existing plugin parameter
-        if "?plugin=" in current_url:
-            current_url = current_url.split("?plugin=")[0]
-        
-        # Add the new plugin
-        new_url = current_url + f"?plugin={plugin_id}"
-        self.web_view.setUrl(QUrl(new_url))
-
     def setup_persistent_storage(self):
-        # Create persistent profile in AppData Local with custom name
-        storage_path = os.path.join(
-            os.path.expandvars("%LOCALAPPDATA%"),
-            'WebSimBrowser'
-        )
-        
-        # Print storage path for debugging
-        print(f"Storage path: {storage_path}")
-        
-        # Ensure the directory exists
-        os.makedirs(storage_path, exist_ok=True)
-        
-        # Create persistent profile with enhanced settings
-        self.profile = QWebEngineProfile('WebSimProfile', None)
-        
-        # Set storage paths
-        self.profile.setPersistentStoragePath(storage_path)
-        cookies_path = os.path.join(storage_path, 'cookies')
-        os.makedirs(cookies_path, exist_ok=True)
-        
-        # Enable cache with specific paths
-        cache_path = os.path.join(storage_path, 'cache')
-        os.makedirs(cache_path, exist_ok=True)
-        self.profile.setCachePath(cache_path)
-        self.profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
-        self.profile.setHttpCacheMaximumSize(100 * 1024 * 1024)  # 100MB cache
-        
-        # Configure security settings
-        settings = self.profile.settings()
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalStorageEnabled, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.WebGLEnabled, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptEnabled, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.AllowWindowActivationFromJavaScript, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.ShowScrollBars, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.PluginsEnabled, True)
-        
-        # Set modern Chrome user agent with full security features
-        chrome_version = "120.0.0.0"
-        webkit_version = "537.36"
-        self.profile.setHttpUserAgent(
-            f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/{webkit_version} "
-            f"(KHTML, like Gecko) Chrome/{chrome_version} Safari/{webkit_version} "
-            f"Chromium/{chrome_version}"
-        )
-        
-        # Set language and encoding
-        self.profile.setHttpAcceptLanguage("en-US,en;q=0.9")
-        
-        # Create and set the request interceptor
-        interceptor = ChromeRequestInterceptor(chrome_version)
-        self.profile.setUrlRequestInterceptor(interceptor)
-        
-        # Enhanced cookie settings for better persistence
-        self.profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalStorageEnabled, True)
-        
-        # Don't clear existing data on startup
-        # self.profile.clearHttpCache()
-        # self.profile.clearAllVisitedLinks()
-
-    def setup_injection_script(self):
-        """Initialize the database injection script"""
-        self.injection_script = QWebEngineScript()
-        self.injection_script.setName("databaseFunctionality")
-        self.injection_script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
-        self.web_view.page().scripts().insert(self.injection_script)
+        """Attach to the process-wide profile shared with every other window"""
+        ProfileManager.attach(self)
 
     def inject_database_functionality(self):
         """Inject database functionality that integrates with websim.ai"""
-        current_url = self.web_view.url().toString()
-        
-        # Get the current project ID from the URL if available
-        project_id = ""
-        if "/project/" in current_url:
-            project_id = current_url.split("/project/")[-1].split("/")[0]
-        
-        script_content = """
-        function injectDatabaseFunctionality() {
-            // Get the current project context
-            let projectId = '%s';
-            if (!projectId) {
-                projectId = document.querySelector('[data-project-id]')?.dataset.projectId;
-            }
-            
-            // Get the current websim origin
-            let baseUrl = window.location.origin;
-            
-            // Create database window
-            let dbWindow = window.open(
-                baseUrl + '/database' + (projectId ? '?project=' + projectId : ''),
-                'WebSimDatabase',
-                'width=800,height=800,resizable=yes,scrollbars=yes,status=yes'
-            );
-            
-            // Add window features
-            if (dbWindow) {
-                // Inject custom styles and functionality
-                dbWindow.addEventListener('DOMContentLoaded', function() {
-                    // Add custom styles
-                    const style = dbWindow.document.createElement('style');
-                    style.textContent = `
-                        body { font-family: 'Segoe UI', sans-serif; }
-                        .websim-db-header {
-                            background: #4CAF50;
-                            color: white;
-                            padding: 10px;
-                            position: sticky;
-                            top: 0;
-                            z-index: 1000;
-                        }
-                        .websim-db-content {
-                            padding: 20px;
-                        }
-                        .websim-db-button {
-                            background: #4CAF50;
-                            color: white;
-                            border: none;
-                            padding: 8px 16px;
-                            border-radius: 4px;
-                            cursor: pointer;
-                            margin: 5px;
-                        }
-                        .websim-db-button:hover {
-                            background: #45a049;
-                        }
-                    `;
-                    dbWindow.document.head.appendChild(style);
-                    
-                    // Add header
-                    const header = dbWindow.document.createElement('div');
-                    header.className = 'websim-db-header';
-                    header.innerHTML = `
-                        <h2>WebSim Database</h2>
-                        <div>Project ID: ${projectId || 'None'}</div>
-                    `;
-                    dbWindow.document.body.insertBefore(header, dbWindow.document.body.firstChild);
-                    
-                    // Add functionality to sync with main window
-                    const syncButton = dbWindow.document.createElement('button');
-                    syncButton.className = 'websim-db-button';
-                    syncButton.textContent = 'Sync with Project';
-                    syncButton.onclick = function() {
-                        // Refresh the database content
-                        dbWindow.location.reload();
-                    };
-                    header.appendChild(syncButton);
-                });
-            }
-        }
-        """ % project_id
-        
-        self.web_view.page().runJavaScript(script_content + "\ninjectDatabaseFunctionality();")
-
-    def on_load_finished(self, ok):
-        """Handle page load completion"""
-        if ok and self.initial_load:
-            # Only reload once on initial launch
-            from PyQt6.QtCore import QTimer
-            QTimer.singleShot(1000, self.reload_once)
-
-    def reload_once(self):
-        """Perform one-time reload and reset the flag"""
-        self.web_view.reload()
-        self.initial_load = False
+        # The function itself is installed by the page script registry
+        project_id = DatabaseHandler.extract_project_id(self.web_view.url().toString())
+        self.bridge_manager.notify(self.web_view.page(), DatabaseHandler.BRIDGE_CALL, project_id)
 
 def main():
+    # Chromium reads its flags once, when the first web engine object starts
+    apply_chromium_flags(BrowserSettings.app_settings())
+    # Custom schemes have to be registered before the application exists
+    register_library_scheme()
+    register_bundle_scheme()
     app = QApplication(sys.argv)
+    # Coroutines run on the GUI thread, scheduled by the Qt event loop
+    install_event_loop(app)
+    STARTUP_TIMELINE.mark("QApplication")
     browser = WebSimBrowser()
     browser.show()
-    sys.exit(app.exec())
+    if STARTUP_PROFILER is not None:
+        # Still write the trace if the first load never finishes
+        app.aboutToQuit.connect(lambda: STARTUP_PROFILER.finish(STARTUP_TIMELINE))
+    sys.exit(run_event_loop(app))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file